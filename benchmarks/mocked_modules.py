@@ -0,0 +1,14 @@
+"""Imported first by `run.py`: the repository on the path and a mock for the
+native `cec_lib` or `uinput` when they are not installed."""
+
+import os
+import sys
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+for name in ("cec_control.cec_lib", "uinput"):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = Mock()
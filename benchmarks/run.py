@@ -0,0 +1,367 @@
+"""Benchmarks of the CEC message hot path.
+
+Runs against the simulated bus (`cec_control.cec_sim`), so no adapter is
+needed. When the native `cec_lib` or `uinput` are not installed they are
+replaced by mocks, nothing in the benchmarks calls them.
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json
+"""
+
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+
+import mocked_modules  # noqa: F401
+
+from cec_control._utils import MemoryCache, to_enum
+from cec_control.cec import Cec, CecController
+from cec_control.cec_capture import CecCaptureReader, CecCaptureWriter
+from cec_control.cec_cli import CecCli
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecMessageType,
+    CecNetworkDeviceType,
+    CecUserControlKeys,
+)
+from cec_control.cec_metrics import CecMetricsLib
+from cec_control.cec_sim import (
+    CecSimBus,
+    CecSimBusMsg,
+    CecSimDevice,
+    CecSimLib,
+)
+from cec_control.keyboard import UInputKeyboard
+
+BENCHMARKS: dict[str, Callable[[int], dict]] = {}
+
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+
+def result(value: float, unit: str, higher_is_better=True, **extra) -> dict:
+    return dict(value=value, unit=unit, higher_is_better=higher_is_better, **extra)
+
+
+def rate(count: int, ns: int) -> float:
+    return count / (ns / 1e9) if ns else float("inf")
+
+
+def create_bus(devices=2, queue_size=None) -> CecSimBus:
+    bus = CecSimBus()
+    bus.add_device(CecSimDevice(0, 0x0000, "TV"))
+    for la in (4, 5, 8, 11, 1, 2, 3)[: devices - 1]:
+        bus.add_device(CecSimDevice(la, (la + 1) << 12, f"Device {la}"))
+
+    adapter = bus.add_adapter("/dev/cec0", physical_address=0x1000)
+    if queue_size is not None:
+        adapter.queue_size = queue_size
+
+    return bus
+
+
+def open_cec(bus: CecSimBus, metrics=False) -> Cec:
+    lib = CecSimLib(bus)
+    cec = Cec("/dev/cec0", CecMetricsLib(lib) if metrics else lib)
+    cec.open()
+    cec.set_type(CecDeviceType.Playback)
+    cec.session().start()
+    return cec
+
+
+def run_controller(n: int, level: int, handle: bool, metrics=False) -> dict:
+    bus = create_bus(queue_size=n + 1)
+    cec = open_cec(bus, metrics)
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    ctl = CecController(cec)
+    count = 0
+
+    def handler(msg, type):
+        nonlocal count
+        count += 1
+        return count == n
+
+    def on_pressed(msg, type):
+        nonlocal count
+        count += 1
+        if count == n:
+            return False  # stops handle_cec_messages
+
+    la = cec._ref.info.logical_address
+    frame = bytes((la, 0x44, CecUserControlKeys.Up.value))  # from the TV
+    for _ in range(n):
+        bus.inject(frame)
+
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    start = time.perf_counter_ns()
+    if handle:
+        ctl.handle_cec_messages(60, tv, [CecMessageType.UserControlPressed], on_pressed)
+    else:
+        ctl.wait_for_cec_message(60, handler)
+    elapsed = time.perf_counter_ns() - start
+    logger.setLevel(logging.WARNING)
+    cec.close()
+
+    return result(rate(count, elapsed), "msg/s", n=count)
+
+
+@benchmark("controller.wait_for_cec_message")
+def bench_wait(n: int) -> dict:
+    return run_controller(n, logging.WARNING, handle=False)
+
+
+@benchmark("controller.wait_for_cec_message[debug]")
+def bench_wait_debug(n: int) -> dict:
+    return run_controller(n, logging.DEBUG, handle=False)
+
+
+@benchmark("controller.wait_for_cec_message[metrics]")
+def bench_wait_metrics(n: int) -> dict:
+    return run_controller(n, logging.WARNING, handle=False, metrics=True)
+
+
+@benchmark("controller.handle_cec_messages")
+def bench_handle(n: int) -> dict:
+    return run_controller(n, logging.WARNING, handle=True)
+
+
+@benchmark("controller.handle_cec_messages[debug]")
+def bench_handle_debug(n: int) -> dict:
+    return run_controller(n, logging.DEBUG, handle=True)
+
+
+@benchmark("controller.handle_cec_messages[metrics]")
+def bench_handle_metrics(n: int) -> dict:
+    return run_controller(n, logging.WARNING, handle=True, metrics=True)
+
+
+@benchmark("cli.handle_pressed_msg")
+def bench_pressed(n: int) -> dict:
+    keys = [CecUserControlKeys.Up, CecUserControlKeys.Down]
+    keyboard = UInputKeyboard({keys[0]: "KEY_UP", keys[1]: "KEY_DOWN"})
+    cli = CecCli(keyboard)
+    # a new key each time, so every press is emitted (a resend is not)
+    msgs = [CecSimBusMsg.from_frame(bytes((0x04, 0x44, k.value))) for k in keys]
+    type = CecMessageType.UserControlPressed
+    samples = []
+    for i in range(n):
+        start = time.perf_counter_ns()
+        cli._handle_pressed_msg(msgs[i & 1], type)
+        samples.append(time.perf_counter_ns() - start)
+
+    keyboard.close()
+    samples.sort()
+    return result(
+        statistics.median(samples) / 1000,
+        "us",
+        higher_is_better=False,
+        p99=samples[int(len(samples) * 0.99) - 1] / 1000,
+        n=n,
+    )
+
+
+@benchmark("cache.set")
+def bench_cache_set(n: int) -> dict:
+    cache = MemoryCache(max_size=1024)
+    start = time.perf_counter_ns()
+    for i in range(n):
+        cache.set(i & 2047, i, 60)
+    return result(rate(n, time.perf_counter_ns() - start), "ops/s", n=n)
+
+
+@benchmark("cache.get")
+def bench_cache_get(n: int) -> dict:
+    cache = MemoryCache(max_size=1024)
+    for i in range(1024):
+        cache.set(i, i, 60)
+
+    start = time.perf_counter_ns()
+    for i in range(n):
+        cache.get(i & 2047)  # half hits, half misses
+    return result(rate(n, time.perf_counter_ns() - start), "ops/s", n=n)
+
+
+@benchmark("cache.get_or_set")
+def bench_cache_get_or_set(n: int) -> dict:
+    cache = MemoryCache()
+    start = time.perf_counter_ns()
+    for i in range(n):
+        cache.get_or_set(i & 63, lambda: 0, 60)
+    return result(rate(n, time.perf_counter_ns() - start), "ops/s", n=n)
+
+
+@benchmark("utils.to_enum")
+def bench_to_enum(n: int) -> dict:
+    start = time.perf_counter_ns()
+    for i in range(n):
+        to_enum(i & 255, CecMessageType, CecMessageType.Unknown)
+    elapsed = time.perf_counter_ns() - start
+    return result(elapsed / n, "ns/op", higher_is_better=False, n=n)
+
+
+@benchmark("cli.print")
+def bench_print(n: int) -> dict:
+    bus = create_bus(devices=8)
+    lib = CecSimLib(bus)
+    cec = Cec("/dev/cec0", lib)
+    with cec:
+        cec.set_type(CecDeviceType.Playback)
+
+    samples = []
+    for _ in range(max(1, n // 1000)):
+        start = time.perf_counter_ns()
+        CecCli.print(lib)
+        samples.append(time.perf_counter_ns() - start)
+
+    return result(
+        statistics.median(samples) / 1e6,
+        "ms",
+        higher_is_better=False,
+        devices=len(bus.devices),
+        n=len(samples),
+    )
+
+
+@benchmark("capture.write")
+def bench_capture_write(n: int) -> dict:
+    msg = CecSimBusMsg.from_frame(bytes((0x04, 0x44, CecUserControlKeys.Up.value)))
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = CecCaptureWriter(os.path.join(tmp, "bench.cap"))
+        start = time.perf_counter_ns()
+        for _ in range(n):
+            writer.write(msg)
+        writer.close()
+        elapsed = time.perf_counter_ns() - start
+
+    return result(rate(n, elapsed), "msg/s", n=n)
+
+
+@benchmark("capture.read")
+def bench_capture_read(n: int) -> dict:
+    msg = CecSimBusMsg.from_frame(bytes((0x04, 0x44, CecUserControlKeys.Up.value)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.cap")
+        with CecCaptureWriter(path) as writer:
+            for _ in range(n):
+                writer.write(msg)
+
+        start = time.perf_counter_ns()
+        with CecCaptureReader(path) as reader:
+            count = sum(1 for _ in reader)
+        elapsed = time.perf_counter_ns() - start
+
+    return result(rate(count, elapsed), "msg/s", n=count)
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+            check=False,
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(names: list[str], n: int, repeat: int) -> dict:
+    results = {}
+    for name in names:
+        runs = []
+        for _ in range(repeat):
+            gc.collect()
+            runs.append(BENCHMARKS[name](n))
+
+        # the best run is the least disturbed by the rest of the system
+        pick = max if runs[0]["higher_is_better"] else min
+        best = pick(runs, key=lambda r: r["value"])
+        best["runs"] = [r["value"] for r in runs]
+        results[name] = best
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Names of the benchmarks that are slower than `baseline` by `threshold`."""
+    regressions = []
+    for name, new in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or not old["value"]:
+            continue
+
+        change = new["value"] / old["value"] - 1
+        if not new["higher_is_better"]:
+            change = -change
+
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+
+        print(
+            f"{name:45} {old['value']:>14.2f} -> {new['value']:>14.2f} "
+            f"{new['unit']:6} {change:+7.1%}{flag}",
+            file=sys.stderr,
+        )
+
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the CEC message hot path")
+    parser.add_argument("-n", type=int, default=20000, help="Operations per run")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per bench")
+    parser.add_argument("-k", "--filter", default="", help="Run matching names only")
+    parser.add_argument("-o", "--output", help="Write the JSON results to a file")
+    parser.add_argument("--compare", help="A previous JSON result to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown reported as a regression",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(handlers=[logging.NullHandler()], level=logging.WARNING)
+    names = [name for name in BENCHMARKS if args.filter in name]
+    report = run(names, args.n, args.repeat)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(report, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
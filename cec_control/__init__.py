@@ -1,15 +1,98 @@
-from cec_control._utils import CancellationToken as CancellationToken
-from cec_control.cec import Cec as Cec
-from cec_control.cec import CecController as CecController
-from cec_control.cec import CecDevice as CecDevice
-from cec_control.cec_cli import CecCli as CecCli
-from cec_control.cec_cli import OsKeyboardController as OsKeyboardController
-from cec_control.cec_lib_types import CecDeviceType as CecDeviceType
-from cec_control.cec_lib_types import CecInfo as CecInfo
-from cec_control.cec_lib_types import CecMessage as CecMessage
-from cec_control.cec_lib_types import CecMessageType as CecMessageType
-from cec_control.cec_lib_types import CecNetworkDeviceType as CecNetworkDeviceType
-from cec_control.cec_lib_types import CecPowerState as CecPowerState
-from cec_control.cec_lib_types import CecRef as CecRef
-from cec_control.cec_lib_types import CecUserControlKeys as CecUserControlKeys
-from cec_control.keyboard import UInputKeyboard as UInputKeyboard
+"""HDMI-CEC control of the host from the TV remote.
+
+The names below are imported on first use (PEP 562), so eg. `cec-control
+--list` does not load `uinput` and the modules it does not need.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "CancellationToken": "cec_control._utils",
+    "Cec": "cec_control.cec",
+    "CecController": "cec_control.cec",
+    "CecDevice": "cec_control.cec",
+    "CecSession": "cec_control.cec",
+    "AsyncCecController": "cec_control.cec_async",
+    "CecCli": "cec_control.cec_cli",
+    "OsKeyboardController": "cec_control.cec_cli",
+    "CecControlServer": "cec_control.cec_daemon",
+    "CecFrame": "cec_control.cec_frame",
+    "CecHistory": "cec_control.cec_history",
+    "CecHotplugWatcher": "cec_control.cec_hotplug",
+    "CecDestination": "cec_control.cec_lib_types",
+    "CecDeviceInfoField": "cec_control.cec_lib_types",
+    "CecDeviceType": "cec_control.cec_lib_types",
+    "CecInfo": "cec_control.cec_lib_types",
+    "CecMessage": "cec_control.cec_lib_types",
+    "CecMessageType": "cec_control.cec_lib_types",
+    "CecNetworkDeviceType": "cec_control.cec_lib_types",
+    "CecPowerState": "cec_control.cec_lib_types",
+    "CecRef": "cec_control.cec_lib_types",
+    "CecUserControlKeys": "cec_control.cec_lib_types",
+    "CecMetrics": "cec_control.cec_metrics",
+    "CecMetricsLib": "cec_control.cec_metrics",
+    "CecMonitor": "cec_control.cec_monitor",
+    "CecPowerTracker": "cec_control.cec_power",
+    "CecPublisher": "cec_control.cec_pubsub",
+    "CecSubscriber": "cec_control.cec_pubsub",
+    "CecDeviceRegistry": "cec_control.cec_registry",
+    "CecSchedulerLib": "cec_control.cec_scheduler",
+    "CecTransmitScheduler": "cec_control.cec_scheduler",
+    "CecTopologySnapshot": "cec_control.cec_snapshot",
+    "CecHandlerPool": "cec_control.cec_workers",
+    "UInputKeyboard": "cec_control.keyboard",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
+
+
+if TYPE_CHECKING:
+    from cec_control._utils import CancellationToken as CancellationToken
+    from cec_control.cec import Cec as Cec
+    from cec_control.cec import CecController as CecController
+    from cec_control.cec import CecDevice as CecDevice
+    from cec_control.cec import CecSession as CecSession
+    from cec_control.cec_async import AsyncCecController as AsyncCecController
+    from cec_control.cec_cli import CecCli as CecCli
+    from cec_control.cec_cli import OsKeyboardController as OsKeyboardController
+    from cec_control.cec_daemon import CecControlServer as CecControlServer
+    from cec_control.cec_frame import CecFrame as CecFrame
+    from cec_control.cec_history import CecHistory as CecHistory
+    from cec_control.cec_hotplug import CecHotplugWatcher as CecHotplugWatcher
+    from cec_control.cec_lib_types import CecDestination as CecDestination
+    from cec_control.cec_lib_types import CecDeviceInfoField as CecDeviceInfoField
+    from cec_control.cec_lib_types import CecDeviceType as CecDeviceType
+    from cec_control.cec_lib_types import CecInfo as CecInfo
+    from cec_control.cec_lib_types import CecMessage as CecMessage
+    from cec_control.cec_lib_types import CecMessageType as CecMessageType
+    from cec_control.cec_lib_types import CecNetworkDeviceType as CecNetworkDeviceType
+    from cec_control.cec_lib_types import CecPowerState as CecPowerState
+    from cec_control.cec_lib_types import CecRef as CecRef
+    from cec_control.cec_lib_types import CecUserControlKeys as CecUserControlKeys
+    from cec_control.cec_metrics import CecMetrics as CecMetrics
+    from cec_control.cec_metrics import CecMetricsLib as CecMetricsLib
+    from cec_control.cec_monitor import CecMonitor as CecMonitor
+    from cec_control.cec_power import CecPowerTracker as CecPowerTracker
+    from cec_control.cec_pubsub import CecPublisher as CecPublisher
+    from cec_control.cec_pubsub import CecSubscriber as CecSubscriber
+    from cec_control.cec_registry import CecDeviceRegistry as CecDeviceRegistry
+    from cec_control.cec_scheduler import CecSchedulerLib as CecSchedulerLib
+    from cec_control.cec_scheduler import CecTransmitScheduler as CecTransmitScheduler
+    from cec_control.cec_snapshot import CecTopologySnapshot as CecTopologySnapshot
+    from cec_control.cec_workers import CecHandlerPool as CecHandlerPool
+    from cec_control.keyboard import UInputKeyboard as UInputKeyboard
@@ -1,4 +1,6 @@
+import threading
 import time
+from collections import OrderedDict
 from typing import Callable, Generic, TypeVar
 
 MAX_TRACE_COUNT = 1000000
@@ -35,43 +37,155 @@ class Time:
             time.sleep(sec)
 
 
-class MemoryCache:
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+
+    def __repr__(self):
+        return (
+            f"hits={self.hits} misses={self.misses} evictions={self.evictions} "
+            f"expirations={self.expirations} loads={self.loads}"
+        )
+
+
+class _Loader:
     def __init__(self):
-        self.cache = {}
+        self.done = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+
+
+class MemoryCache:
+    """A thread-safe TTL cache with optional LRU size bound.
+
+    Expired keys are dropped when read and by a sweep every `sweep_every`
+    writes. Concurrent `get_or_set` misses for one key share a single load.
+    """
+
+    def __init__(self, max_size: int | None = None, sweep_every=64):
+        self.cache: OrderedDict[TKey, tuple[TVal, float | None]] = OrderedDict()
+        self.max_size = max_size
+        self.sweep_every = sweep_every
+        self.stats = CacheStats()
+        self._lock = threading.RLock()
+        self._loaders: dict[TKey, _Loader] = {}
+        self._writes = 0
 
     def has(self, key: TKey):
         """Check if a valid (non-expired) key exists in the cache."""
-        if key in self.cache:
-            _, expires_at = self.cache[key]
-            if expires_at is None or Time.ts() < expires_at:
-                return True
-            else:
-                del self.cache[key]  # Clean up expired key
-
-        return False
+        with self._lock:
+            return self._valid(key, Time.ts())
 
     def set(self, key: TKey, value: TVal, ttl=0.0):
         """Set a value with a TTL (in seconds)."""
-        expire_at = None if ttl is None or ttl <= 0 else Time.ts() + ttl
-        self.cache[key] = (value, expire_at)
+        with self._lock:
+            self._set(key, value, ttl)
 
     def get(self, key: TKey, default_value=None):
-        return self._get(key) if self.has(key) else default_value
+        with self._lock:
+            if self._valid(key, Time.ts()):
+                self.stats.hits += 1
+                self.cache.move_to_end(key)
+                return self._get(key)
+
+            self.stats.misses += 1
+            return default_value
 
     def remove(self, key: TKey):
         """Removes a cached value"""
-        del self.cache[key]
+        with self._lock:
+            self.cache.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+
+    def keys(self) -> list[TKey]:
+        with self._lock:
+            return list(self.cache)
 
     def get_or_set(self, key: TKey, value: TVal | Callable[[], TVal], ttl=0.0):
         """Return cached value if valid; otherwise, store and return new value."""
-        if self.has(key):
-            return self._get(key)
+        with self._lock:
+            if self._valid(key, Time.ts()):
+                self.stats.hits += 1
+                self.cache.move_to_end(key)
+                return self._get(key)
+
+            self.stats.misses += 1
+            if not callable(value):
+                self._set(key, value, ttl)
+                return value
+
+            loader = self._loaders.get(key)
+            is_owner = loader is None
+            if is_owner:
+                loader = self._loaders[key] = _Loader()
+
+        if not is_owner:
+            # another thread is already loading this key, share its result
+            loader.done.wait()
+            if loader.error is not None:
+                raise loader.error
+            return loader.value
+
+        try:
+            loader.value = value()
+            self.set(key, loader.value, ttl)
+            return loader.value
+        except BaseException as e:
+            loader.error = e
+            raise
+        finally:
+            with self._lock:
+                self.stats.loads += 1
+                del self._loaders[key]
+            loader.done.set()
+
+    def sweep(self):
+        """Remove all expired keys."""
+        with self._lock:
+            now = Time.ts()
+            expired = [
+                k
+                for k, (_, exp) in self.cache.items()
+                if exp is not None and exp <= now
+            ]
+            for key in expired:
+                del self.cache[key]
+
+            self.stats.expirations += len(expired)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def _valid(self, key: TKey, now: float) -> bool:
+        if key in self.cache:
+            _, expires_at = self.cache[key]
+            if expires_at is None or now < expires_at:
+                return True
+
+            del self.cache[key]  # Clean up expired key
+            self.stats.expirations += 1
+
+        return False
 
-        if callable(value):
-            value = value()
+    def _set(self, key: TKey, value: TVal, ttl: float | None):
+        expire_at = None if ttl is None or ttl <= 0 else Time.ts() + ttl
+        self.cache[key] = (value, expire_at)
+        self.cache.move_to_end(key)
+        if self.max_size is not None:
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+                self.stats.evictions += 1
 
-        self.set(key, value, ttl)
-        return value
+        self._writes += 1
+        if self._writes % self.sweep_every == 0:
+            self.sweep()
 
     def _get(self, key: TKey):
         return self.cache[key][0]
@@ -115,6 +229,10 @@ class Wait:
         self._last_ts = Time.ts()
         return self._last_ts < self.end_time and self.count < self.max_count
 
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.end_time - Time.ts())
+
     def tick(self):
         Time.sleep(self.sleep_sec)
         self.count += 1
@@ -27,15 +27,40 @@ PYBIND11_MODULE(cec_lib, m) {
     
     pybind11::class_<CecNetworkDevice>(m, "CecNetworkDevice")
         .def_readonly("device_id", &CecNetworkDevice::dev_id)
+        .def_readonly("fd", &CecNetworkDevice::fd)
         .def_readonly("source_phys_addr", &CecNetworkDevice::source_phys_addr);
 
+    pybind11::class_<CecDeviceInfo>(m, "CecDeviceInfo")
+        .def_readonly("fields", &CecDeviceInfo::fields)
+        .def_readonly("osd_name", &CecDeviceInfo::osd_name)
+        .def_readonly("physical_address", &CecDeviceInfo::phys_addr)
+        .def_readonly("primary_device_type", &CecDeviceInfo::prim_devtype)
+        .def_readonly("vendor_id", &CecDeviceInfo::vendor_id)
+        .def_readonly("power_status", &CecDeviceInfo::power_status);
+
     pybind11::class_<CecRef>(m, "CecRef")
+        .def_readonly("fd", &CecRef::fd)
+        .def_readonly("wake_fd", &CecRef::wake_fd)
         .def_readonly("info", &CecRef::info)
         .def_readonly("can_transmit", &CecRef::can_transmit)
         .def_readonly("can_set_logical_address", &CecRef::can_set_log_addr)
         .def("isOpen", &CecRef::isOpen);
 
-    pybind11::class_<CecBusMsg>(m, "CecBusMsg")
+    // The buffer protocol exposes the raw frame (msg.len bytes) without a copy,
+    // eg. memoryview(msg) or msg.frame.
+    pybind11::class_<CecBusMsg>(m, "CecBusMsg", pybind11::buffer_protocol())
+        .def_buffer([](CecBusMsg &msg) -> pybind11::buffer_info {
+            return pybind11::buffer_info(
+                msg.frame, sizeof(__u8), pybind11::format_descriptor<__u8>::format(),
+                1, { (pybind11::ssize_t)msg.len }, { (pybind11::ssize_t)sizeof(__u8) }, true);
+        })
+        .def_property_readonly("frame", [](pybind11::object self) {
+            return pybind11::reinterpret_steal<pybind11::memoryview>(PyMemoryView_FromObject(self.ptr()));
+        })
+        .def_readonly("length", &CecBusMsg::len)
+        .def_readonly("rx_ts", &CecBusMsg::rx_ts)
+        .def_readonly("tx_ts", &CecBusMsg::tx_ts)
+        .def_readonly("sequence", &CecBusMsg::sequence)
         .def_readonly("has_event", &CecBusMsg::has_event)
         .def_readonly("has_message", &CecBusMsg::msg)
         .def_readonly("initial_state", &CecBusMsg::initial_state)
@@ -45,28 +70,156 @@ PYBIND11_MODULE(cec_lib, m) {
         .def_readonly("message_code", &CecBusMsg::msg_code)
         .def_readonly("message_address", &CecBusMsg::msg_address)
         .def_readonly("message_command", &CecBusMsg::msg_cmd)
+        .def_readonly("message_vendor_id", &CecBusMsg::msg_vendor_id)
+        .def_readonly("message_osd_name", &CecBusMsg::msg_osd_name)
         .def_readonly("message_transmitted", &CecBusMsg::msg_transmitted)
         .def_readonly("lost_events", &CecBusMsg::lost_events)
+        .def_readonly("lost_messages", &CecBusMsg::lost_msgs)
         .def_readonly("state_change", &CecBusMsg::state_change)
         .def_readonly("state_change_phys_addr", &CecBusMsg::state_change_phys_addr)
         .def_readonly("disconnected", &CecBusMsg::disconnected);
 
+    pybind11::class_<CecTransmitPolicy>(m, "CecTransmitPolicy")
+        .def(pybind11::init([](unsigned retries, unsigned backoff_ms, unsigned max_backoff_ms,
+                               unsigned deadline_ms, unsigned reply_timeout_ms) {
+            return CecTransmitPolicy { retries, backoff_ms, max_backoff_ms, deadline_ms, reply_timeout_ms };
+        }),
+            pybind11::arg("retries") = 10, pybind11::arg("backoff_ms") = 10, pybind11::arg("max_backoff_ms") = 200,
+            pybind11::arg("deadline_ms") = 1000, pybind11::arg("reply_timeout_ms") = 1000)
+        .def_readwrite("retries", &CecTransmitPolicy::retries)
+        .def_readwrite("backoff_ms", &CecTransmitPolicy::backoff_ms)
+        .def_readwrite("max_backoff_ms", &CecTransmitPolicy::max_backoff_ms)
+        .def_readwrite("deadline_ms", &CecTransmitPolicy::deadline_ms)
+        .def_readwrite("reply_timeout_ms", &CecTransmitPolicy::reply_timeout_ms);
+
+    pybind11::class_<CecTransmitResult>(m, "CecTransmitResult")
+        .def_readonly("ok", &CecTransmitResult::ok)
+        .def_readonly("error", &CecTransmitResult::error)
+        .def_readonly("tx_status", &CecTransmitResult::tx_status)
+        .def_readonly("rx_status", &CecTransmitResult::rx_status)
+        .def_readonly("attempts", &CecTransmitResult::attempts)
+        .def_readonly("elapsed", &CecTransmitResult::elapsed)
+        .def_property_readonly("reply", [](CecTransmitResult &result) {
+            return pybind11::bytes(reinterpret_cast<char *>(result.reply), result.reply_len);
+        });
+
+    // The columns are views of the fixed arrays (no copy), numpy.asarray(col)
+    // works too. A view keeps its history alive.
+    pybind11::class_<CecHistoryColumn>(m, "CecHistoryColumn", pybind11::buffer_protocol())
+        .def_buffer([](CecHistoryColumn &col) -> pybind11::buffer_info {
+            CecHistoryBuffer *h = col.history;
+            auto n = (pybind11::ssize_t)h->capacity;
+            switch (col.field) {
+                case CecHistoryField::Timestamp:
+                    return pybind11::buffer_info(h->ts.data(), n, true);
+                case CecHistoryField::From:
+                    return pybind11::buffer_info(h->from.data(), n, true);
+                case CecHistoryField::To:
+                    return pybind11::buffer_info(h->to.data(), n, true);
+                case CecHistoryField::Code:
+                    return pybind11::buffer_info(h->code.data(), n, true);
+                case CecHistoryField::Status:
+                    return pybind11::buffer_info(h->status.data(), n, true);
+                case CecHistoryField::Flags:
+                    return pybind11::buffer_info(h->flags.data(), n, true);
+                case CecHistoryField::Length:
+                    return pybind11::buffer_info(h->len.data(), n, true);
+                default:
+                    return pybind11::buffer_info(
+                        h->frames.data(), sizeof(__u8), pybind11::format_descriptor<__u8>::format(),
+                        2, { n, (pybind11::ssize_t)CEC_MAX_MSG_SIZE },
+                        { (pybind11::ssize_t)CEC_MAX_MSG_SIZE, (pybind11::ssize_t)sizeof(__u8) }, true);
+            }
+        });
+
+    auto column = [](CecHistoryField field) {
+        return [field](pybind11::object self) {
+            auto col = pybind11::cast(CecHistoryColumn { self.cast<CecHistoryBuffer *>(), field });
+            pybind11::detail::keep_alive_impl(col, self);
+            return pybind11::reinterpret_steal<pybind11::memoryview>(PyMemoryView_FromObject(col.ptr()));
+        };
+    };
+
+    pybind11::class_<CecHistoryBuffer>(m, "CecHistoryBuffer")
+        .def(pybind11::init<size_t>(), pybind11::arg("capacity") = 4096)
+        .def_readonly("capacity", &CecHistoryBuffer::capacity)
+        .def_readonly("head", &CecHistoryBuffer::head)
+        .def_readonly("count", &CecHistoryBuffer::count)
+        .def_readonly("total", &CecHistoryBuffer::total)
+        .def_property_readonly("timestamps", column(CecHistoryField::Timestamp))
+        .def_property_readonly("sources", column(CecHistoryField::From))
+        .def_property_readonly("destinations", column(CecHistoryField::To))
+        .def_property_readonly("opcodes", column(CecHistoryField::Code))
+        .def_property_readonly("statuses", column(CecHistoryField::Status))
+        .def_property_readonly("flags", column(CecHistoryField::Flags))
+        .def_property_readonly("lengths", column(CecHistoryField::Length))
+        .def_property_readonly("frames", column(CecHistoryField::Frame))
+        .def("append", &CecHistoryBuffer::append)
+        .def("clear", &CecHistoryBuffer::clear);
+
+    pybind11::class_<CecDeviceEvent>(m, "CecDeviceEvent")
+        .def_readonly("path", &CecDeviceEvent::path)
+        .def_readonly("added", &CecDeviceEvent::added);
+
     m.def("find_cec_devices", &find_cec_devices, "Find CEC devices in /dev/cec*");
     m.def("open_cec", &open_cec, "Open CEC device for read");
     m.def("close_cec", &close_cec, "Closes CEC device for read");
     m.def("set_logical_address", &set_logical_address, "Set logical address to the current device");
     m.def("update_logical_address_info", &update_logical_address_info, "Update CEC logical address information.");
-    m.def("detect_devices", &detect_devices, "Detects network devices by a CEC ref");
+    m.def("detect_devices", &detect_devices, "Detects network devices by a CEC ref",
+        pybind11::arg("cec"), pybind11::arg("mask") = 0x7fff, pybind11::arg("timeout_ms") = 1000,
+        pybind11::call_guard<pybind11::gil_scoped_release>());
     m.def("create_net_device", &create_net_device, "Create a network device");
-    m.def("ping_net_dev", &ping_net_dev, "Ping a network device.");
-    m.def("get_net_dev_physical_addr", &get_net_dev_physical_addr, "Get network device physical address.");
-    m.def("get_net_device_vendor_id", &get_net_device_vendor_id, "Get network device vendor id.");
-    m.def("get_net_device_osd_name", &get_net_device_osd_name, "Get network device OSD name.");
-    m.def("get_device_power_status", &get_device_power_status, "Get network device power state.");
-    m.def("send_msg_set_stream_path", &send_msg_set_stream_path, "Set stream path.");
-    m.def("send_msg_active_source", &send_msg_active_source, "Get network device active source physical address.");
-    m.def("send_msg_request_active_source", &send_msg_request_active_source, "Request network device active source.");
-    m.def("send_msg_report_power_status", &send_msg_report_power_status, "Report power on state to device.");
+    m.def("query_device_info", &query_device_info, "Request the device information fields at once and return the replies.",
+        pybind11::arg("dev"), pybind11::arg("fields") = CEC_INFO_ALL, pybind11::arg("timeout_ms") = 2000,
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("ping_net_dev", &ping_net_dev, "Ping a network device.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("get_net_dev_physical_addr", &get_net_dev_physical_addr, "Get network device physical address.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("get_net_device_vendor_id", &get_net_device_vendor_id, "Get network device vendor id.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("get_net_device_osd_name", &get_net_device_osd_name, "Get network device OSD name.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("get_device_power_status", &get_device_power_status, "Get network device power state.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("send_msg_set_stream_path", &send_msg_set_stream_path, "Set stream path.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("send_msg_active_source", &send_msg_active_source, "Get network device active source physical address.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("send_msg_request_active_source", &send_msg_request_active_source, "Request network device active source.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("send_msg_give_device_power_status", &send_msg_give_device_power_status, "Request network device power state without waiting for the reply.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("send_msg_report_power_status", &send_msg_report_power_status, "Report power on state to device.",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    m.def("get_transmit_policy", &get_transmit_policy, "The transmit policy of the functions above");
+    m.def("set_transmit_policy", &set_transmit_policy, "Set the transmit policy of the functions above");
+    m.def("transmit_msg", &transmit_msg, "Send an opcode and its operands, wait for the `reply` opcode when it is not 0",
+        pybind11::arg("dev"), pybind11::arg("data"), pybind11::arg("reply") = 0, pybind11::arg("policy") = pybind11::none(),
+        pybind11::call_guard<pybind11::gil_scoped_release>());
     m.def("get_msg_init", &get_msg_init, "Start listening to a CEC ref");
-    m.def("get_msg", &get_msg, "Get a CEC message");
+    m.def("get_msg", &get_msg, "Get a CEC message",
+        pybind11::call_guard<pybind11::gil_scoped_release>());
+    // the history is written with the GIL held, a reader never sees half a message
+    m.def("get_msgs", [](CecRef *cec, int timeout_ms, unsigned max_batch, CecHistoryBuffer *history) {
+            std::vector<CecBusMsg> msgs;
+            {
+                pybind11::gil_scoped_release release;
+                msgs = get_msgs(cec, timeout_ms, max_batch);
+            }
+            if (history != nullptr) {
+                for (auto &msg : msgs) {
+                    history->append(msg);
+                }
+            }
+
+            return msgs;
+        },
+        "Wait for CEC messages and drain all queued messages and events, append the messages to `history`",
+        pybind11::arg("cec"), pybind11::arg("timeout_ms") = 1000, pybind11::arg("max_batch") = 64,
+        pybind11::arg("history") = pybind11::none());
+    m.def("watch_cec_devices", &watch_cec_devices, "Watch /dev for added and removed CEC devices, returns a pollable fd");
+    m.def("read_cec_device_events", &read_cec_device_events, "Read the queued device events of a watch without blocking");
+    m.def("unwatch_cec_devices", &unwatch_cec_devices, "Close a device watch");
 }
\ No newline at end of file
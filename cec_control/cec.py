@@ -1,11 +1,18 @@
 import logging
+import threading
+import time
+from collections import deque
 from typing import Callable, Literal
 
 import cec_control.cec_lib as cec_lib
 from cec_control._utils import CancellationToken, MemoryCache, Wait, to_enum
 
+from .cec_history import HISTORY_SIZE, CecHistory
 from .cec_lib_types import (
+    MESSAGE_TYPES,
     VENDORS,
+    CecDestination,
+    CecDeviceInfoField,
     CecDeviceType,
     CecMessage,
     CecMessageRxStatus,
@@ -15,7 +22,26 @@ from .cec_lib_types import (
     CecNetworkDeviceType,
     CecPowerState,
     CecRef,
+    CecTransmitPolicy,
+    CecTransmitResult,
 )
+from .cec_metrics import CecMetrics, CecMetricsLib
+from .cec_workers import CecHandlerPool, message_key
+
+logger = logging.getLogger(__name__)
+
+THandler = Callable[[CecMessage, CecMessageType], bool | None]
+
+BROADCAST = 15
+RECEIVE_TIMEOUT_MS = 1000
+RECEIVE_BATCH = 64
+ALL_DEVICES_MASK = 0x7FFF
+DEVICE_INFO_TTL = 0.5
+DEST_LOCAL = CecDestination.Local.value
+DEST_BROADCAST = CecDestination.Broadcast.value
+DEST_OTHER = CecDestination.Other.value
+# answered by `handle_cec_messages` itself
+RESPONDED_TYPES = (CecMessageType.GiveDevicePowerStatus, CecMessageType.SetStreamPath)
 
 
 def to_kv_str(key: str, val: str, spaces=4, line=True):
@@ -23,18 +49,32 @@ def to_kv_str(key: str, val: str, spaces=4, line=True):
 
 
 def addr_to_str(addr: int) -> str:
-    return f"{addr >> 12}.{(addr >> 8) & 15}.{(addr >> 4) & 15}.{addr  & 15}"
+    return f"{addr >> 12}.{(addr >> 8) & 15}.{(addr >> 4) & 15}.{addr & 15}"
 
 
 class Cec:
+    """A CEC adapter (`/dev/cecX`).
+
+    `lib` is the backend that talks to the adapter, the native `cec_lib` by
+    default (or a `cec_sim.CecSimLib` to run without hardware).
+    """
+
     @staticmethod
-    def find_cec_devices():
-        paths = cec_lib.find_cec_devices()
-        return list(map(Cec, paths))
+    def find_cec_devices(lib=None):
+        lib = cec_lib if lib is None else lib
+        return [Cec(path, lib) for path in lib.find_cec_devices()]
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, lib=None):
         self._path = path
+        self._lib = cec_lib if lib is None else lib
         self._ref: CecRef | None = None
+        self._session: CecSession | None = None
+        self._type: CecDeviceType | None = None
+        self.history: CecHistory | None = None
+
+    @property
+    def path(self) -> str:
+        return self._path
 
     @property
     def opened(self) -> bool:
@@ -52,36 +92,84 @@ class Cec:
     def physical_address(self) -> int:
         return self._ref is not None and self._ref.info.physical_address
 
+    @property
+    def type(self) -> CecDeviceType | None:
+        """The type the adapter is registered with, `reopen` registers it again.
+
+        Set by `set_type`, or directly for an adapter that was registered
+        already (eg. by the last run)."""
+        return self._type
+
+    @type.setter
+    def type(self, type: CecDeviceType | None):
+        self._type = type
+
     def open(self):
         if not self.opened:
-            self._ref = cec_lib.open_cec(self._path)
+            self._ref = self._lib.open_cec(self._path)
 
     def close(self):
         if self.opened:
-            cec_lib.close_cec(self._ref)
+            self._lib.close_cec(self._ref)
             self._ref = None
+            self._session = None
+
+    def reopen(self) -> bool:
+        """Open the adapter again after it was re-plugged and register it
+        with the type it had (see `CecHotplugWatcher`)."""
+        self.close()
+        self.open()
+        if not self.opened:
+            return False
+
+        if self._type is not None and not self.is_registered:
+            return bool(self.set_type(self._type))
+
+        return True
+
+    def record_history(self, capacity=HISTORY_SIZE) -> CecHistory:
+        """Keep the last `capacity` messages received by the controllers.
+
+        Only the controllers created (or reset) after it record.
+        """
+        self.history = CecHistory(capacity, self._lib)
+        return self.history
+
+    def session(self) -> "CecSession":
+        """The monitor session of the opened device (see `CecSession`)."""
+        if self._session is None:
+            self._session = CecSession(self)
+
+        return self._session
 
     def set_type(self, type: CecDeviceType):
-        type_enum = cec_lib.CecDeviceType(type.value)
-        return (
+        type_enum = self._lib.CecDeviceType(type.value)
+        registered = (
             self.opened
             and self._ref.can_set_logical_address
             and type_enum is not None
-            and cec_lib.set_logical_address(self._ref, type_enum)
-            and cec_lib.update_logical_address_info(self._ref)
+            and self._lib.set_logical_address(self._ref, type_enum)
+            and self._lib.update_logical_address_info(self._ref)
         )
+        if registered:
+            self._type = type
 
-    def devices(self):
+        return registered
+
+    def devices(self, mask=ALL_DEVICES_MASK, timeout=1.0):
+        """Ping all logical addresses in `mask` at once, return the ones that
+        acknowledged within `timeout` seconds."""
         if self.is_registered:
-            devs = cec_lib.detect_devices(self._ref)
-            return list(map(CecDevice, devs))
+            devs = self._lib.detect_devices(self._ref, mask, int(timeout * 1000))
+            return [CecDevice(dev, lib=self._lib) for dev in devs]
 
         return None
 
-    def create_device(self, dev_type: CecNetworkDeviceType):
+    def create_device(self, dev_type: CecNetworkDeviceType, ttl=DEVICE_INFO_TTL):
         if self.is_registered:
             logical_address = dev_type.value
-            return CecDevice(cec_lib.create_net_device(self._ref, logical_address))
+            dev = self._lib.create_net_device(self._ref, logical_address)
+            return CecDevice(dev, ttl, self._lib)
 
     def __enter__(self):
         self.open()
@@ -96,7 +184,6 @@ class Cec:
     def __repr__(self):
         result = self._path + "\n"
         if self.is_active_cec:
-
             x = self._ref.info
             result += (
                 to_kv_str("Adapter", x.adapter)
@@ -126,12 +213,58 @@ class Cec:
         return result
 
 
+class CecSession:
+    """Keeps the adapter in initiator/follower mode with a non-blocking fd.
+
+    The mode is set once when the session starts and stays until the device
+    is closed, so no message is lost between receive loops. `lost_events`
+    counts the events and messages the kernel reported as dropped.
+    """
+
+    def __init__(self, cec: Cec):
+        self._cec = cec
+        self._started = False
+        self._depth = 0
+        self.lost_events = 0
+
+    @property
+    def active(self) -> bool:
+        return self._started and self._cec.opened
+
+    def start(self) -> bool:
+        if not self.active:
+            self._started = self._cec._lib.get_msg_init(self._cec._ref)
+            if not self._started:
+                logger.error("Failed to initialize")
+
+        return self._started
+
+    def track(self, msg: CecMessage):
+        if msg.lost_events:
+            self.lost_events += 1
+        if msg.lost_messages:
+            self.lost_events += msg.lost_messages
+
+    def __enter__(self):
+        self._depth += 1
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._depth -= 1
+        if self._depth == 0 and self.lost_events:
+            logger.warning("CEC events lost: %s", self.lost_events)
+
+
 class CecDevice:
-    def __init__(self, dev):
+    # attributes that can change while the device is plugged in
+    VOLATILE = ("osd_name", "power_status")
+
+    def __init__(self, dev, ttl: float | None = DEVICE_INFO_TTL, lib=None):
         self._data = MemoryCache()
         self._dev: CecNetworkDevice = dev
-        self._phys_addr: int | None = None
-        self._vendor_id: int | None = None
+        self._ttl = ttl
+        self._lib = cec_lib if lib is None else lib
 
     @property
     def logical_address(self) -> int:
@@ -139,10 +272,9 @@ class CecDevice:
 
     @property
     def physical_address(self) -> int:
-        if self._phys_addr is None:
-            self._phys_addr = cec_lib.get_net_dev_physical_addr(self._dev)
-
-        return self._phys_addr
+        return self._data.get_or_set(
+            "physical_address", lambda: self._lib.get_net_dev_physical_addr(self._dev)
+        )
 
     @property
     def source_physical_address(self) -> int:
@@ -150,10 +282,9 @@ class CecDevice:
 
     @property
     def vendor_id(self) -> int:
-        if self._vendor_id is None:
-            self._vendor_id = cec_lib.get_net_device_vendor_id(self._dev)
-
-        return self._vendor_id
+        return self._data.get_or_set(
+            "vendor_id", lambda: self._lib.get_net_device_vendor_id(self._dev)
+        )
 
     @property
     def vendor_name(self) -> str:
@@ -162,16 +293,20 @@ class CecDevice:
     @property
     def osd_name(self) -> str:
         return self._data.get_or_set(
-            "osd_name", lambda: cec_lib.get_net_device_osd_name(self._dev), ttl=0.5
+            "osd_name",
+            lambda: self._lib.get_net_device_osd_name(self._dev),
+            ttl=self._ttl,
         )
 
     @property
     def power_state(self) -> CecPowerState:
         status = self._data.get_or_set(
-            "power_status", lambda: cec_lib.get_device_power_status(self._dev), ttl=0.5
+            "power_status",
+            lambda: self._lib.get_device_power_status(self._dev),
+            ttl=self._ttl,
         )
 
-        logging.info(f"status: {status}")
+        logger.debug("status: %s", status)
         return to_enum(status, CecPowerState, CecPowerState.Unknown)
 
     @property
@@ -180,35 +315,120 @@ class CecDevice:
 
     @property
     def is_active(self) -> bool:
-        return cec_lib.ping_net_dev(self._dev)
+        return self._lib.ping_net_dev(self._dev)
+
+    def refresh(self, fields=CecDeviceInfoField.All) -> bool:
+        """Load the device attributes with one pipelined native request."""
+        info = self._lib.query_device_info(self._dev, int(fields))
+        if info.fields & CecDeviceInfoField.OsdName:
+            self.set_cached("osd_name", info.osd_name)
+        if info.fields & CecDeviceInfoField.PhysicalAddress:
+            self.set_cached("physical_address", info.physical_address)
+        if info.fields & CecDeviceInfoField.VendorId:
+            self.set_cached("vendor_id", info.vendor_id)
+        if info.fields & CecDeviceInfoField.PowerStatus:
+            self.set_cached("power_status", info.power_status)
+
+        return info.fields == fields
+
+    def rebind(self, dev):
+        """Use the network device of a reopened adapter, keep the cache."""
+        self._dev = dev
+
+    def get_cached(self, key: str, default_value=None):
+        return self._data.get(key, default_value)
+
+    def set_cached(self, key: str, value):
+        """Store an attribute value received from the bus."""
+        self._data.set(key, value, self._ttl if key in CecDevice.VOLATILE else None)
+
+    def invalidate(self, *keys: str):
+        """Drop cached attributes (all when no key is given)."""
+        if not keys:
+            self._data.clear()
+
+        for key in keys:
+            self._data.remove(key)
 
     def set_stream_path(self) -> bool:
-        return cec_lib.send_msg_set_stream_path(self._dev, self.physical_address)
+        return self._lib.send_msg_set_stream_path(self._dev, self.physical_address)
 
     def request_active_source(self) -> bool:
-        return cec_lib.send_msg_request_active_source(self._dev)
+        return self._lib.send_msg_request_active_source(self._dev)
+
+    def request_power_state(self) -> bool:
+        return self._lib.send_msg_give_device_power_status(self._dev)
 
     def report_active_source(self, addr=None) -> bool:
         if addr is None:
             addr = self.source_physical_address
 
-        return cec_lib.send_msg_active_source(self._dev, addr)
+        return self._lib.send_msg_active_source(self._dev, addr)
 
     def report_power_on(self) -> bool:
-        return cec_lib.send_msg_report_power_status(self._dev)
+        return self._lib.send_msg_report_power_status(self._dev)
+
+    def transmit(
+        self,
+        type: CecMessageType,
+        *operands: int,
+        reply: CecMessageType | None = None,
+        policy: CecTransmitPolicy | None = None,
+    ) -> CecTransmitResult:
+        """Send a message to the device, and wait for the `reply` type if given.
+
+        The result has the transmit and reply status, the reply frame and the
+        time it took (retries included). The lib policy is used by default.
+        """
+        data = bytes((type.value, *operands))
+        code = 0 if reply is None else reply.value
+        return self._lib.transmit_msg(self._dev, data, code, policy)
 
     def __repr__(self):
+        """The cached attributes only (see `refresh`), nothing is sent."""
         type = CecNetworkDeviceType(self._dev.device_id)
+        vendor_id = self.get_cached("vendor_id", 0)
+        power_state = to_enum(
+            self.get_cached("power_status"), CecPowerState, CecPowerState.Unknown
+        )
 
         return (
             f"{type.name} ({type.value})\n"
-            + to_kv_str("Name", self.osd_name)
-            + to_kv_str("Physical Address", addr_to_str(self.physical_address))
-            + to_kv_str("Vendor", f"{self.vendor_id} ({self.vendor_name})")
-            + to_kv_str("Power State", self.power_state.__str__())
+            + to_kv_str("Name", self.get_cached("osd_name", ""))
+            + to_kv_str(
+                "Physical Address",
+                addr_to_str(self.get_cached("physical_address", 0xFFFF)),
+            )
+            + to_kv_str("Vendor", f"{vendor_id} ({VENDORS.get(vendor_id, '')})")
+            + to_kv_str("Power State", power_state.__str__())
         )
 
 
+class LazyMessage:
+    """Formats a message with `CecController.msg_to_str` only when it is logged."""
+
+    __slots__ = ("msg", "type", "wait")
+
+    def __init__(self, wait: Wait, type: CecMessageType, msg: CecMessage):
+        self.wait = wait
+        self.type = type
+        self.msg = msg
+
+    def fields(self):
+        """Structured fields of the message for the log record (`extra`)."""
+        msg = self.msg
+        return {
+            "cec_type": self.type.name,
+            "cec_from": msg.message_from,
+            "cec_to": msg.message_to,
+            "cec_code": msg.message_code,
+            "cec_status": msg.message_status,
+        }
+
+    def __str__(self):
+        return f"{self.wait!r}:{self.type}:{CecController.msg_to_str(self.msg)}"
+
+
 class CecController:
     @staticmethod
     def msg_to_str(msg: CecMessage):
@@ -232,7 +452,7 @@ class CecController:
                 else to_enum(s_code, CecMessageRxStatus, CecMessageRxStatus.Unknown)
             )
             cec_val += "  " + ("Transmitted" if msg.message_transmitted else "Received")
-            cec_val += f" {msg.message_code} with status {s_code} ({ status })\n"
+            cec_val += f" {msg.message_code} with status {s_code} ({status})\n"
             cec_val += f"    from {msg.message_from} to {msg.message_to}"
 
             if (
@@ -250,7 +470,77 @@ class CecController:
 
     def __init__(self, cec: Cec, token: CancellationToken = None):
         self._ref = cec._ref
+        self._lib = cec._lib
+        self._session = cec.session()
         self._token = token if token is not None else CancellationToken()
+        self._pending: deque[CecMessage] = deque()
+        self._history = None if cec.history is None else cec.history.buffer
+        self._listeners: list[Callable[[CecMessage, CecMessageType], None]] = []
+        # (handler, destinations) by opcode, replaced (never mutated) on change
+        self._handlers: list[tuple[tuple[THandler, int], ...]] = [()] * 256
+        self._logical_address = BROADCAST
+        self._update_addresses()
+        # recorded only when the adapter was opened with a `CecMetricsLib`
+        self._metrics: CecMetrics | None = None
+        if isinstance(self._lib, CecMetricsLib):
+            self._metrics = self._lib.metrics
+            self._dispatch = self._dispatch_timed
+
+    def on(
+        self,
+        type: CecMessageType | int,
+        handler: THandler,
+        dest_filter=CecDestination.Any,
+    ):
+        """Call `handler` for the received messages of a type (opcode).
+
+        `dest_filter` selects the destinations the handler is called for. The
+        loop stops and returns the message when a handler returns True.
+        """
+        code = type.value if isinstance(type, CecMessageType) else type
+        self._handlers[code] = (*self._handlers[code], (handler, int(dest_filter)))
+
+    def off(self, type: CecMessageType | int, handler: THandler):
+        code = type.value if isinstance(type, CecMessageType) else type
+        self._handlers[code] = tuple(h for h in self._handlers[code] if h[0] != handler)
+
+    def reset(self, cec: Cec):
+        """Follow a reopened adapter, the handlers and listeners are kept."""
+        self._ref = cec._ref
+        self._session = cec.session()
+        self._history = None if cec.history is None else cec.history.buffer
+        self._pending.clear()
+        self._update_addresses()
+
+    def _update_addresses(self):
+        if self._ref is not None:
+            self._logical_address = self._ref.info.logical_address
+
+    def add_listener(self, fn: Callable[[CecMessage, CecMessageType], None]):
+        """Call `fn` for every message and event before the loop handler."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[CecMessage, CecMessageType], None]):
+        self._listeners.remove(fn)
+
+    def _receive(self, timeout_ms: int) -> deque[CecMessage]:
+        if not self._pending:
+            timeout_ms = max(timeout_ms, 0)
+            if self._history is None:
+                msgs = self._lib.get_msgs(self._ref, timeout_ms, RECEIVE_BATCH)
+            else:
+                msgs = self._lib.get_msgs(
+                    self._ref, timeout_ms, RECEIVE_BATCH, self._history
+                )
+            if self._metrics is not None:
+                self._metrics.received(msgs)
+            for msg in msgs:
+                if msg.has_event:
+                    self._session.track(msg)
+
+            self._pending.extend(msgs)
+
+        return self._pending
 
     def wait_for_cec_message(
         self,
@@ -258,23 +548,59 @@ class CecController:
         handler: Callable[[CecMessage, CecMessageType], bool | None],
         show=False,
         all_msgs=False,
+        stop: threading.Event | None = None,
     ) -> CecMessage | None:
-        if not cec_lib.get_msg_init(self._ref):
-            logging.error("Failed to initialize")
+        """Handle the messages until `handler` returns True or `seconds` pass.
+
+        A set `stop` ends the wait too, after the current read (1 s at most).
+        """
+        if not self._session.start():
             return None
 
         c = Wait(seconds)
         while self._token.is_running and c.waiting:
-            ev: CecMessage = cec_lib.get_msg(self._ref)
-            if ev is not None and (
-                ev.has_event
-                or (ev.has_message and (all_msgs or not ev.message_transmitted))
-            ):
-                type = to_enum(ev.message_code, CecMessageType, CecMessageType.Unknown)
-                msg = f"{c!r}:{type}:{CecController.msg_to_str(ev)}"
-                logging.info(msg) if show else logging.debug(msg)
+            if stop is not None and stop.is_set():
+                break
+            timeout_ms = min(RECEIVE_TIMEOUT_MS, int(c.remaining * 1000))
+            msg = self._process(self._receive(timeout_ms), c, handler, show, all_msgs)
+            if msg is not None:
+                return msg
+
+        return None
+
+    def _process(
+        self,
+        pending: deque[CecMessage],
+        wait: Wait,
+        handler: THandler,
+        show=False,
+        all_msgs=False,
+    ) -> CecMessage | None:
+        """Handle the `pending` messages until one stops the loop."""
+        level = logging.INFO if show else logging.DEBUG
+        log = logger.isEnabledFor(level)
+        while pending and self._token.is_running:
+            ev: CecMessage = pending.popleft()
+            received = ev.has_message and not ev.message_transmitted
+            if ev.has_event or received or (all_msgs and ev.has_message):
+                type = MESSAGE_TYPES[ev.message_code]
+                if log:
+                    msg = LazyMessage(wait, type, ev)
+                    logger.log(level, "%s", msg, extra=msg.fields())
+                if ev.state_change:
+                    self._update_addresses()
+                for listener in self._listeners:
+                    listener(ev, type)
+                if received and self._dispatch(ev, type):
+                    return ev
                 if handler(ev, type) is True:
                     return ev
+            elif ev.disconnected:
+                # every read reports it until the adapter is reopened
+                logger.error("CEC device was disconnected")
+                for listener in self._listeners:
+                    listener(ev, MESSAGE_TYPES[ev.message_code])
+                return ev
 
         return None
 
@@ -284,31 +610,100 @@ class CecController:
         device: CecDevice,
         types: list[CecMessageType],
         handler: Callable[[CecMessage, CecDeviceType], Literal[False, None]],
+        pool: CecHandlerPool | None = None,
     ):
-        def on_message(msg: CecMessage, msg_type: CecDeviceType):
-            if msg.has_message:
-                match msg_type:
-                    case CecMessageType.GiveDevicePowerStatus:
-                        if not device.report_power_on():
-                            logging.error("Unable to report power on")
-                    case CecMessageType.SetStreamPath:
-                        if not device.report_active_source():
-                            logging.error("Unable to report active source")
-                    case _:
-                        if msg_type in types and (
-                            msg.message_to is self._ref.info.logical_address
-                            or self._ref.info.physical_address
-                        ):
-                            return handler(msg, msg_type) is False
+        """Reply to the power and stream path requests, pass `types` to `handler`.
+
+        The loop stops when `handler` returns False. With a `pool` the replies
+        and `handler` run on its workers, the loop keeps reading meanwhile and
+        the queued handlers ran when it returns.
+        """
+        stopped: list[CecMessage] = []
+        stop = threading.Event()
+
+        def report_power(msg: CecMessage, msg_type: CecMessageType):
+            if not device.report_power_on():
+                logger.error("Unable to report power on")
+
+        def report_source(msg: CecMessage, msg_type: CecMessageType):
+            if not device.report_active_source():
+                logger.error("Unable to report active source")
+
+        def on_message(msg: CecMessage, msg_type: CecMessageType):
+            if handler(msg, msg_type) is False:
+                stopped.append(msg)
+                stop.set()
+                return True
+
+        def pooled(fn):
+            def submit(msg: CecMessage, msg_type: CecMessageType):
+                pool.submit(message_key(msg, msg_type), fn, msg, msg_type)
+
+            return submit
+
+        # messages to other devices are only seen in monitor mode, skip them
+        dest = CecDestination.Local | CecDestination.Broadcast
+        handlers = [
+            (CecMessageType.GiveDevicePowerStatus, report_power),
+            (CecMessageType.SetStreamPath, report_source),
+            *((t, on_message) for t in types if t not in RESPONDED_TYPES),
+        ]
+        if pool is not None:
+            handlers = [(t, pooled(fn)) for t, fn in handlers]
+        for msg_type, fn in handlers:
+            self.on(msg_type, fn, dest)
+        try:
+            msg = self.wait_for_cec_message(
+                seconds, lambda msg, _: stop.is_set(), stop=stop
+            )
+        finally:
+            for msg_type, fn in handlers:
+                self.off(msg_type, fn)
+            if pool is not None:
+                pool.join()
 
+        if stopped and (msg is None or not msg.disconnected):
+            return stopped[0]
+
+        return msg
+
+    def _dispatch(self, msg: CecMessage, type: CecMessageType) -> bool:
+        handlers = self._handlers[msg.message_code]
+        if not handlers:
             return False
 
-        return self.wait_for_cec_message(seconds, on_message)
+        to = msg.message_to
+        if to == BROADCAST:
+            dest = DEST_BROADCAST
+        elif to == self._logical_address:
+            dest = DEST_LOCAL
+        else:
+            dest = DEST_OTHER
+
+        stop = False
+        for fn, dest_filter in handlers:
+            if dest_filter & dest and fn(msg, type) is True:
+                stop = True
+
+        return stop
+
+    def _dispatch_timed(self, msg: CecMessage, type: CecMessageType) -> bool:
+        if not self._handlers[msg.message_code]:
+            return False
+
+        start = time.perf_counter()
+        try:
+            return CecController._dispatch(self, msg, type)
+        finally:
+            self._metrics.handled(type, time.perf_counter() - start)
 
     def get_active_source(self, device: CecDevice):
         if device.request_active_source():
             next_msg = self.wait_for_cec_message(1.5, lambda x, _: x.initial_state)
-            return None if next_msg is None else next_msg.state_change_phys_addr
+            if next_msg is None or next_msg.disconnected:
+                return None
+
+            return next_msg.state_change_phys_addr
 
     def trace(self, seconds: int) -> None:
         self.wait_for_cec_message(seconds, lambda x, _: False, show=True, all_msgs=True)
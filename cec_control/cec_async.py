@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+
+from cec_control._utils import to_enum
+
+from .cec import RECEIVE_BATCH, Cec, CecDevice
+from .cec_lib_types import MESSAGE_TYPES, CecMessage, CecMessageType, CecPowerState
+from .cec_metrics import CecMetricsLib
+
+logger = logging.getLogger(__name__)
+
+TMsgFilter = Callable[[CecMessage, CecMessageType], bool]
+
+
+class AsyncCecController:
+    """Serve the CEC bus from an asyncio event loop.
+
+    The adapter fd is registered with `loop.add_reader`, so messages are only
+    read when the kernel has something queued. Events (state changes) raise
+    POLLPRI only and are picked up with the next readable message. The wake
+    fd of the adapter is registered too, for the messages read by a
+    pipelined transmit (eg. `Cec.devices`).
+    """
+
+    def __init__(self, cec: Cec, loop: asyncio.AbstractEventLoop | None = None):
+        self._ref = cec._ref
+        self._lib = cec._lib
+        self._session = cec.session()
+        self._history = None if cec.history is None else cec.history.buffer
+        self._loop = loop
+        self._queues: list[tuple[asyncio.Queue, bool]] = []
+        self._waiters: list[tuple[TMsgFilter, asyncio.Future]] = []
+        self._attached = False
+        self._metrics = (
+            self._lib.metrics if isinstance(self._lib, CecMetricsLib) else None
+        )
+
+    @property
+    def fd(self) -> int:
+        return self._ref.fd
+
+    @property
+    def attached(self) -> bool:
+        return self._attached
+
+    def start(self) -> bool:
+        if self._attached:
+            return True
+
+        if not self._session.start():
+            return False
+
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+        self._loop.add_reader(self.fd, self._on_readable)
+        if self._ref.wake_fd >= 0:
+            self._loop.add_reader(self._ref.wake_fd, self._on_readable)
+        self._attached = True
+        return True
+
+    def stop(self):
+        if self._attached:
+            self._loop.remove_reader(self.fd)
+            if self._ref.wake_fd >= 0:
+                self._loop.remove_reader(self._ref.wake_fd)
+            self._attached = False
+
+        for queue, _ in self._queues:
+            queue.put_nowait(None)
+
+        for _, fut in self._waiters:
+            if not fut.done():
+                fut.set_result(None)
+
+        self._waiters.clear()
+
+    async def messages(self, all_msgs=False) -> AsyncIterator[CecMessage]:
+        """Yield every received message and event until `stop` is called."""
+        queue = asyncio.Queue()
+        entry = (queue, all_msgs)
+        self._queues.append(entry)
+        try:
+            while True:
+                msg = await queue.get()
+                if msg is None:
+                    return
+
+                yield msg
+        finally:
+            self._queues.remove(entry)
+
+    async def wait_for(self, fn: TMsgFilter, timeout: float) -> CecMessage | None:
+        """Wait for the first received message that matches `fn`."""
+        return await self._wait(self._expect(fn), timeout)
+
+    async def request_active_source(self, device: CecDevice, timeout=1.5) -> int | None:
+        """Request the active source and return its physical address."""
+        fut = self._expect(lambda msg, type: type == CecMessageType.ActiveSource)
+        # the reply is awaited, a transmit can fail after the message was sent
+        await self._run(device.request_active_source)
+        msg = await self._wait(fut, timeout)
+        return None if msg is None else msg.message_address
+
+    async def power_state(self, device: CecDevice, timeout=1.0) -> CecPowerState:
+        """Request the device power state and wait for its report."""
+        fut = self._expect(
+            lambda msg, type: (
+                type == CecMessageType.ReportPowerStatus
+                and msg.message_from == device.logical_address
+            )
+        )
+        await self._run(device.request_power_state)
+        msg = await self._wait(fut, timeout)
+        if msg is None:
+            return CecPowerState.Unknown
+
+        return to_enum(msg.message_command, CecPowerState, CecPowerState.Unknown)
+
+    def _expect(self, fn: TMsgFilter) -> asyncio.Future:
+        fut = self._get_loop().create_future()
+        self._waiters.append((fn, fut))
+        return fut
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop if self._loop is not None else asyncio.get_running_loop()
+
+    async def _run(self, fn: Callable[[], bool]) -> bool:
+        # the transmits block (up to a second), not on the event loop
+        return await self._get_loop().run_in_executor(None, fn)
+
+    async def _wait(self, fut: asyncio.Future, timeout: float) -> CecMessage | None:
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters = [w for w in self._waiters if w[1] is not fut]
+
+    def _on_readable(self):
+        if self._history is None:
+            msgs = self._lib.get_msgs(self._ref, 0, RECEIVE_BATCH)
+        else:
+            msgs = self._lib.get_msgs(self._ref, 0, RECEIVE_BATCH, self._history)
+        if self._metrics is not None:
+            self._metrics.received(msgs)
+
+        for msg in msgs:
+            if msg.has_event:
+                self._session.track(msg)
+            self._dispatch(msg)
+            if msg.disconnected:
+                logger.error("CEC device was disconnected")
+                self.stop()
+                return
+
+    def _dispatch(self, msg: CecMessage):
+        is_received = msg.has_message and not msg.message_transmitted
+        if is_received:
+            type = MESSAGE_TYPES[msg.message_code]
+            for fn, fut in list(self._waiters):
+                if not fut.done() and fn(msg, type):
+                    fut.set_result(msg)
+
+        for queue, all_msgs in self._queues:
+            if msg.has_event or is_received or (all_msgs and msg.has_message):
+                queue.put_nowait(msg)
+
+    async def __aenter__(self):
+        if not self.start():
+            raise OSError("Unable to receive the CEC messages")
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
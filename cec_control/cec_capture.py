@@ -0,0 +1,313 @@
+"""A compact binary capture of the CEC bus traffic and its replay.
+
+A capture file is a header and fixed size records, appended as they are
+received, so the file can be read while it is written and indexed by mmap:
+
+    header: magic "CECCAP", version (u16), record size (u16), start (u64 ns)
+    record: ts (u64 ns), kind (u8), status (u8), length (u8), flags (u8),
+            address (u16), lost messages (u32), frame (16 bytes)
+
+`ts` is the kernel monotonic timestamp of the frame (the capture time for
+events), the `start` wall clock time is for humans only.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+
+from .cec_lib_types import CecMessage, CecMessageType, CecPowerState
+from .cec_sim import (
+    BROADCAST,
+    CecSimBus,
+    CecSimBusMsg,
+    CecSimDevice,
+    CecSimLib,
+    CecSimRef,
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CECCAP"
+VERSION = 1
+HEADER = struct.Struct("<6sHHQ")
+RECORD = struct.Struct("<QBBBBHI16s")
+WRITE_BUFFER = 64 * 1024
+
+KIND_EVENT = 0
+KIND_RECEIVED = 1
+KIND_TRANSMITTED = 2
+
+FLAG_INITIAL_STATE = 1
+FLAG_STATE_CHANGE = 2
+FLAG_LOST_EVENTS = 4
+FLAG_DISCONNECTED = 8
+
+
+def pack_msg(msg: CecMessage, ts: int | None = None) -> bytes:
+    """Pack a message or an event (`cec_lib.CecBusMsg`) into a record."""
+    flags = (
+        (FLAG_INITIAL_STATE if msg.initial_state else 0)
+        | (FLAG_STATE_CHANGE if msg.state_change else 0)
+        | (FLAG_LOST_EVENTS if msg.lost_events else 0)
+        | (FLAG_DISCONNECTED if msg.disconnected else 0)
+    )
+    if msg.has_event or not msg.has_message:
+        kind, frame, length = KIND_EVENT, b"", 0
+    else:
+        kind = KIND_TRANSMITTED if msg.message_transmitted else KIND_RECEIVED
+        frame, length = bytes(msg.frame), msg.length
+
+    if ts is None:
+        ts = msg.tx_ts if kind == KIND_TRANSMITTED else msg.rx_ts
+        if not ts:
+            ts = time.monotonic_ns()
+
+    return RECORD.pack(
+        ts,
+        kind,
+        msg.message_status & 255,
+        length,
+        flags,
+        msg.state_change_phys_addr,
+        msg.lost_messages,
+        frame,
+    )
+
+
+def unpack_msg(record: tuple) -> CecSimBusMsg:
+    """A message (with the `CecMessage` attributes) from an unpacked record."""
+    ts, kind, status, length, flags, address, lost, frame = record
+    if kind == KIND_EVENT:
+        return CecSimBusMsg(
+            has_event=not flags & FLAG_DISCONNECTED,
+            initial_state=bool(flags & FLAG_INITIAL_STATE),
+            state_change=bool(flags & FLAG_STATE_CHANGE),
+            state_change_phys_addr=address,
+            lost_events=bool(flags & FLAG_LOST_EVENTS),
+            lost_messages=lost,
+            disconnected=bool(flags & FLAG_DISCONNECTED),
+            rx_ts=ts,
+        )
+
+    transmitted = kind == KIND_TRANSMITTED
+    msg = CecSimBusMsg.from_frame(frame[:length], status, transmitted)
+    if transmitted:
+        msg.tx_ts = ts
+    else:
+        msg.rx_ts = ts
+
+    return msg
+
+
+def record_ts(msg: CecMessage) -> int:
+    """The capture timestamp of a message read back by `CecCaptureReader`."""
+    return msg.tx_ts if msg.message_transmitted else msg.rx_ts
+
+
+class CecCaptureWriter:
+    """Append messages to a capture file through a write buffer.
+
+    Can be attached to a controller as a listener (`controller.add_listener(
+    writer.write)`), records are only packed and buffered on the hot path.
+    """
+
+    def __init__(self, path: str, buffer_size=WRITE_BUFFER):
+        self.path = path
+        self.count = 0
+        # kept open until `close`
+        self._file = open(path, "ab", buffering=buffer_size)  # noqa: SIM115
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time_ns()))
+
+    def write(self, msg: CecMessage, type: CecMessageType | None = None):
+        self._file.write(pack_msg(msg))
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CecCaptureReader:
+    """Read the records of a capture file through mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} is not a CEC capture")
+
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, self.start_ns = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self._map.close()
+            raise ValueError(f"{path} is not a CEC capture (version {VERSION})")
+
+        # a record cut by a crash of the writer is ignored
+        self._count = (size - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def records(self) -> Iterator[tuple]:
+        end = HEADER.size + self._count * RECORD.size
+        return RECORD.iter_unpack(memoryview(self._map)[HEADER.size : end])
+
+    def __iter__(self) -> Iterator[CecSimBusMsg]:
+        return map(unpack_msg, self.records())
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CecReplay:
+    """Feed a capture into a `CecSimBus` as it was received.
+
+    The frames are injected with the captured timing divided by `speed`, or
+    as fast as possible when `speed` is None. Frames the adapter transmitted
+    are skipped, the replayed code sends its own.
+    """
+
+    def __init__(self, msgs: list[CecMessage], bus: CecSimBus, path: str, speed=1.0):
+        self.msgs = msgs
+        self.bus = bus
+        self.path = path
+        self.speed = speed
+        self.replayed = 0
+        self.started = False
+        self.done = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = True
+        if self.speed is None:
+            # nothing is dropped when the consumer is slower than the replay
+            self.bus.adapters[self.path].queue_size = len(self.msgs) + 1
+
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        base = None
+        start = time.monotonic_ns()
+        for msg in self.msgs:
+            if self._stop.is_set():
+                break
+
+            if (msg.has_message and msg.message_transmitted) or msg.initial_state:
+                continue  # sent by the replayed code, or created on open
+
+            ts = record_ts(msg)
+            if base is None:
+                base = ts
+            if self.speed is not None:
+                delay = (start + (ts - base) / self.speed - time.monotonic_ns()) / 1e9
+                if delay > 0 and self._stop.wait(delay):
+                    break
+
+            if self._feed(msg):
+                self.replayed += 1
+
+        self.done.set()
+
+    def _feed(self, msg: CecMessage) -> bool:
+        if msg.has_message:
+            self.bus.inject(msg.frame)
+        elif msg.disconnected:
+            self.bus.unplug(self.path)
+        elif msg.state_change:
+            self.bus.set_physical_address(self.path, msg.state_change_phys_addr)
+        else:
+            return False  # the lost messages of the capture are not replayed
+
+        return True
+
+
+class CecReplayLib(CecSimLib):
+    """A `cec_lib` backend that replays a capture file.
+
+    The devices seen in the capture are on the bus with the attributes they
+    reported first, so discovery and requests work as on the captured bus.
+    The replay starts when the adapter enters the monitor mode
+    (`get_msg_init`), `on_end` is called when it is done.
+    """
+
+    def __init__(self, path: str, speed=1.0, adapter="/dev/cec0"):
+        with CecCaptureReader(path) as reader:
+            msgs = list(reader)
+
+        super().__init__(CecSimBus())
+        self.adapter_path = adapter
+        self.on_end = lambda: None
+        self._add_devices(msgs)
+        self.replay = CecReplay(msgs, self.bus, adapter, speed)
+
+    def get_msg_init(self, ref: CecSimRef) -> bool:
+        started = super().get_msg_init(ref)
+        if started and not self.replay.started:
+            self.replay.start()
+            threading.Thread(target=self._wait_end, daemon=True).start()
+
+        return started
+
+    def _wait_end(self):
+        self.replay.done.wait()
+        logger.info("Replay done, %s messages", self.replay.replayed)
+        self.on_end()
+
+    def _add_devices(self, msgs: list[CecMessage]):
+        adapter_la = BROADCAST
+        physical_address = 0x1000
+        for msg in msgs:
+            if msg.has_message and msg.message_transmitted:
+                adapter_la = msg.message_from
+            elif msg.initial_state:
+                physical_address = msg.state_change_phys_addr
+
+        self.bus.add_adapter(self.adapter_path, physical_address)
+        seen: dict[int, set[int]] = {}
+        for msg in msgs:
+            la = msg.message_from
+            if (
+                not msg.has_message
+                or msg.message_transmitted
+                or la in (BROADCAST, adapter_la)
+            ):
+                continue
+
+            if la not in self.bus.devices:
+                self.bus.add_device(
+                    CecSimDevice(la, 0xFFFF, "", power=CecPowerState.On)
+                )
+                seen[la] = set()
+
+            # the first reported value is the state at the start of the capture
+            if msg.message_code not in seen[la]:
+                seen[la].add(msg.message_code)
+                self.bus.devices[la].sent(bytes(msg.frame))
@@ -1,4 +1,5 @@
 import atexit
+import contextlib
 import logging
 import signal
 from typing import Protocol
@@ -9,16 +10,30 @@ from cec_control.cec import (
     CecController,
     CecDeviceType,
     CecNetworkDeviceType,
-    Wait,
 )
+from cec_control.cec_capture import CecCaptureWriter
+from cec_control.cec_daemon import CecControlServer
+from cec_control.cec_history import CecHistory
+from cec_control.cec_hotplug import CecHotplugWatcher
 from cec_control.cec_lib_types import (
     CecMessage,
     CecMessageType,
-    CecPowerState,
     CecUserControlKeys,
 )
+from cec_control.cec_metrics import CecMetricsLib
+from cec_control.cec_power import CecPowerTracker
+from cec_control.cec_pubsub import CecPublisher
+from cec_control.cec_registry import CecDeviceRegistry
+from cec_control.cec_snapshot import CecTopologySnapshot
+from cec_control.cec_workers import CecHandlerPool
 from cec_control._utils import to_enum
 
+logger = logging.getLogger(__name__)
+
+
+# the process exits (and is restarted by the service) when it takes longer
+RECONNECT_TIMEOUT_SEC = 300
+
 
 class OsKeyboardController(Protocol):
     def __init__(self, keymap: dict[CecUserControlKeys, str]):
@@ -27,16 +42,40 @@ class OsKeyboardController(Protocol):
     def emit_key(key: CecUserControlKeys) -> None:
         pass
 
+    def press_key(key: CecUserControlKeys) -> None:
+        pass
+
+    def release_key() -> None:
+        pass
+
 
 class CecCli:
-    def __init__(self, remote: OsKeyboardController):
+    def __init__(
+        self,
+        remote: OsKeyboardController,
+        lib=None,
+        snapshot: str | None = None,
+        control: str | None = None,
+        publish: str | None = None,
+        workers: int = 0,
+    ):
+        self.lib = lib
+        self.snapshot_path = snapshot
+        self.control_path = control
+        self.publish_path = publish
+        self.workers = workers
         self.cec: Cec = None
         self.token = CancellationToken()
         self.remote = remote
+        self.power: CecPowerTracker = None
+        self.devices: CecDeviceRegistry = None
+        self.capture: CecCaptureWriter | None = None
+        self.history: CecHistory | None = None
+        self._snapshot: CecTopologySnapshot | None = None
 
     @staticmethod
-    def print():
-        interfaces = Cec.find_cec_devices()
+    def print(lib=None):
+        interfaces = Cec.find_cec_devices(lib)
         info = ""
         for cec in interfaces:
             with cec:
@@ -45,14 +84,18 @@ class CecCli:
                     info += "\n    Network Devices:\n\n"
                     devices = cec.devices()
                     for dev in devices:
+                        dev.refresh()
                         info += f"    {dev!r}"
 
-        logging.info(info)
+        logger.info(info)
 
     def register_on_network_and_find_device(
         self, cec_type: CecDeviceType, device_type: CecNetworkDeviceType
     ):
-        interfaces = Cec.find_cec_devices()
+        if self._restore(cec_type, device_type):
+            return
+
+        interfaces = Cec.find_cec_devices(self.lib)
         for cec in interfaces:
             with cec:
                 if not cec.is_active_cec:
@@ -62,15 +105,42 @@ class CecCli:
                     continue
 
                 if not cec.is_registered:
-                    logging.error("Failed to register as CEC device")
+                    logger.error("Failed to register as CEC device")
                     continue
 
-                logging.info("Registered as CEC device")
+                # not set when it was registered already (eg. by the last run),
+                # the snapshot and `reopen` need it
+                cec.type = cec_type
+                logger.info("Registered as CEC device")
                 device = cec.create_device(device_type)
                 if device.is_active:
                     self.cec = cec
                     break
 
+    def _restore(self, cec_type: CecDeviceType, device_type: CecNetworkDeviceType):
+        """Use the adapter of the last run when the snapshot is still valid."""
+        if self.snapshot_path is None:
+            return False
+
+        snapshot = CecTopologySnapshot.load(self.snapshot_path)
+        if snapshot is None:
+            return False
+
+        cec = Cec(snapshot.path, self.lib)
+        with cec:
+            if snapshot.validate(cec, cec_type, device_type):
+                logger.info("Registered as CEC device (snapshot)")
+                self.cec = cec
+                self._snapshot = snapshot
+                return True
+
+        logger.info("The CEC topology changed since the snapshot")
+        return False
+
+    def _save_snapshot(self, cec: Cec):
+        if self.snapshot_path is not None and cec.is_registered:
+            CecTopologySnapshot.capture(cec, self.devices).save(self.snapshot_path)
+
     def attach_on_process_exit(self):
         def on_exit(*args):
             self.token.cancel()
@@ -81,36 +151,125 @@ class CecCli:
 
     def start_monitoring_tv(self):
         if self.cec is None:
-            logging.error("No active CEC device")
+            logger.error("No active CEC device")
             return
 
         with self.cec as cec:
-            tv = cec.create_device(CecNetworkDeviceType.TV)
+            self.devices = CecDeviceRegistry(cec)
+            if self._snapshot is not None:
+                self._snapshot.restore(self.devices)
+            tv = self.devices.get(CecNetworkDeviceType.TV)
             if not tv.is_active:
-                logging.error("No active TV")
+                logger.error("No active TV")
                 return
 
             self.attach_on_process_exit()
 
-            logging.debug(f"{cec!r}")
-            # logging.debug(f"{tv!r}")
+            logger.debug(f"{cec!r}")
+            # logger.debug(f"{tv!r}")
 
+            self.history = cec.record_history()
             ctl = CecController(cec, self.token)
-            while self.token.is_running:
-
-                if not tv.power_state == CecPowerState.On:
-                    logging.debug("Device is OFF")
-                    Wait.for_fn(60, lambda: tv.is_power_on, self.token, sleep_sec=1)
-                else:
-                    logging.debug("Device is ON")
-                    ctl.handle_cec_messages(
-                        1800,
-                        tv,
-                        [CecMessageType.UserControlPressed],
-                        self._handle_pressed_msg,
-                    )  # 30 min
+            self.devices.attach(ctl)
+            if self.capture is not None:
+                ctl.add_listener(self.capture.write)
+            self.power = CecPowerTracker(tv)
+            self.power.poll(force=True)
+            self._save_snapshot(cec)
+            with (
+                cec.session(),
+                CecHotplugWatcher(self.lib) as hotplug,
+                self._control_server(),
+                self._publisher(ctl),
+                self._handler_pool() as pool,
+            ):
+                while self.token.is_running:
+                    if not self.power.is_power_on:
+                        logger.debug("Device is OFF")
+                        msg = ctl.wait_for_cec_message(
+                            self.power.poll_in, self._handle_off_msg
+                        )
+                        if self._disconnected(msg):
+                            if not self._reconnect(ctl, hotplug):
+                                break
+                        else:
+                            self.power.poll()
+                    else:
+                        logger.debug("Device is ON")
+                        msg = ctl.handle_cec_messages(
+                            1800,
+                            tv,
+                            [
+                                CecMessageType.UserControlPressed,
+                                CecMessageType.UserControlReleased,
+                                *CecPowerTracker.TYPES,
+                            ],
+                            self._handle_on_msg,
+                            pool,
+                        )  # 30 min
+                        if self._disconnected(msg):
+                            if not self._reconnect(ctl, hotplug):
+                                break
+                        elif self.power.is_power_on:
+                            self.power.poll(force=True)
+
+            # with what was learned while running
+            self._save_snapshot(cec)
+
+    def _control_server(self):
+        if self.control_path is None:
+            return contextlib.nullcontext()
+
+        return CecControlServer(self, self.control_path)
+
+    def _publisher(self, ctl: CecController):
+        if self.publish_path is None:
+            return contextlib.nullcontext()
+
+        publisher = CecPublisher(self.publish_path)
+        ctl.add_listener(publisher.publish)
+        return publisher
+
+    def _handler_pool(self):
+        """The workers of the handlers, they run in the loop without."""
+        if not self.workers:
+            return contextlib.nullcontext()
+
+        metrics = self.lib.metrics if isinstance(self.lib, CecMetricsLib) else None
+        return CecHandlerPool(self.workers, metrics=metrics)
+
+    def _disconnected(self, msg: CecMessage | None) -> bool:
+        return msg is not None and msg.disconnected
+
+    def _reconnect(self, ctl: CecController, hotplug: CecHotplugWatcher) -> bool:
+        """Reopen the re-plugged adapter in place, keep the device cache."""
+        self.remote.release_key()
+        if not hotplug.reconnect(self.cec, RECONNECT_TIMEOUT_SEC, self.token):
+            if self.token.is_running:
+                logger.error("CEC device %s was not reconnected", self.cec)
+            return False
+
+        ctl.reset(self.cec)
+        self.devices.rebind()
+        self.power.poll(force=True)
+        return True
+
+    def _handle_off_msg(self, msg: CecMessage, type: CecMessageType):
+        self.power.update(msg, type)
+        return self.power.is_power_on or self.power.poll_in <= 0
+
+    def _handle_on_msg(self, msg: CecMessage, type: CecMessageType):
+        if type == CecMessageType.UserControlPressed:
+            self._handle_pressed_msg(msg, type)
+        elif type == CecMessageType.UserControlReleased:
+            self.remote.release_key()
+        elif self.power.update(msg, type) and not self.power.is_power_on:
+            self.remote.release_key()
+            return False
 
     def _handle_pressed_msg(self, msg: CecMessage, type: CecMessageType):
         key = to_enum(msg.message_command, CecUserControlKeys, None)
-        if key is not None:
-            self.remote.emit_key(key)
+        if key is None:
+            self.remote.release_key()
+        else:
+            self.remote.press_key(key)
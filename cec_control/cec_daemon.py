@@ -0,0 +1,200 @@
+"""One-shot commands for the running daemon over a local Unix socket.
+
+The daemon (`CecCli`) owns the adapter, a command reuses its registered
+session and device cache instead of opening the adapter again::
+
+    $ cec-control standby
+    {"ok": true}
+
+A request is a JSON object on one line, the response is one line too::
+
+    {"cmd": "set_stream_path", "address": "1.0.0.0"}
+    {"ok": true}
+    {"cmd": "nope"}
+    {"ok": false, "error": "unknown command: nope"}
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from .cec import addr_to_str
+from .cec_lib_types import CecMessageType, CecNetworkDeviceType, CecPowerState
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = "/run/cec-control/control.sock"
+MAX_REQUEST = 4096
+
+
+def parse_address(value: int | str) -> int:
+    """A physical address as a number or "a.b.c.d"."""
+    if isinstance(value, int):
+        return value
+
+    parts = [int(p, 16) for p in value.split(".")]
+    if len(parts) != 4 or any(p > 15 for p in parts):
+        raise ValueError(f"invalid physical address: {value}")
+
+    return parts[0] << 12 | parts[1] << 8 | parts[2] << 4 | parts[3]
+
+
+class CecControlServer:
+    """Serve the commands for a running `CecCli` on a Unix socket.
+
+    Commands: power_on, standby, set_stream_path (address, our own by
+    default), state and devices (scan for a new detection sweep). Every
+    connection is served by its own thread, the transmits go through the
+    lib of the daemon.
+    """
+
+    def __init__(self, cli, path=SOCKET_PATH):
+        self.cli = cli
+        self.path = path
+        self._server: socketserver.ThreadingUnixStreamServer | None = None
+        self._commands = {
+            "power_on": self._power_on,
+            "standby": self._standby,
+            "set_stream_path": self._set_stream_path,
+            "state": self._state,
+            "devices": self._devices,
+        }
+
+    def start(self) -> "CecControlServer":
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while line := self.rfile.readline(MAX_REQUEST):
+                    response = server.handle_line(line)
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        try:
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # left by a killed daemon
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+            os.chmod(self.path, 0o660)
+        except OSError as e:
+            # the remote keeps working without the commands
+            logger.error("Unable to serve commands on %s: %s", self.path, e)
+            return self
+
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("Serving commands on %s", self.path)
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def handle_line(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"ok": False, "error": f"invalid request: {e}"}
+
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "invalid request: not a JSON object"}
+
+        return self.handle(request)
+
+    def handle(self, request: dict) -> dict:
+        cmd = request.get("cmd")
+        fn = self._commands.get(cmd)
+        if fn is None:
+            return {"ok": False, "error": f"unknown command: {cmd}"}
+        if self.cli.cec is None or not self.cli.cec.is_registered:
+            return {"ok": False, "error": "no registered CEC device"}
+
+        try:
+            return fn(request)
+        except (ValueError, TypeError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("CEC command %s failed", cmd)
+            return {"ok": False, "error": str(e)}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _tv(self):
+        return self.cli.devices.get(CecNetworkDeviceType.TV)
+
+    def _power_on(self, request: dict) -> dict:
+        # one touch play: wake the screen, then switch it to us
+        tv = self._tv()
+        result = tv.transmit(CecMessageType.ImageViewOn)
+        return {"ok": result.ok and tv.report_active_source()}
+
+    def _standby(self, request: dict) -> dict:
+        return {"ok": self._tv().transmit(CecMessageType.Standby).ok}
+
+    def _set_stream_path(self, request: dict) -> dict:
+        cec = self.cli.cec
+        address = parse_address(request.get("address", cec.physical_address))
+        broadcast = cec.create_device(CecNetworkDeviceType.Unregistered)
+        result = broadcast.transmit(
+            CecMessageType.SetStreamPath, address >> 8, address & 255
+        )
+        return {"ok": result.ok}
+
+    def _state(self, request: dict) -> dict:
+        cec = self.cli.cec
+        power = self.cli.power.state if self.cli.power else CecPowerState.Unknown
+        return {
+            "ok": True,
+            "adapter": cec.path,
+            "logical_address": cec._ref.info.logical_address,
+            "physical_address": addr_to_str(cec.physical_address),
+            "power": power.name,
+        }
+
+    def _devices(self, request: dict) -> dict:
+        registry = self.cli.devices
+        if request.get("scan"):
+            for device in self.cli.cec.devices():
+                registry.get(device.logical_address)
+
+        devices = []
+        for device in registry.devices():
+            address = device.get_cached("physical_address")
+            if address is not None:
+                address = addr_to_str(address)
+            devices.append(
+                {
+                    "logical_address": device.logical_address,
+                    "type": CecNetworkDeviceType(device.logical_address).name,
+                    "physical_address": address,
+                    "vendor_id": device.get_cached("vendor_id"),
+                    "osd_name": device.get_cached("osd_name"),
+                }
+            )
+
+        return {"ok": True, "devices": devices}
+
+
+def send_command(cmd: str, path=SOCKET_PATH, timeout=5.0, **args) -> dict:
+    """Send a command to the daemon and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps({"cmd": cmd, **args}).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+
+    if not line:
+        raise ConnectionError("the daemon closed the connection")
+
+    return json.loads(line)
@@ -0,0 +1,180 @@
+from .cec_lib_types import MESSAGE_TYPES, CecMessageType
+
+# the CEC bit time is 2.4 ms, a frame is a start bit and 10 bits per byte
+START_BIT_SEC = 0.0045
+BYTE_SEC = 0.024
+
+# Operands of every CEC opcode as (name, kind). Kinds:
+#   u8 - one byte, pa - 16-bit physical address, u24 - 24-bit vendor id,
+#   str - text until the end of the frame, data - bytes until the end of the frame
+OPERANDS: dict[int, tuple[tuple[str, str], ...]] = {
+    0x00: (("aborted_opcode", "u8"), ("reason", "u8")),  # FEATURE_ABORT
+    CecMessageType.TunerDeviceStatus.value: (("info", "data"),),
+    CecMessageType.GiveTunerDeviceStatus.value: (("status_request", "u8"),),
+    CecMessageType.RecordOn.value: (("source", "data"),),
+    CecMessageType.RecordStatus.value: (("status", "u8"),),
+    CecMessageType.GiveDeckStatus.value: (("status_request", "u8"),),
+    CecMessageType.DeckStatus.value: (("info", "u8"),),
+    CecMessageType.SetMenuLanguage.value: (("language", "str"),),
+    CecMessageType.ClearAnalogueTimer.value: (("timer", "data"),),
+    CecMessageType.SetAnalogueTimer.value: (("timer", "data"),),
+    CecMessageType.TimerStatus.value: (("status", "data"),),
+    CecMessageType.Play.value: (("mode", "u8"),),
+    CecMessageType.DeckControl.value: (("mode", "u8"),),
+    CecMessageType.TimerClearedStatus.value: (("status", "u8"),),
+    CecMessageType.UserControlPressed.value: (("key", "u8"), ("data", "data")),
+    CecMessageType.SetOsdName.value: (("osd_name", "str"),),
+    CecMessageType.SetOsdString.value: (("display_control", "u8"), ("text", "str")),
+    CecMessageType.SetTimerProgramTitle.value: (("title", "str"),),
+    CecMessageType.SystemAudioModeRequest.value: (("physical_address", "pa"),),
+    CecMessageType.SetSystemAudioMode.value: (("status", "u8"),),
+    CecMessageType.SetAudioVolumeLevel.value: (("level", "u8"),),
+    CecMessageType.ReportAudioStatus.value: (("audio_status", "u8"),),
+    CecMessageType.SystemAudioModeStatus.value: (("status", "u8"),),
+    CecMessageType.RoutingChange.value: (
+        ("original_address", "pa"),
+        ("new_address", "pa"),
+    ),
+    CecMessageType.RoutingInformation.value: (("physical_address", "pa"),),
+    CecMessageType.ActiveSource.value: (("physical_address", "pa"),),
+    CecMessageType.ReportPhysicalAddress.value: (
+        ("physical_address", "pa"),
+        ("device_type", "u8"),
+    ),
+    CecMessageType.SetStreamPath.value: (("physical_address", "pa"),),
+    CecMessageType.DeviceVendorId.value: (("vendor_id", "u24"),),
+    CecMessageType.VendorCommand.value: (("data", "data"),),
+    CecMessageType.VendorRemoteButtonDown.value: (("data", "data"),),
+    CecMessageType.MenuRequest.value: (("request_type", "u8"),),
+    CecMessageType.MenuStatus.value: (("status", "u8"),),
+    CecMessageType.ReportPowerStatus.value: (("power_status", "u8"),),
+    CecMessageType.SelectAnalogueService.value: (("service", "data"),),
+    CecMessageType.SelectDigitalService.value: (("service", "data"),),
+    CecMessageType.SetDigitalTimer.value: (("timer", "data"),),
+    CecMessageType.ClearDigitalTimer.value: (("timer", "data"),),
+    CecMessageType.SetAudioRate.value: (("rate", "u8"),),
+    CecMessageType.InactiveSource.value: (("physical_address", "pa"),),
+    CecMessageType.CecVersion.value: (("version", "u8"),),
+    CecMessageType.VendorCommandWithId.value: (("vendor_id", "u24"), ("data", "data")),
+    CecMessageType.ClearExtTimer.value: (("timer", "data"),),
+    CecMessageType.SetExtTimer.value: (("timer", "data"),),
+    CecMessageType.ReportShortAudioDescriptor.value: (("descriptors", "data"),),
+    CecMessageType.RequestShortAudioDescriptor.value: (("formats", "data"),),
+    CecMessageType.ReportFeatures.value: (("version", "u8"), ("features", "data")),
+    CecMessageType.RequestCurrentLatency.value: (("physical_address", "pa"),),
+    CecMessageType.ReportCurrentLatency.value: (
+        ("physical_address", "pa"),
+        ("video_latency", "u8"),
+        ("latency_flags", "u8"),
+        ("audio_latency", "u8"),
+    ),
+    CecMessageType.CdcMessage.value: (("physical_address", "pa"), ("data", "data")),
+}
+
+_SIZES = {"u8": 1, "pa": 2, "u24": 3}
+
+
+def frame_time(length: int) -> float:
+    """Seconds a frame of `length` bytes takes on the wire."""
+    return START_BIT_SEC + length * BYTE_SEC
+
+
+def _decode(buf: memoryview, spec: tuple[tuple[str, str], ...]) -> dict:
+    operands = {}
+    pos = 2
+    for name, kind in spec:
+        if kind == "str":
+            operands[name] = bytes(buf[pos:]).decode("ascii", "replace")
+            pos = len(buf)
+        elif kind == "data":
+            operands[name] = bytes(buf[pos:])
+            pos = len(buf)
+        else:
+            size = _SIZES[kind]
+            if pos + size > len(buf):
+                break  # truncated frame, the remaining operands are missing
+
+            operands[name] = int.from_bytes(buf[pos : pos + size], "big")
+            pos += size
+
+    return operands
+
+
+class CecFrame:
+    """A lazy view over a raw CEC frame.
+
+    Wraps anything with the buffer protocol (`CecBusMsg`, `bytes`) without a
+    copy. Operands are only parsed when one of them is accessed, by their
+    name (eg. `frame.physical_address`) or through `operands`.
+    """
+
+    __slots__ = ("_buf", "_operands")
+
+    def __init__(self, data):
+        try:
+            self._buf = memoryview(data)
+        except TypeError:
+            self._buf = data.frame  # a message without the buffer protocol
+        self._operands: dict | None = None
+
+    @property
+    def raw(self) -> memoryview:
+        return self._buf
+
+    @property
+    def initiator(self) -> int | None:
+        return self._buf[0] >> 4 if len(self._buf) > 0 else None
+
+    @property
+    def destination(self) -> int | None:
+        return self._buf[0] & 15 if len(self._buf) > 0 else None
+
+    @property
+    def is_broadcast(self) -> bool:
+        return self.destination == 15
+
+    @property
+    def is_poll(self) -> bool:
+        return len(self._buf) == 1
+
+    @property
+    def opcode(self) -> int | None:
+        return self._buf[1] if len(self._buf) > 1 else None
+
+    @property
+    def type(self) -> CecMessageType:
+        opcode = self.opcode
+        return CecMessageType.Unknown if opcode is None else MESSAGE_TYPES[opcode]
+
+    @property
+    def name(self) -> str:
+        if self.is_poll:
+            return "Poll"
+        if self.opcode == 0:
+            return "FeatureAbort"
+
+        return self.type.name
+
+    @property
+    def operands(self) -> dict:
+        if self._operands is None:
+            spec = OPERANDS.get(self.opcode, ())
+            self._operands = _decode(self._buf, spec) if spec else {}
+
+        return self._operands
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            return self.operands[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self):
+        return len(self._buf)
+
+    def __repr__(self):
+        args = ", ".join(f"{k}={v!r}" for k, v in self.operands.items())
+        return f"{self.initiator}->{self.destination} {self.name}({args})"
@@ -0,0 +1,146 @@
+"""The recent bus traffic of an adapter, in a fixed-size native ring buffer.
+
+The messages are written by `get_msgs` into the arrays of a
+`cec_lib.CecHistoryBuffer` (31 bytes a message, no Python object), so a long
+window costs a fixed, small amount of memory. The columns are buffer views,
+`numpy.asarray(history.buffer.opcodes)` works without a copy::
+
+    history = cec.record_history(4096)
+    history.key_presses(5)
+    history.power_transitions(3600)
+"""
+
+import itertools
+import time
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from cec_control import cec_lib
+from cec_control._utils import to_enum
+
+from .cec_lib_types import (
+    MESSAGE_TYPES,
+    CecHistoryBuffer,
+    CecMessageType,
+    CecPowerState,
+    CecUserControlKeys,
+)
+
+HISTORY_SIZE = 4096
+TRANSMITTED = 1  # CEC_HISTORY_TRANSMITTED
+MAX_MSG_SIZE = 16
+
+
+class CecHistoryEntry(NamedTuple):
+    ts: int  # ns, comparable with time.monotonic_ns()
+    source: int
+    destination: int
+    type: CecMessageType
+    status: int
+    transmitted: bool
+    frame: bytes
+
+
+class CecHistory:
+    """The last `capacity` messages (received and transmitted) of an adapter.
+
+    The queries walk the slots from the newest message back, entries are
+    created only for the matching ones.
+    """
+
+    def __init__(self, capacity=HISTORY_SIZE, lib=None):
+        self._lib = cec_lib if lib is None else lib
+        self.buffer: CecHistoryBuffer = self._lib.CecHistoryBuffer(capacity)
+        # the arrays never move, the views are taken once
+        buf = self.buffer
+        self._ts = buf.timestamps
+        self._codes = buf.opcodes
+        self._columns = (buf.sources, buf.destinations, buf.statuses, buf.flags)
+        self._lengths = buf.lengths
+        self._frames = memoryview(buf.frames).cast("B")
+
+    def __len__(self) -> int:
+        return self.buffer.count
+
+    @property
+    def total(self) -> int:
+        """Messages appended since the start, the overwritten ones included."""
+        return self.buffer.total
+
+    def slots(self) -> Iterator[int]:
+        """The slot indices of the buffer columns, newest first."""
+        buf = self.buffer
+        head, capacity = buf.head, buf.capacity
+        wrapped = range(capacity - 1, head - 1, -1) if buf.count == capacity else ()
+        return itertools.chain(range(head - 1, -1, -1), wrapped)
+
+    def entry(self, slot: int) -> CecHistoryEntry:
+        sources, destinations, statuses, flags = self._columns
+        start = slot * MAX_MSG_SIZE
+        return CecHistoryEntry(
+            self._ts[slot],
+            sources[slot],
+            destinations[slot],
+            MESSAGE_TYPES[self._codes[slot]],
+            statuses[slot],
+            bool(flags[slot] & TRANSMITTED),
+            bytes(self._frames[start : start + self._lengths[slot]]),
+        )
+
+    def last(self, n: int, type: CecMessageType | None = None) -> list[CecHistoryEntry]:
+        """The last `n` messages (of a type), newest first."""
+        return [self.entry(i) for i in itertools.islice(self._find(type), n)]
+
+    def since(
+        self, seconds: float, type: CecMessageType | None = None
+    ) -> list[CecHistoryEntry]:
+        """The messages (of a type) of the last `seconds`, newest first."""
+        cutoff = time.monotonic_ns() - int(seconds * 1e9)
+        ts = self._ts
+        slots = itertools.takewhile(lambda i: ts[i] >= cutoff, self._find(type))
+        return [self.entry(i) for i in slots]
+
+    def key_presses(self, n: int) -> list[tuple[int, CecUserControlKeys | None]]:
+        """The last `n` received remote keys as (ts, key), newest first."""
+        presses = (
+            e
+            for e in map(self.entry, self._find(CecMessageType.UserControlPressed))
+            if not e.transmitted and len(e.frame) > 2
+        )
+        return [
+            (e.ts, to_enum(e.frame[2], CecUserControlKeys))
+            for e in itertools.islice(presses, n)
+        ]
+
+    def power_transitions(
+        self, seconds: float, device=0
+    ) -> list[tuple[int, CecPowerState]]:
+        """The power state changes of a device as (ts, state), oldest first.
+
+        The state is the one reported (REPORT_POWER_STATUS) or STANDBY.
+        """
+        transitions = []
+        for e in reversed(self.since(seconds)):
+            if e.source != device:
+                continue
+            if e.type == CecMessageType.ReportPowerStatus and len(e.frame) > 2:
+                state = to_enum(e.frame[2], CecPowerState, CecPowerState.Unknown)
+            elif e.type == CecMessageType.Standby:
+                state = CecPowerState.StandBy
+            else:
+                continue
+
+            if not transitions or transitions[-1][1] != state:
+                transitions.append((e.ts, state))
+
+        return transitions
+
+    def clear(self):
+        self.buffer.clear()
+
+    def _find(self, type: CecMessageType | None) -> Iterator[int]:
+        if type is None:
+            return self.slots()
+
+        codes, code = self._codes, type.value
+        return (i for i in self.slots() if codes[i] == code)
@@ -0,0 +1,69 @@
+import logging
+import select
+
+from cec_control import cec_lib
+from cec_control._utils import CancellationToken, Wait
+
+from .cec import RECEIVE_TIMEOUT_MS, Cec
+from .cec_lib_types import CecDeviceEvent
+
+logger = logging.getLogger(__name__)
+
+
+class CecHotplugWatcher:
+    """Adapters added to and removed from /dev, from inotify.
+
+    `fd` is readable while events are queued, so it can be polled together
+    with the adapter fds. A re-plugged adapter is reopened in place by
+    `reconnect`, the process (and its device cache) keeps running.
+    """
+
+    def __init__(self, lib=None):
+        self._lib = cec_lib if lib is None else lib
+        self.fd = self._lib.watch_cec_devices()
+        if self.fd < 0:
+            logger.error("Unable to watch the CEC devices")
+
+    @property
+    def active(self) -> bool:
+        return self.fd >= 0
+
+    def read(self) -> list[CecDeviceEvent]:
+        """The queued events, without blocking."""
+        return self._lib.read_cec_device_events(self.fd) if self.active else []
+
+    def wait(self, timeout: float) -> list[CecDeviceEvent]:
+        if not self.active:
+            return []
+
+        poll = select.poll()
+        poll.register(self.fd, select.POLLIN)
+        return self.read() if poll.poll(max(timeout, 0) * 1000) else []
+
+    def reconnect(self, cec: Cec, seconds: float, token: CancellationToken = None):
+        """Wait until the adapter is added again, then reopen and register it.
+
+        Every add event of the path is a new attempt, the device node can be
+        created before udev gives it the permissions.
+        """
+        token = CancellationToken() if token is None else token
+        c = Wait(seconds)
+        while token.is_running and c.waiting:
+            timeout = min(RECEIVE_TIMEOUT_MS / 1000, c.remaining)
+            for ev in self.wait(timeout):
+                if ev.path == cec.path and ev.added and cec.reopen():
+                    logger.info("CEC device %s reconnected", cec)
+                    return True
+
+        return False
+
+    def close(self):
+        if self.active:
+            self._lib.unwatch_cec_devices(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
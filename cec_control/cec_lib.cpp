@@ -1,11 +1,21 @@
 
 #include <vector>
+#include <deque>
+#include <map>
+#include <memory>
+#include <chrono>
 #include <cstring>
+#include <mutex>
+#include <thread>
 
+#include <sys/eventfd.h>
+#include <sys/inotify.h>
 #include <sys/ioctl.h>
 #include <fcntl.h>
+#include <poll.h>
 #include <stdio.h>
 #include <glob.h>
+#include <unistd.h>
 #include <linux/cec.h>
 #include <linux/cec-funcs.h>
 
@@ -61,8 +71,170 @@ bool _set_cec_info_caps_and_addr(const int fd, struct CecInfo *info) {
     return true;
 }
 
+static short _poll_cec(const int fd, int timeout_ms, short events = POLLIN | POLLPRI) {
+    struct pollfd pfd = { fd, events, 0 };
+    int res = poll(&pfd, 1, timeout_ms);
+    return res > 0 ? pfd.revents : 0;
+}
+
+// The state shared by the threads using an adapter fd. The transmits switch
+// the (shared) O_NONBLOCK flag of the fd, one at a time under `tx_lock`. The
+// CEC_RECEIVE readers take `rx_lock`: the messages a pipelined transmit reads
+// that are not its results are kept in `received` for the next get_msgs, and
+// `wake` (an eventfd) is readable while there are any.
+struct _CecFdState {
+    std::mutex tx_lock;
+    std::mutex rx_lock;
+    std::deque<struct cec_msg> received;
+    int wake = eventfd(0, EFD_NONBLOCK | EFD_CLOEXEC);
+
+    ~_CecFdState() {
+        if (wake >= 0) {
+            close(wake);
+        }
+    }
+};
+
+static std::mutex _fd_states_lock;
+static std::map<int, std::shared_ptr<_CecFdState>> _fd_states;
+
+static std::shared_ptr<_CecFdState> _fd_state(const int fd) {
+    std::lock_guard<std::mutex> lock(_fd_states_lock);
+    auto &state = _fd_states[fd];
+    if (!state) {
+        state = std::make_shared<_CecFdState>();
+    }
+
+    return state;
+}
+
+static void _fd_state_remove(const int fd) {
+    std::lock_guard<std::mutex> lock(_fd_states_lock);
+    _fd_states.erase(fd);
+}
+
+static int _transmit(const int fd, cec_msg *msg) {
+    // The monitor (get_msg_init) switches the fd to non-blocking, a transmit
+    // would then return once queued (tx_status 0), before the result. Clear
+    // the flag so the transmit status (and the reply) is waited for.
+    auto state = _fd_state(fd);
+    std::lock_guard<std::mutex> lock(state->tx_lock);
+    int flags = fcntl(fd, F_GETFL);
+    bool restore = flags >= 0 && (flags & O_NONBLOCK);
+    if (restore) {
+        fcntl(fd, F_SETFL, flags & ~O_NONBLOCK);
+    }
+
+    int res = _io_ctl(fd, CEC_TRANSMIT, msg);
+    if (restore) {
+        fcntl(fd, F_SETFL, flags);
+    }
+
+    return res;
+}
+
+static std::mutex _policy_lock;
+static CecTransmitPolicy _policy;
+
+static CecTransmitPolicy _default_policy() {
+    std::lock_guard<std::mutex> lock(_policy_lock);
+    return _policy;
+}
+
+// Transmit with the retries and the reply timeout of a policy. The sleeps
+// between the attempts double up to max_backoff_ms and never pass the deadline.
+static CecTransmitResult _transmit_retry(const int fd, struct cec_msg *msg, const CecTransmitPolicy &policy) {
+    CecTransmitResult result = {};
+    bool from_unreg = cec_msg_initiator(msg) == CEC_LOG_ADDR_UNREGISTERED;
+    auto start = std::chrono::steady_clock::now();
+    auto deadline = start + std::chrono::milliseconds(policy.deadline_ms);
+    auto backoff = std::chrono::milliseconds(policy.backoff_ms);
+    if (msg->reply) {
+        msg->timeout = policy.reply_timeout_ms;
+    }
+
+    // the kernel writes the status (and the reply) over the message
+    struct cec_msg request = *msg;
+    while (true) {
+        *msg = request;
+        result.attempts++;
+        result.error = _transmit(fd, msg);
+        bool retry = result.error == ENONET || result.error == EBUSY ||
+            (result.error == EINVAL && from_unreg);
+        if (!retry ||
+            result.attempts > policy.retries ||
+            std::chrono::steady_clock::now() + backoff >= deadline) {
+            break;
+        }
+
+        std::this_thread::sleep_for(backoff);
+        backoff = std::min(backoff * 2, std::chrono::milliseconds(policy.max_backoff_ms));
+    }
+
+    result.tx_status = msg->tx_status;
+    result.rx_status = msg->rx_status;
+    result.ok = result.error == 0 && cec_msg_status_is_ok(msg);
+    if (result.error == 0 && msg->reply && (msg->rx_status & CEC_RX_STATUS_OK)) {
+        memcpy(result.reply, msg->msg, sizeof(msg->msg));
+        result.reply_len = msg->len;
+    }
+
+    result.elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    return result;
+}
+
 static bool _send_msg_and_status_ok(const int fd, cec_msg *msg) {
-    return _io_ctl(fd, CEC_TRANSMIT, msg) == 0 && cec_msg_status_is_ok(msg);
+    return _transmit_retry(fd, msg, _default_policy()).ok;
+}
+
+// Queue all messages with a non-blocking transmit and collect the results
+// (and replies) by sequence number from CEC_RECEIVE. Messages that did not
+// complete before the deadline keep tx_status 0.
+static void _transmit_pipelined(const int fd, std::vector<struct cec_msg> &msgs, int timeout_ms) {
+    std::map<__u32, size_t> pending;
+    auto state = _fd_state(fd);
+    std::lock_guard<std::mutex> tx_lock(state->tx_lock);
+    std::lock_guard<std::mutex> rx_lock(state->rx_lock);
+    size_t received = state->received.size();
+    int flags = fcntl(fd, F_GETFL);
+    fcntl(fd, F_SETFL, flags | O_NONBLOCK);
+
+    for (size_t i = 0; i < msgs.size(); i++) {
+        if (_io_ctl(fd, CEC_TRANSMIT, &msgs[i]) == 0 && msgs[i].tx_status == 0) {
+            pending[msgs[i].sequence] = i;
+        }
+    }
+
+    auto deadline = std::chrono::steady_clock::now() + std::chrono::milliseconds(timeout_ms);
+    while (!pending.empty()) {
+        auto left = std::chrono::duration_cast<std::chrono::milliseconds>(
+            deadline - std::chrono::steady_clock::now()).count();
+        if (left <= 0 || !(_poll_cec(fd, left, POLLIN) & POLLIN)) {
+            break;
+        }
+
+        struct cec_msg msg = { };
+        if (_io_ctl(fd, CEC_RECEIVE, &msg)) {
+            break;
+        }
+
+        auto it = pending.find(msg.sequence);
+        if (msg.sequence && msg.tx_status && it != pending.end()) {
+            msgs[it->second] = msg;
+            pending.erase(it);
+        }
+        else {
+            // received in follower mode meanwhile, it is not ours to drop
+            state->received.push_back(msg);
+        }
+    }
+
+    fcntl(fd, F_SETFL, flags);
+    if (state->received.size() > received) {
+        __u64 one = 1;
+        ssize_t res = write(state->wake, &one, sizeof(one));
+        (void)res;  // fails only when the counter is full
+    }
 }
 
 static bool _ping_device(const int fd, __u8 src_log_addr, __u8 dest_log_addr, cec_msg *msg) {
@@ -89,21 +261,6 @@ static inline std::string _cec_type_to_string(CecDeviceType type) {
     }
 }
 
-static int transmit_msg_retry(const int fd, struct cec_msg &msg) {
-	bool from_unreg = cec_msg_initiator(&msg) == CEC_LOG_ADDR_UNREGISTERED;
-	unsigned cnt = 0;
-	bool repeat;
-	int ret;
-
-	do {
-		ret = _io_ctl(fd, CEC_TRANSMIT, &msg);
-		repeat = ret == ENONET || (ret == EINVAL && from_unreg);
-		if (repeat)
-			usleep(100000);
-	} while (repeat && cnt++ < 10);
-	return ret;
-}
-
 // ----------------------------
 // Externally exposed function
 
@@ -122,8 +279,10 @@ std::vector<std::string> find_cec_devices() {
 
 void close_cec(CecRef *ref) {
     if (ref != nullptr && ref->isOpen()) {
+        _fd_state_remove(ref->fd);
         close(ref->fd);
         ref->fd = -1;
+        ref->wake_fd = -1;
     }
 }
 
@@ -135,6 +294,7 @@ CecRef open_cec(std::string device_path) {
             _set_cec_info_log_addr(ref.fd, &ref.info)) {
             ref.can_transmit = (ref.info.caps & CEC_CAP_TRANSMIT) > 0;
             ref.can_set_log_addr = (ref.info.caps & CEC_CAP_LOG_ADDRS) > 0;
+            ref.wake_fd = _fd_state(ref.fd)->wake;
         }
         else {
             close_cec(&ref);
@@ -244,17 +404,26 @@ CecNetworkDevice create_net_device(CecRef *cec, __u8 log_addr) {
     return device;
 }
 
-std::vector<CecNetworkDevice> detect_devices(CecRef *cec) {
+std::vector<CecNetworkDevice> detect_devices(CecRef *cec, unsigned short mask, int timeout_ms) {
     std::vector<CecNetworkDevice> devices = {};
     if (cec != nullptr &&
         cec->isOpen() &&
         cec->can_transmit) {
-        struct cec_msg msg;
+        std::vector<struct cec_msg> polls = {};
 
-        // ping all 14 addresses (15 is broadcast)
+        // ping the masked addresses out of 0-14 at once (15 is broadcast)
         for (unsigned i = 0; i < 15; i++) {
-            if (_ping_device(cec->fd, cec->info.phys_addr, i, &msg)) {
-                devices.push_back(create_net_device(cec, i));
+            if (mask & (1 << i)) {
+                struct cec_msg msg;
+                cec_msg_init(&msg, cec->info.log_addr, i);
+                polls.push_back(msg);
+            }
+        }
+
+        _transmit_pipelined(cec->fd, polls, timeout_ms);
+        for (auto &msg : polls) {
+            if (msg.tx_status && cec_msg_status_is_ok(&msg)) {
+                devices.push_back(create_net_device(cec, cec_msg_destination(&msg)));
             }
         }
     }
@@ -269,7 +438,7 @@ bool ping_net_dev(CecNetworkDevice *dev) {
 
 __u16 get_net_dev_physical_addr(CecNetworkDevice *dev) {
     struct cec_msg msg;
-    __u16 phys_addr;
+    __u16 phys_addr = CEC_PHYS_ADDR_INVALID;
     cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
 	cec_msg_give_physical_addr(&msg, true);
     if (_send_msg_and_status_ok(dev->fd, &msg)) {
@@ -281,7 +450,7 @@ __u16 get_net_dev_physical_addr(CecNetworkDevice *dev) {
 
 __u32 get_net_device_vendor_id(CecNetworkDevice *dev) {
     struct cec_msg msg;
-    __u32 vendor_id;
+    __u32 vendor_id = 0;
     cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
 	cec_msg_give_device_vendor_id(&msg, true);
     if (_send_msg_and_status_ok(dev->fd, &msg)) {
@@ -296,9 +465,10 @@ std::string get_net_device_osd_name(CecNetworkDevice *dev) {
     char osd_name[15];
     cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
 	cec_msg_give_osd_name(&msg, true);
-    _io_ctl(dev->fd, CEC_TRANSMIT, &msg);
-    cec_ops_set_osd_name(&msg, osd_name);
-    if (!cec_msg_status_is_ok(&msg)) {
+    if (_send_msg_and_status_ok(dev->fd, &msg)) {
+        cec_ops_set_osd_name(&msg, osd_name);
+    }
+    else {
         std::string err = "NO NAME";
         strcpy(osd_name, err.c_str());
     }
@@ -318,6 +488,65 @@ __u8 get_device_power_status(CecNetworkDevice *dev) {
     return pwr;
 }
 
+CecDeviceInfo query_device_info(CecNetworkDevice *dev, unsigned fields, int timeout_ms) {
+    CecDeviceInfo info = {};
+    std::vector<struct cec_msg> msgs = {};
+    struct cec_msg msg;
+    char osd_name[15];
+
+    info.power_status = 15;
+    if (fields & CEC_INFO_OSD_NAME) {
+        cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
+        cec_msg_give_osd_name(&msg, true);
+        msgs.push_back(msg);
+    }
+    if (fields & CEC_INFO_PHYS_ADDR) {
+        cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
+        cec_msg_give_physical_addr(&msg, true);
+        msgs.push_back(msg);
+    }
+    if (fields & CEC_INFO_VENDOR_ID) {
+        cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
+        cec_msg_give_device_vendor_id(&msg, true);
+        msgs.push_back(msg);
+    }
+    if (fields & CEC_INFO_POWER_STATUS) {
+        cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
+        cec_msg_give_device_power_status(&msg, true);
+        msgs.push_back(msg);
+    }
+
+    // all requests are on the bus at once, the replies come back by sequence
+    _transmit_pipelined(dev->fd, msgs, timeout_ms);
+    for (auto &reply : msgs) {
+        if (!reply.tx_status || !cec_msg_status_is_ok(&reply)) {
+            continue;
+        }
+
+        switch (reply.msg[1]) {
+            case CEC_MSG_SET_OSD_NAME:
+                cec_ops_set_osd_name(&reply, osd_name);
+                info.osd_name = std::string(osd_name);
+                info.fields |= CEC_INFO_OSD_NAME;
+                break;
+            case CEC_MSG_REPORT_PHYSICAL_ADDR:
+                cec_ops_report_physical_addr(&reply, &info.phys_addr, &info.prim_devtype);
+                info.fields |= CEC_INFO_PHYS_ADDR;
+                break;
+            case CEC_MSG_DEVICE_VENDOR_ID:
+                cec_ops_device_vendor_id(&reply, &info.vendor_id);
+                info.fields |= CEC_INFO_VENDOR_ID;
+                break;
+            case CEC_MSG_REPORT_POWER_STATUS:
+                cec_ops_report_power_status(&reply, &info.power_status);
+                info.fields |= CEC_INFO_POWER_STATUS;
+                break;
+        }
+    }
+
+    return info;
+}
+
 // __u16 get_net_dev_active_source_phys_addr(CecNetworkDevice *dev) {
 //     __u16 pa;
 //     struct cec_msg msg;
@@ -351,11 +580,36 @@ bool send_msg_request_active_source(CecNetworkDevice *dev) {
     return _send_msg_and_status_ok(dev->fd, &msg);
 }
 
+bool send_msg_give_device_power_status(CecNetworkDevice *dev) {
+    struct cec_msg msg;
+    cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
+    cec_msg_give_device_power_status(&msg, false);
+    return _send_msg_and_status_ok(dev->fd, &msg);
+}
+
 bool send_msg_active_source(CecNetworkDevice *dev, __u16 phys_addr) {
     struct cec_msg msg;
     cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
     cec_msg_active_source(&msg, phys_addr);
-    return !transmit_msg_retry(dev->fd, msg);
+    return _send_msg_and_status_ok(dev->fd, &msg);
+}
+
+CecTransmitPolicy get_transmit_policy() {
+    return _default_policy();
+}
+
+void set_transmit_policy(CecTransmitPolicy policy) {
+    std::lock_guard<std::mutex> lock(_policy_lock);
+    _policy = policy;
+}
+
+CecTransmitResult transmit_msg(CecNetworkDevice *dev, std::string data, __u8 reply, std::optional<CecTransmitPolicy> policy) {
+    struct cec_msg msg;
+    cec_msg_init(&msg, dev->source_log_addr, dev->dev_id);
+    msg.len = 1 + std::min(data.size(), sizeof(msg.msg) - 1);
+    memcpy(msg.msg + 1, data.data(), msg.len - 1);
+    msg.reply = reply;
+    return _transmit_retry(dev->fd, &msg, policy ? *policy : _default_policy());
 }
 
 bool get_msg_init(CecRef *cec) {
@@ -369,66 +623,248 @@ bool get_msg_init(CecRef *cec) {
     return ret_val;
 }
 
-CecBusMsg get_msg(CecRef *cec) {
-    fd_set rd_fds;
-    fd_set ex_fds;
-    CecBusMsg cec_msg;
+static bool _read_event(const int fd, CecBusMsg *cec_msg) {
+    struct cec_event ev;
+    if (_io_ctl(fd, CEC_DQEVENT, &ev)) {
+        return false;
+    }
+
+    cec_msg->has_event = true;
+    cec_msg->lost_events = (ev.flags & CEC_EVENT_FL_DROPPED_EVENTS);
+    cec_msg->initial_state = (ev.flags & CEC_EVENT_FL_INITIAL_STATE);
+    if (ev.event == CEC_EVENT_STATE_CHANGE) {
+        cec_msg->state_change = true;
+        cec_msg->state_change_phys_addr = ev.state_change.phys_addr;
+    }
+    else if (ev.event == CEC_EVENT_LOST_MSGS) {
+        cec_msg->lost_msgs = ev.lost_msgs.lost_msgs;
+    }
+
+    return true;
+}
+
+static void _parse_msg(const struct cec_msg &msg, CecBusMsg *cec_msg) {
     __u16 pa;
-    int res;
-    struct timeval tv = { 1, 0 };
-
-    FD_ZERO(&rd_fds);
-    FD_ZERO(&ex_fds);
-    FD_SET(cec->fd, &rd_fds);
-    FD_SET(cec->fd, &ex_fds);
-    res = select(cec->fd + 1, &rd_fds, nullptr, &ex_fds, &tv);
-    if (res < 0)
-		return cec_msg;
-
-    if (FD_ISSET(cec->fd, &ex_fds)) {
-        struct cec_event ev;
-        if (_io_ctl(cec->fd, CEC_DQEVENT, &ev)) {
+    __u8 prim_devtype;
+    char osd_name[15];
+    bool transmitted = msg.tx_status != 0;
+    memcpy(cec_msg->frame, msg.msg, sizeof(msg.msg));
+    cec_msg->len = msg.len;
+    cec_msg->rx_ts = msg.rx_ts;
+    cec_msg->tx_ts = msg.tx_ts;
+    cec_msg->sequence = msg.sequence;
+    cec_msg->msg = msg.len > 1;
+    cec_msg->msg_from = cec_msg_initiator(&msg);
+    cec_msg->msg_to = cec_msg_destination(&msg);
+    cec_msg->msg_transmitted = transmitted;
+    cec_msg->msg_status = transmitted ? msg.tx_status : msg.rx_status;
+    cec_msg->msg_code = msg.msg[1];
+    switch (msg.msg[1]) {
+        case CEC_MSG_SET_STREAM_PATH:
+            cec_ops_set_stream_path(&msg, &pa);
+            cec_msg->msg_address = pa;
+            break;
+        case CEC_MSG_USER_CONTROL_PRESSED:
+        case CEC_MSG_REPORT_POWER_STATUS:
+            cec_msg->msg_cmd = msg.msg[2];
+            break;
+        case CEC_MSG_ACTIVE_SOURCE:
+            cec_ops_active_source(&msg, &pa);
+            cec_msg->msg_address = pa;
+            break;
+        case CEC_MSG_REPORT_PHYSICAL_ADDR:
+            cec_ops_report_physical_addr(&msg, &pa, &prim_devtype);
+            cec_msg->msg_address = pa;
+            break;
+        case CEC_MSG_DEVICE_VENDOR_ID:
+            cec_ops_device_vendor_id(&msg, &cec_msg->msg_vendor_id);
+            break;
+        case CEC_MSG_SET_OSD_NAME:
+            cec_ops_set_osd_name(&msg, osd_name);
+            cec_msg->msg_osd_name = std::string(osd_name);
+            break;
+    }
+}
+
+static bool _read_msg(const int fd, CecBusMsg *cec_msg) {
+    struct cec_msg msg = { };
+    int res = _io_ctl(fd, CEC_RECEIVE, &msg);
+    if (res == ENODEV) {
+        cec_msg->disconnected = true;
+        return true;
+    }
+
+    if (res) {
+        return false;
+    }
+
+    _parse_msg(msg, cec_msg);
+    return true;
+}
+
+// The messages read by a pipelined transmit come first, they are older than
+// the ones still queued by the kernel. Call with `rx_lock` held.
+static void _take_received(_CecFdState &state, std::vector<CecBusMsg> &msgs, unsigned max_batch) {
+    while (!state.received.empty() && msgs.size() < max_batch) {
+        CecBusMsg cec_msg = { };
+        _parse_msg(state.received.front(), &cec_msg);
+        state.received.pop_front();
+        msgs.push_back(cec_msg);
+    }
+
+    if (state.received.empty()) {
+        __u64 count;
+        ssize_t res = read(state.wake, &count, sizeof(count));
+        (void)res;  // EAGAIN when it was not signaled
+    }
+}
+
+// Wait for the adapter, or for the messages handed back by a pipelined
+// transmit. The adapter is polled again with `rx_lock` held, a pipelined
+// transmit may have read what woke us up.
+static void _wait_cec_or_wake(const int fd, const int wake, int timeout_ms) {
+    struct pollfd pfds[2] = { { fd, POLLIN | POLLPRI, 0 }, { wake, POLLIN, 0 } };
+    poll(pfds, 2, timeout_ms);
+}
+
+CecBusMsg get_msg(CecRef *cec) {
+    CecBusMsg cec_msg = { };
+    auto state = _fd_state(cec->fd);
+    _wait_cec_or_wake(cec->fd, state->wake, 1000);
+    std::lock_guard<std::mutex> lock(state->rx_lock);
+    std::vector<CecBusMsg> received = {};
+    _take_received(*state, received, 1);
+    if (!received.empty()) {
+        return received[0];
+    }
+
+    short revents = _poll_cec(cec->fd, 0);
+    if (revents & POLLPRI) {
+        if (!_read_event(cec->fd, &cec_msg)) {
             return cec_msg;
         }
+    }
 
-        cec_msg.has_event = true;
-        cec_msg.lost_events = (ev.flags & CEC_EVENT_FL_DROPPED_EVENTS);
-        cec_msg.initial_state = (ev.flags & CEC_EVENT_FL_INITIAL_STATE);
-        if (ev.event == CEC_EVENT_STATE_CHANGE) {
-            cec_msg.state_change = true;
-            cec_msg.state_change_phys_addr = ev.state_change.phys_addr;
-        }
+    if (revents & (POLLIN | POLLERR | POLLHUP)) {
+        _read_msg(cec->fd, &cec_msg);
     }
 
-    if (FD_ISSET(cec->fd, &rd_fds)) {
-        struct cec_msg msg = { };
-        int res = _io_ctl(cec->fd, CEC_RECEIVE, &msg);
-        if (res == ENODEV) {
-            cec_msg.disconnected = true;
+    return cec_msg;
+}
+
+std::vector<CecBusMsg> get_msgs(CecRef *cec, int timeout_ms, unsigned max_batch) {
+    std::vector<CecBusMsg> msgs = {};
+    if (cec == nullptr || !cec->isOpen()) {
+        return msgs;
+    }
+
+    // wait once, then drain whatever is queued without blocking again
+    auto state = _fd_state(cec->fd);
+    _wait_cec_or_wake(cec->fd, state->wake, timeout_ms);
+    // a non-blocking read (an event loop) does not wait for a pipelined
+    // transmit, the wake fd is signaled with what the transmit reads
+    std::unique_lock<std::mutex> lock(state->rx_lock, std::defer_lock);
+    if (timeout_ms != 0) {
+        lock.lock();
+    } else if (!lock.try_lock()) {
+        return msgs;
+    }
+
+    _take_received(*state, msgs, max_batch);
+    short revents = _poll_cec(cec->fd, 0);
+    while (revents && msgs.size() < max_batch) {
+        if (revents & POLLPRI) {
+            CecBusMsg cec_msg = { };
+            if (_read_event(cec->fd, &cec_msg)) {
+                msgs.push_back(cec_msg);
+            }
         }
-        else if (!res) {
-            bool transmitted = msg.tx_status != 0;
-            cec_msg.msg = msg.len > 1;
-            cec_msg.msg_from = cec_msg_initiator(&msg);
-            cec_msg.msg_to = cec_msg_destination(&msg);
-            cec_msg.msg_transmitted = transmitted;
-            cec_msg.msg_status = transmitted ? msg.tx_status : msg.rx_status;
-            cec_msg.msg_code = msg.msg[1];
-            switch (msg.msg[1]) {
-                case CEC_MSG_SET_STREAM_PATH:
-                    cec_ops_set_stream_path(&msg, &pa);
-                    cec_msg.msg_address = pa;
-                    break;
-                case CEC_MSG_USER_CONTROL_PRESSED:
-                    cec_msg.msg_cmd = msg.msg[2];
-                    break;
-                case CEC_MSG_ACTIVE_SOURCE:
-                    cec_ops_active_source(&msg, &pa);
-                    cec_msg.msg_address = pa;
+
+        if ((revents & (POLLIN | POLLERR | POLLHUP)) && msgs.size() < max_batch) {
+            CecBusMsg cec_msg = { };
+            if (_read_msg(cec->fd, &cec_msg)) {
+                msgs.push_back(cec_msg);
+                if (cec_msg.disconnected) {
                     break;
+                }
             }
         }
+
+        revents = _poll_cec(cec->fd, 0);
     }
 
-    return cec_msg;
+    return msgs;
+}
+
+CecHistoryBuffer::CecHistoryBuffer(size_t capacity)
+    : capacity(std::max<size_t>(capacity, 1)),
+      ts(this->capacity), from(this->capacity), to(this->capacity), code(this->capacity),
+      status(this->capacity), flags(this->capacity), len(this->capacity),
+      frames(this->capacity * CEC_MAX_MSG_SIZE) {
+}
+
+void CecHistoryBuffer::append(const CecBusMsg &msg) {
+    if (!msg.msg) {
+        return;  // events are not kept
+    }
+
+    size_t i = head;
+    ts[i] = msg.msg_transmitted ? msg.tx_ts : msg.rx_ts;
+    from[i] = msg.msg_from;
+    to[i] = msg.msg_to;
+    code[i] = msg.msg_code;
+    status[i] = msg.msg_status;
+    flags[i] = msg.msg_transmitted ? CEC_HISTORY_TRANSMITTED : 0;
+    len[i] = msg.len;
+    memcpy(&frames[i * CEC_MAX_MSG_SIZE], msg.frame, CEC_MAX_MSG_SIZE);
+    head = (head + 1) % capacity;
+    count = std::min(count + 1, capacity);
+    total++;
+}
+
+void CecHistoryBuffer::clear() {
+    head = 0;
+    count = 0;
+}
+
+int watch_cec_devices() {
+    int fd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC);
+    if (fd < 0) {
+        return -1;
+    }
+
+    // udev creates the node first and sets its permissions after (IN_ATTRIB)
+    __u32 mask = IN_CREATE | IN_ATTRIB | IN_DELETE | IN_MOVED_TO | IN_MOVED_FROM;
+    if (inotify_add_watch(fd, "/dev", mask) < 0) {
+        close(fd);
+        return -1;
+    }
+
+    return fd;
+}
+
+std::vector<CecDeviceEvent> read_cec_device_events(int fd) {
+    std::vector<CecDeviceEvent> events = {};
+    alignas(struct inotify_event) char buf[4096];
+    ssize_t len;
+    while ((len = read(fd, buf, sizeof(buf))) > 0) {
+        for (char *ptr = buf; ptr < buf + len;) {
+            auto *ev = reinterpret_cast<struct inotify_event *>(ptr);
+            ptr += sizeof(struct inotify_event) + ev->len;
+            if (ev->len == 0 || strncmp(ev->name, "cec", 3) != 0) {
+                continue;
+            }
+
+            bool added = ev->mask & (IN_CREATE | IN_ATTRIB | IN_MOVED_TO);
+            events.push_back({ std::string("/dev/") + ev->name, added });
+        }
+    }
+
+    return events;
+}
+
+void unwatch_cec_devices(int fd) {
+    if (fd >= 0) {
+        close(fd);
+    }
 }
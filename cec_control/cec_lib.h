@@ -1,5 +1,7 @@
 #include <pybind11/stl.h>
 #include <pybind11/pybind11.h>
+#include <linux/cec.h>
+#include <optional>
 
 #ifndef EXTENSION_H
 #define EXTENSION_H
@@ -18,6 +20,8 @@ struct CecInfo {
 
 struct CecRef {
     int fd;
+    // readable while messages read by a pipelined transmit wait for get_msgs
+    int wake_fd = -1;
     CecInfo info;
 
     bool can_transmit = false;
@@ -36,23 +40,114 @@ struct CecNetworkDevice {
     bool active;
 };
 
+#define CEC_INFO_OSD_NAME 1
+#define CEC_INFO_PHYS_ADDR 2
+#define CEC_INFO_VENDOR_ID 4
+#define CEC_INFO_POWER_STATUS 8
+#define CEC_INFO_ALL 15
+
+struct CecDeviceInfo {
+    unsigned fields;
+    std::string osd_name;
+    unsigned short phys_addr;
+    unsigned char prim_devtype;
+    unsigned vendor_id;
+    unsigned char power_status;
+};
+
 struct CecBusMsg {
     bool has_event;
     bool initial_state;
     bool state_change;
     unsigned state_change_phys_addr;
     bool lost_events;
+    __u32 lost_msgs;
     bool msg;
     __u8 msg_from;
     __u8 msg_to;
     __u8 msg_status;
     __u8 msg_code;
-    __u8 msg_address;
+    __u16 msg_address;
     __u8 msg_cmd;
+    __u32 msg_vendor_id;
+    std::string msg_osd_name;
+    __u8 frame[CEC_MAX_MSG_SIZE];
+    __u32 len;
+    __u64 rx_ts;
+    __u64 tx_ts;
+    __u32 sequence;
     bool msg_transmitted;
     bool disconnected;
 };
 
+// How a frame is sent: a rejected transmit (the logical address is not
+// claimed yet, the transmit queue is full) is retried with an exponential
+// backoff until `retries` or the deadline, whichever comes first.
+struct CecTransmitPolicy {
+    unsigned retries = 10;
+    unsigned backoff_ms = 10;
+    unsigned max_backoff_ms = 200;
+    unsigned deadline_ms = 1000;
+    unsigned reply_timeout_ms = 1000;  // the cec_msg timeout of a request
+};
+
+struct CecTransmitResult {
+    bool ok;  // acked, and replied when a reply was requested
+    int error;  // errno of the last CEC_TRANSMIT
+    __u8 tx_status;
+    __u8 rx_status;
+    unsigned attempts;
+    double elapsed;  // seconds, retries included
+    __u8 reply[CEC_MAX_MSG_SIZE];
+    __u32 reply_len;
+};
+
+#define CEC_HISTORY_TRANSMITTED 1
+
+// The last `capacity` messages in fixed arrays (a struct of arrays), so a
+// long history costs 31 bytes per message and no Python object. `head` is
+// the slot written next, the oldest message once the buffer is full.
+struct CecHistoryBuffer {
+    size_t capacity;
+    size_t head = 0;
+    size_t count = 0;
+    __u64 total = 0;
+    std::vector<__u64> ts;  // rx_ts or tx_ts (ns, monotonic)
+    std::vector<__u8> from;
+    std::vector<__u8> to;
+    std::vector<__u8> code;
+    std::vector<__u8> status;
+    std::vector<__u8> flags;
+    std::vector<__u8> len;
+    std::vector<__u8> frames;  // capacity x CEC_MAX_MSG_SIZE
+
+    explicit CecHistoryBuffer(size_t capacity);
+    void append(const CecBusMsg &msg);
+    void clear();
+};
+
+enum class CecHistoryField {
+    Timestamp,
+    From,
+    To,
+    Code,
+    Status,
+    Flags,
+    Length,
+    Frame
+};
+
+// A column of a history buffer, exposed with the buffer protocol.
+struct CecHistoryColumn {
+    CecHistoryBuffer *history;
+    CecHistoryField field;
+};
+
+struct CecDeviceEvent {
+    std::string path;
+    bool added;
+};
+
 enum class CecDeviceType {
     Unregistered,
     TV,
@@ -69,17 +164,26 @@ CecRef open_cec(std::string device_path);
 bool set_logical_address(CecRef *cec, CecDeviceType type);
 bool update_logical_address_info(CecRef *ref);
 CecNetworkDevice create_net_device(CecRef *cec, __u8 log_addr);
-std::vector<CecNetworkDevice> detect_devices(CecRef *cec);
+std::vector<CecNetworkDevice> detect_devices(CecRef *cec, unsigned short mask, int timeout_ms);
 __u16 get_net_dev_physical_addr(CecNetworkDevice *dev);
 __u32 get_net_device_vendor_id(CecNetworkDevice *dev);
 std::string get_net_device_osd_name(CecNetworkDevice *dev);
 __u8 get_device_power_status(CecNetworkDevice *dev);
+CecDeviceInfo query_device_info(CecNetworkDevice *dev, unsigned fields, int timeout_ms);
 bool ping_net_dev(CecNetworkDevice *dev);
 bool send_msg_report_power_status(CecNetworkDevice *dev);
 bool send_msg_set_stream_path(CecNetworkDevice *dev, __u16 phys_addr);
 bool send_msg_request_active_source(CecNetworkDevice *dev);
+bool send_msg_give_device_power_status(CecNetworkDevice *dev);
 bool send_msg_active_source(CecNetworkDevice *dev, __u16 phys_addr);
+CecTransmitPolicy get_transmit_policy();
+void set_transmit_policy(CecTransmitPolicy policy);
+CecTransmitResult transmit_msg(CecNetworkDevice *dev, std::string data, __u8 reply, std::optional<CecTransmitPolicy> policy);
 bool get_msg_init(CecRef *cec);
 CecBusMsg get_msg(CecRef *cec);
+std::vector<CecBusMsg> get_msgs(CecRef *cec, int timeout_ms, unsigned max_batch);
+int watch_cec_devices();
+std::vector<CecDeviceEvent> read_cec_device_events(int fd);
+void unwatch_cec_devices(int fd);
 
 #endif
\ No newline at end of file
@@ -1,6 +1,6 @@
 # cspell:ignore Denon, Marantz, Onkyo, Akai, Kardon, Benq, Daewoo, Grundig, Harman, Vizio
 
-from enum import Enum
+from enum import Enum, IntFlag
 from typing import Protocol
 
 
@@ -41,6 +41,23 @@ class CecPowerState(Enum):
     ToStandBy = 3
 
 
+class CecDeviceInfoField(IntFlag):
+    OsdName = 1
+    PhysicalAddress = 2
+    VendorId = 4
+    PowerStatus = 8
+    All = 15
+
+
+class CecDestination(IntFlag):
+    """Which destinations of a message a handler is called for."""
+
+    Local = 1  # directed to the adapter logical address
+    Broadcast = 2
+    Other = 4  # directed to another device (seen in monitor mode only)
+    Any = 7
+
+
 class CecMessageRxStatus(Enum):
     Unknown = 0
     Ok = 1
@@ -112,7 +129,7 @@ class CecMessageType(Enum):
     GiveDevicePowerStatus = 143
     GetMenuLanguage = 145
     GiveFeatures = 165
-    GiveOsdName = 370
+    GiveOsdName = 0x46  # 70
     UserControlPressed = 0x44  # 68
     UserControlReleased = 0x45  # 69
 
@@ -120,6 +137,73 @@ class CecMessageType(Enum):
     SetStreamPath = 134
     ReportPowerStatus = 144
     ActiveSource = 130
+    Standby = 0x36  # 54
+    RoutingChange = 0x80  # 128
+    SetOsdName = 0x47  # 71
+    DeviceVendorId = 0x87  # 135
+
+    ImageViewOn = 0x04
+    TunerStepIncrement = 0x05
+    TunerStepDecrement = 0x06
+    TunerDeviceStatus = 0x07
+    RecordOn = 0x09
+    RecordStatus = 0x0A
+    RecordOff = 0x0B
+    TextViewOn = 0x0D
+    RecordTvScreen = 0x0F
+    DeckStatus = 0x1B
+    SetMenuLanguage = 0x32
+    ClearAnalogueTimer = 0x33
+    SetAnalogueTimer = 0x34
+    TimerStatus = 0x35
+    Play = 0x41
+    DeckControl = 0x42
+    TimerClearedStatus = 0x43
+    SetOsdString = 0x64
+    SetTimerProgramTitle = 0x67
+    SystemAudioModeRequest = 0x70
+    SetSystemAudioMode = 0x72
+    SetAudioVolumeLevel = 0x73
+    ReportAudioStatus = 0x7A
+    SystemAudioModeStatus = 0x7E
+    RoutingInformation = 0x81
+    RequestActiveSource = 0x85
+    VendorCommand = 0x89
+    VendorRemoteButtonDown = 0x8A
+    VendorRemoteButtonUp = 0x8B
+    MenuRequest = 0x8D
+    MenuStatus = 0x8E
+    SelectAnalogueService = 0x92
+    SelectDigitalService = 0x93
+    SetDigitalTimer = 0x97
+    ClearDigitalTimer = 0x99
+    SetAudioRate = 0x9A
+    InactiveSource = 0x9D
+    CecVersion = 0x9E
+    GetCecVersion = 0x9F
+    VendorCommandWithId = 0xA0
+    ClearExtTimer = 0xA1
+    SetExtTimer = 0xA2
+    ReportShortAudioDescriptor = 0xA3
+    RequestShortAudioDescriptor = 0xA4
+    ReportFeatures = 0xA6
+    RequestCurrentLatency = 0xA7
+    ReportCurrentLatency = 0xA8
+    InitiateArc = 0xC0
+    ReportArcInitiated = 0xC1
+    ReportArcTerminated = 0xC2
+    RequestArcInitiation = 0xC3
+    RequestArcTermination = 0xC4
+    TerminateArc = 0xC5
+    CdcMessage = 0xF8
+    Abort = 0xFF
+
+
+# CecMessageType by opcode, so a received code is converted without a lookup
+MESSAGE_TYPES: list[CecMessageType] = [
+    CecMessageType._value2member_map_.get(code, CecMessageType.Unknown)
+    for code in range(256)
+]
 
 
 class CecMessage(Protocol):
@@ -128,6 +212,7 @@ class CecMessage(Protocol):
     state_change: bool
     state_change_phys_addr: int
     lost_events: int
+    lost_messages: int
     has_message: bool
     message_from: int
     message_to: int
@@ -135,6 +220,13 @@ class CecMessage(Protocol):
     message_code: int
     message_address: int
     message_command: int
+    message_vendor_id: int
+    message_osd_name: str
+    frame: memoryview
+    length: int
+    rx_ts: int
+    tx_ts: int
+    sequence: int
     message_transmitted: bool
     disconnected: bool
 
@@ -152,16 +244,66 @@ class CecInfo(Protocol):
 
 
 class CecRef(Protocol):
+    fd: int
+    wake_fd: int
     can_transmit: bool
     can_set_logical_address: bool
     info: CecInfo
 
 
+class CecDeviceInfo(Protocol):
+    fields: int
+    osd_name: str
+    physical_address: int
+    primary_device_type: int
+    vendor_id: int
+    power_status: int
+
+
 class CecNetworkDevice(Protocol):
+    fd: int
     device_id: int
     source_phys_addr: int
 
 
+class CecTransmitPolicy(Protocol):
+    retries: int
+    backoff_ms: int
+    max_backoff_ms: int
+    deadline_ms: int
+    reply_timeout_ms: int
+
+
+class CecTransmitResult(Protocol):
+    ok: bool
+    error: int
+    tx_status: int
+    rx_status: int
+    attempts: int
+    elapsed: float
+    reply: bytes
+
+
+class CecHistoryBuffer(Protocol):
+    capacity: int
+    head: int
+    count: int
+    total: int
+    timestamps: memoryview
+    sources: memoryview
+    destinations: memoryview
+    opcodes: memoryview
+    statuses: memoryview
+    flags: memoryview
+    lengths: memoryview
+    frames: memoryview  # capacity x 16
+
+
+class CecDeviceEvent(Protocol):
+    path: str
+    added: bool
+
+
 VENDORS = dict(
     {
         0x000039: "Toshiba",
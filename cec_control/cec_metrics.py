@@ -0,0 +1,315 @@
+"""Opt-in counters and latency histograms of the CEC traffic.
+
+Metrics are enabled by wrapping the backend with `CecMetricsLib`, the
+controllers of a `Cec` opened with it record the received messages, the
+transmit reports and the handler times. Nothing is recorded (or checked per
+message) without it::
+
+    metrics = CecMetrics()
+    cec = Cec("/dev/cec0", CecMetricsLib(cec_lib, metrics))
+    metrics.serve(9464)  # http://127.0.0.1:9464/metrics
+"""
+
+import bisect
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .cec_lib_types import MESSAGE_TYPES, CecMessage, CecMessageTxStatus, CecMessageType
+
+logger = logging.getLogger(__name__)
+
+# seconds, a transmit takes 25-100 ms on the wire and a reply up to 1 s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+HANDLER_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+# the opcode sent by the transmit functions of `cec_lib`
+TRANSMITS = {
+    "send_msg_set_stream_path": CecMessageType.SetStreamPath,
+    "send_msg_active_source": CecMessageType.ActiveSource,
+    "send_msg_request_active_source": CecMessageType.RequestActiveSource,
+    "send_msg_give_device_power_status": CecMessageType.GiveDevicePowerStatus,
+    "send_msg_report_power_status": CecMessageType.ReportPowerStatus,
+}
+
+# the opcode sent by the functions that wait for a reply
+REQUESTS = {
+    "get_net_dev_physical_addr": CecMessageType.GivePhysicalAddress,
+    "get_net_device_vendor_id": CecMessageType.GiveDeviceVendorId,
+    "get_net_device_osd_name": CecMessageType.GiveOsdName,
+    "get_device_power_status": CecMessageType.GiveDevicePowerStatus,
+    "query_device_info": None,  # several requests at once
+    "ping_net_dev": None,  # a poll message, no opcode
+    "detect_devices": None,
+}
+
+TX_STATUSES = [s for s in CecMessageTxStatus if s != CecMessageTxStatus.Unknown]
+
+
+class Histogram:
+    """A cumulative histogram with fixed upper bounds (Prometheus style)."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+
+        cumulative, acc = {}, 0
+        for bound, n in zip((*self.buckets, float("inf")), counts):
+            acc += n
+            cumulative[bound] = acc
+
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+class CecMetrics:
+    """The counters and histograms, shared by the lib and the controllers."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.rx = [0] * 256  # received messages by opcode
+        self.tx = [0] * 256  # transmits (requests included) by opcode
+        self.tx_failed = [0] * 256  # transmits the lib reported as failed
+        # by transmit status bit, of the reports and the `transmit_msg` results
+        # (the `send_msg_*` functions return only if they succeeded)
+        self.tx_status = {s: 0 for s in TX_STATUSES}
+        self.lost_events = 0
+        self.lost_messages = 0
+        self.transmit = {}  # Histogram by lib function
+        self.request = {}  # Histogram by lib function
+        # Histogram by message type, of the handlers registered for the type
+        # (timed together, the loop handler is not)
+        self.handler = {}
+        # the `CecHandlerPool`s, for their queue depth and overflow
+        self.handler_pools = []
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    def received(self, msgs: list[CecMessage]):
+        """Count a batch read from the adapter."""
+        with self._lock:
+            for msg in msgs:
+                if msg.has_message:
+                    if msg.message_transmitted:
+                        self._count_tx_status(msg.message_status)
+                    else:
+                        self.rx[msg.message_code] += 1
+                elif msg.has_event:
+                    if msg.lost_events:
+                        self.lost_events += 1
+                    self.lost_messages += msg.lost_messages
+
+    def transmitted(
+        self, fn: str, code: int, ok: bool, sec: float, tx_status: int | None = None
+    ):
+        """A transmit, `tx_status` is the status of its result (if any)."""
+        self._histogram(self.transmit, fn, LATENCY_BUCKETS).observe(sec)
+        with self._lock:
+            self.tx[code] += 1
+            if not ok:
+                self.tx_failed[code] += 1
+            if tx_status is not None:
+                self._count_tx_status(tx_status)
+
+    def requested(self, fn: str, code: int | None, sec: float):
+        """A request and its reply (there is no failure value to count)."""
+        self._histogram(self.request, fn, LATENCY_BUCKETS).observe(sec)
+        if code is not None:
+            with self._lock:
+                self.tx[code] += 1
+
+    def handled(self, type: CecMessageType, sec: float):
+        self._histogram(self.handler, type.name, HANDLER_BUCKETS).observe(sec)
+
+    def snapshot(self) -> dict:
+        def by_opcode(counts: list[int]) -> dict[int, int]:
+            return {code: n for code, n in enumerate(counts) if n}
+
+        def histograms(items: dict[str, Histogram]) -> dict[str, dict]:
+            return {name: h.snapshot() for name, h in list(items.items())}
+
+        with self._lock:
+            counts = {
+                "rx": by_opcode(self.rx),
+                "tx": by_opcode(self.tx),
+                "tx_failed": by_opcode(self.tx_failed),
+                "tx_status": {s.name: n for s, n in self.tx_status.items()},
+                "lost_events": self.lost_events,
+                "lost_messages": self.lost_messages,
+            }
+
+        return {
+            "uptime": time.time() - self.started,
+            **counts,
+            "transmit_seconds": histograms(self.transmit),
+            "request_seconds": histograms(self.request),
+            "handler_seconds": histograms(self.handler),
+            "handler_queue_depth": sum(p.depth for p in list(self.handler_pools)),
+            "handler_queue_overflow": sum(p.overflow for p in list(self.handler_pools)),
+        }
+
+    def to_prometheus(self) -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+
+        def metric(name: str, type: str, help: str):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+
+        def opcodes(name: str, counts: dict[int, int]):
+            for code, n in counts.items():
+                type = MESSAGE_TYPES[code].name
+                lines.append(f'{name}{{opcode="0x{code:02x}",type="{type}"}} {n}')
+
+        metric("cec_rx_messages_total", "counter", "Received messages by opcode")
+        opcodes("cec_rx_messages_total", snap["rx"])
+        metric("cec_tx_messages_total", "counter", "Transmitted messages by opcode")
+        opcodes("cec_tx_messages_total", snap["tx"])
+        metric("cec_tx_failed_total", "counter", "Failed transmits by opcode")
+        opcodes("cec_tx_failed_total", snap["tx_failed"])
+        metric("cec_tx_status_total", "counter", "Transmit reports by status bit")
+        for status, n in snap["tx_status"].items():
+            lines.append(f'cec_tx_status_total{{status="{status}"}} {n}')
+        metric("cec_lost_events_total", "counter", "Events the kernel dropped")
+        lines.append(f"cec_lost_events_total {snap['lost_events']}")
+        metric("cec_lost_messages_total", "counter", "Messages the kernel dropped")
+        lines.append(f"cec_lost_messages_total {snap['lost_messages']}")
+        metric("cec_handler_queue_depth", "gauge", "Handlers queued for the workers")
+        lines.append(f"cec_handler_queue_depth {snap['handler_queue_depth']}")
+        metric("cec_handler_queue_overflow_total", "counter", "Handlers dropped")
+        lines.append(
+            f"cec_handler_queue_overflow_total {snap['handler_queue_overflow']}"
+        )
+
+        for name, key, label, help in (
+            ("cec_transmit_seconds", "transmit_seconds", "function", "Transmit time"),
+            ("cec_request_seconds", "request_seconds", "function", "Request to reply"),
+            ("cec_handler_seconds", "handler_seconds", "type", "Handler run time"),
+        ):
+            metric(name, "histogram", help)
+            for value, h in snap[key].items():
+                for bound, n in h["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{{label}="{value}",le="{le}"}} {n}')
+                lines.append(f'{name}_sum{{{label}="{value}"}} {h["sum"]}')
+                lines.append(f'{name}_count{{{label}="{value}"}} {h["count"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host="127.0.0.1") -> ThreadingHTTPServer:
+        """Serve `/metrics` (Prometheus text) from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("metrics: " + format, *args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _count_tx_status(self, status: int):
+        for s in TX_STATUSES:
+            if status & s.value:
+                self.tx_status[s] += 1
+
+    def _histogram(self, items: dict, name: str, buckets) -> Histogram:
+        histogram = items.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = items.setdefault(name, Histogram(buckets))
+
+        return histogram
+
+
+class CecMetricsLib:
+    """A `cec_lib` backend that records the metrics of another one.
+
+    The transmit and request functions are timed, every other function is
+    the wrapped one.
+    """
+
+    def __init__(self, lib, metrics: CecMetrics | None = None):
+        self.lib = lib
+        self.metrics = CecMetrics() if metrics is None else metrics
+        for name, type in TRANSMITS.items():
+            setattr(self, name, self._transmit(name, type.value))
+        for name, type in REQUESTS.items():
+            setattr(self, name, self._request(name, type))
+        self.transmit_msg = self._transmit_msg(self.lib.transmit_msg)
+
+    def __getattr__(self, name: str):
+        return getattr(self.lib, name)
+
+    def _transmit(self, name: str, code: int):
+        fn = getattr(self.lib, name)
+        metrics = self.metrics
+
+        def timed_fn(*args, **kwargs):
+            start = time.perf_counter()
+            ok = fn(*args, **kwargs)
+            metrics.transmitted(name, code, bool(ok), time.perf_counter() - start)
+            return ok
+
+        return timed_fn
+
+    def _transmit_msg(self, fn):
+        metrics = self.metrics
+
+        def timed_fn(dev, data: bytes, *args, **kwargs):
+            result = fn(dev, data, *args, **kwargs)
+            metrics.transmitted(
+                "transmit_msg", data[0], result.ok, result.elapsed, result.tx_status
+            )
+            return result
+
+        return timed_fn
+
+    def _request(self, name: str, type: CecMessageType | None):
+        fn = getattr(self.lib, name)
+        code = None if type is None else type.value
+        metrics = self.metrics
+
+        def timed_fn(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            metrics.requested(name, code, time.perf_counter() - start)
+            return result
+
+        return timed_fn
@@ -0,0 +1,205 @@
+import logging
+import select
+from collections.abc import Callable
+
+from cec_control._utils import CancellationToken, Wait
+
+from .cec import RECEIVE_TIMEOUT_MS, Cec, CecController
+from .cec_hotplug import CecHotplugWatcher
+from .cec_lib_types import CecDeviceType, CecMessage, CecMessageType
+
+logger = logging.getLogger(__name__)
+
+TAdapterHandler = Callable[[str, CecMessage, CecMessageType], bool | None]
+
+
+class CecMonitor:
+    """Serve every CEC adapter from one thread.
+
+    Each adapter keeps its own `CecController` (handlers, listeners, session)
+    and all the adapter fds (and their `wake_fd`, readable with the messages
+    read by a pipelined transmit) are watched by one epoll set. A readable
+    adapter is drained without blocking, so a quiet adapter never delays a busy one.
+    The loop handler gets the adapter path with every message.
+
+    With a `hotplug` watcher (polled by the same epoll set) a disconnected
+    adapter is reopened in place when it is plugged again, its controller
+    and handlers are kept. Without it, the adapter is dropped.
+
+    The monitor owns the adapters added to it and the watcher, and closes
+    them on `close`.
+    """
+
+    def __init__(
+        self,
+        token: CancellationToken = None,
+        hotplug: CecHotplugWatcher | None = None,
+    ):
+        self.token = token if token is not None else CancellationToken()
+        self._epoll = select.epoll()
+        # (adapter, controller) by fd
+        self._adapters: dict[int, tuple[Cec, CecController]] = {}
+        # the adapter fd by wake fd
+        self._wakes: dict[int, int] = {}
+        # disconnected adapters waiting to be plugged again, by path
+        self._unplugged: dict[str, tuple[Cec, CecController]] = {}
+        self._hotplug = hotplug
+        if hotplug is not None and hotplug.active:
+            self._epoll.register(hotplug.fd, select.EPOLLIN)
+
+    @staticmethod
+    def open_all(
+        cec_type: CecDeviceType, lib=None, token=None, hotplug=True
+    ) -> "CecMonitor":
+        """Open every adapter, register it as `cec_type` and monitor it."""
+        monitor = CecMonitor(token, CecHotplugWatcher(lib) if hotplug else None)
+        for cec in Cec.find_cec_devices(lib):
+            cec.open()
+            if not cec.is_active_cec:
+                cec.close()
+                continue
+
+            if not cec.is_registered and not cec.set_type(cec_type):
+                logger.error("Failed to register %s as CEC device", cec)
+                cec.close()
+                continue
+
+            if monitor.add(cec) is None:
+                cec.close()
+
+        return monitor
+
+    @property
+    def paths(self) -> list[str]:
+        return [cec.path for cec, _ in self._adapters.values()]
+
+    def add(self, cec: Cec) -> CecController | None:
+        """Start monitoring an opened adapter, returns its controller."""
+        if not cec.opened or not cec.session().start():
+            logger.error("Unable to monitor %s", cec)
+            return None
+
+        ctl = CecController(cec, self.token)
+        self._register(cec, ctl)
+        logger.info("Monitoring %s", cec)
+        return ctl
+
+    def remove(self, path: str) -> Cec | None:
+        """Stop monitoring an adapter, it is returned still opened."""
+        for fd, (cec, _) in self._adapters.items():
+            if cec.path == path:
+                self._epoll.unregister(fd)
+                del self._adapters[fd]
+                for wake, adapter_fd in list(self._wakes.items()):
+                    if adapter_fd == fd:
+                        self._epoll.unregister(wake)
+                        del self._wakes[wake]
+                return cec
+
+        return None
+
+    def controller(self, path: str) -> CecController | None:
+        for cec, ctl in self._adapters.values():
+            if cec.path == path:
+                return ctl
+
+        return None
+
+    def adapter(self, path: str) -> Cec | None:
+        for cec, _ in self._adapters.values():
+            if cec.path == path:
+                return cec
+
+        return None
+
+    def wait_for_cec_message(
+        self,
+        seconds: int,
+        handler: TAdapterHandler,
+        show=False,
+        all_msgs=False,
+    ) -> tuple[str, CecMessage] | None:
+        """Receive from all adapters until `handler` (or a controller handler)
+        returns True, return the adapter path and the message."""
+        # the handler of each adapter with its path bound, a reopened adapter
+        # has a new fd
+        handlers = {}
+        c = Wait(seconds)
+        while self.token.is_running and c.waiting and self._watching:
+            # messages left by a handler that stopped the loop come first
+            fds = [fd for fd, (_, ctl) in self._adapters.items() if ctl._pending]
+            timeout = 0 if fds else min(RECEIVE_TIMEOUT_MS / 1000, c.remaining)
+            for fd, _ in self._epoll.poll(max(timeout, 0)):
+                fd = self._wakes.get(fd, fd)
+                if fd not in fds:
+                    fds.append(fd)
+            for fd in fds:
+                entry = self._adapters.get(fd)
+                if entry is None:
+                    if self._hotplug is not None and fd == self._hotplug.fd:
+                        self._replug()
+                    continue
+
+                cec, ctl = entry
+                fn = handlers.get(cec.path)
+                if fn is None:
+                    fn = handlers[cec.path] = self._bind(cec.path, handler)
+
+                msg = ctl._process(ctl._receive(0), c, fn, show, all_msgs)
+                if msg is None:
+                    continue
+
+                if not msg.disconnected:
+                    return cec.path, msg
+
+                # the fd stays readable until the adapter is closed
+                self.remove(cec.path)
+                cec.close()
+                if self._hotplug is not None:
+                    self._unplugged[cec.path] = (cec, ctl)
+
+        return None
+
+    def close(self):
+        for cec, _ in [*self._adapters.values(), *self._unplugged.values()]:
+            self.remove(cec.path)
+            cec.close()
+
+        self._unplugged.clear()
+        if self._hotplug is not None:
+            self._hotplug.close()
+
+        self._epoll.close()
+
+    @property
+    def _watching(self) -> bool:
+        return bool(self._adapters) or bool(self._unplugged)
+
+    def _register(self, cec: Cec, ctl: CecController):
+        self._epoll.register(cec._ref.fd, select.EPOLLIN | select.EPOLLPRI)
+        self._adapters[cec._ref.fd] = (cec, ctl)
+        if cec._ref.wake_fd >= 0:
+            self._epoll.register(cec._ref.wake_fd, select.EPOLLIN)
+            self._wakes[cec._ref.wake_fd] = cec._ref.fd
+
+    def _replug(self):
+        for ev in self._hotplug.read():
+            entry = self._unplugged.get(ev.path)
+            if not ev.added or entry is None:
+                continue
+
+            cec, ctl = entry
+            if cec.reopen() and cec.session().start():
+                del self._unplugged[ev.path]
+                ctl.reset(cec)
+                self._register(cec, ctl)
+                logger.info("CEC device %s reconnected", cec)
+
+    def _bind(self, path: str, handler: TAdapterHandler):
+        return lambda msg, type: handler(path, msg, type)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,101 @@
+import logging
+
+from cec_control._utils import Time, to_enum
+
+from .cec import CecDevice
+from .cec_lib_types import CecMessage, CecMessageType, CecPowerState
+
+logger = logging.getLogger(__name__)
+
+
+class CecPowerTracker:
+    """Track the power state of a device from the bus traffic.
+
+    The state is updated from unsolicited REPORT_POWER_STATUS, STANDBY,
+    ROUTING_CHANGE and ACTIVE_SOURCE messages. The device is polled with
+    GIVE_DEVICE_POWER_STATUS only when it has been silent, and the polling
+    interval doubles (up to `max_poll_sec`) while the state does not change.
+    """
+
+    TYPES = (
+        CecMessageType.ReportPowerStatus,
+        CecMessageType.ActiveSource,
+        CecMessageType.Standby,
+        CecMessageType.RoutingChange,
+    )
+
+    def __init__(self, device: CecDevice, min_poll_sec=1.0, max_poll_sec=60.0):
+        self._device = device
+        self.state = CecPowerState.Unknown
+        self.min_poll_sec = min_poll_sec
+        self.max_poll_sec = max_poll_sec
+        self._poll_sec = min_poll_sec
+        self._next_poll = Time.ts()
+
+    @property
+    def is_power_on(self) -> bool:
+        return self.state == CecPowerState.On
+
+    @property
+    def poll_in(self) -> float:
+        """Seconds until the next fallback poll is due."""
+        return max(0.0, self._next_poll - Time.ts())
+
+    def update(self, msg: CecMessage, type: CecMessageType) -> bool:
+        """Update the state from a received message, return True if it changed."""
+        if not msg.has_message or msg.message_transmitted:
+            return False
+
+        from_device = msg.message_from == self._device.logical_address
+        match type:
+            case CecMessageType.ReportPowerStatus if from_device:
+                state = to_enum(
+                    msg.message_command, CecPowerState, CecPowerState.Unknown
+                )
+            case CecMessageType.Standby if from_device:
+                state = CecPowerState.StandBy
+            case CecMessageType.RoutingChange if from_device:
+                state = CecPowerState.On
+            case CecMessageType.ActiveSource if not self.is_power_on:
+                # a source asked for the screen (one touch play), confirm it
+                self._reset_poll(0)
+                return False
+            case _:
+                if from_device and not self.is_power_on:
+                    # the device is talking again, confirm it is waking up
+                    self._reset_poll(0)
+                return False
+
+        if self._set(state):
+            self._reset_poll()
+            return True
+
+        # the bus is not silent, postpone the poll without resetting the backoff
+        self._next_poll = Time.ts() + self._poll_sec
+        return False
+
+    def poll(self, force=False) -> CecPowerState:
+        """Query the device when the poll is due (or `force`d)."""
+        if not force and Time.ts() < self._next_poll:
+            return self.state
+
+        self._device.invalidate("power_status")
+        if self._set(self._device.power_state):
+            self._reset_poll()
+        else:
+            self._poll_sec = min(self._poll_sec * 2, self.max_poll_sec)
+            self._next_poll = Time.ts() + self._poll_sec
+
+        return self.state
+
+    def _reset_poll(self, delay: float | None = None):
+        self._poll_sec = self.min_poll_sec
+        self._next_poll = Time.ts() + (self._poll_sec if delay is None else delay)
+
+    def _set(self, state: CecPowerState) -> bool:
+        if state == self.state:
+            return False
+
+        logger.debug("Power state changed: %s -> %s", self.state, state)
+        self.state = state
+        return True
@@ -0,0 +1,265 @@
+"""Fan-out of the received bus messages to local subscriber processes.
+
+The daemon owns the adapter, other processes (a media center, a logger, a
+home automation bridge) subscribe to its traffic instead of opening the
+adapter again::
+
+    with CecSubscriber(opcodes=[CecMessageType.UserControlPressed]) as sub:
+        for msg in sub:
+            print(msg.message_command)
+
+A subscriber connects to a Unix SOCK_SEQPACKET socket and sends its filter,
+one packet of a 256 bit opcode mask (it can be sent again at any time). A
+message is packed once and sent to every subscriber it matches as one
+packet: the messages dropped before it (u32) and a capture record
+(`cec_capture.RECORD`).
+
+The sends never block the receive loop. A subscriber that does not read
+fills its socket buffer (`buffer` bytes), the next messages are dropped and
+counted until it catches up, the next delivered packet carries the count.
+"""
+
+import logging
+import os
+import selectors
+import socket
+import struct
+import threading
+from collections.abc import Iterable, Iterator
+
+from .cec_capture import RECORD, pack_msg, unpack_msg
+from .cec_lib_types import CecMessage, CecMessageType
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_PATH = "/run/cec-control/bus.sock"
+# the socket buffer of a subscriber, about a hundred messages
+SUBSCRIBER_BUFFER = 64 * 1024
+DROPPED = struct.Struct("<I")
+PACKET_SIZE = DROPPED.size + RECORD.size
+MASK_SIZE = 32
+ALL_OPCODES = range(256)
+
+
+def opcode_mask(opcodes: Iterable[CecMessageType | int]) -> bytes:
+    """The filter packet of the opcodes (a bit for each)."""
+    mask = 0
+    for code in opcodes:
+        mask |= 1 << int(code.value if isinstance(code, CecMessageType) else code)
+
+    return mask.to_bytes(MASK_SIZE, "little")
+
+
+class CecSubscription:
+    """A connected subscriber, its filter and its dropped messages."""
+
+    def __init__(self, sock: socket.socket, buffer: int):
+        self.sock = sock
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer)
+        # nothing until the subscriber sent its filter
+        self.opcodes = bytes(256)
+        self.dropped = 0
+        self._lost = 0
+
+    def set_filter(self, mask: bytes):
+        bits = int.from_bytes(mask[:MASK_SIZE], "little")
+        self.opcodes = bytes((bits >> code) & 1 for code in ALL_OPCODES)
+
+    def send(self, record: bytes) -> bool:
+        try:
+            self.sock.send(DROPPED.pack(self._lost) + record, socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            if not self._lost:
+                logger.warning("CEC subscriber %d is slow, dropping", self.fileno)
+            self._lost += 1
+            self.dropped += 1
+            return False
+        except OSError:
+            return False  # closed, removed by the publisher thread
+
+        self._lost = 0
+        return True
+
+    @property
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+
+class CecPublisher:
+    """Publish the received messages of a controller on a Unix socket.
+
+    Attach it as a listener (`controller.add_listener(publisher.publish)`),
+    a thread accepts the subscribers and reads their filters.
+    """
+
+    def __init__(self, path=PUBLISH_PATH, buffer=SUBSCRIBER_BUFFER):
+        self.path = path
+        self.buffer = buffer
+        self.published = 0
+        self.dropped = 0
+        # replaced (never mutated) on change, read by the receive loop
+        self.subscribers: tuple[CecSubscription, ...] = ()
+        self._sock: socket.socket | None = None
+        self._wake: tuple[socket.socket, socket.socket] | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "CecPublisher":
+        try:
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # left by a killed daemon
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            sock.bind(self.path)
+            sock.listen()
+            os.chmod(self.path, 0o660)
+        except OSError as e:
+            logger.error("Unable to publish the CEC messages on %s: %s", self.path, e)
+            return self
+
+        self._sock = sock
+        self._wake = socket.socketpair()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info("Publishing the CEC messages on %s", self.path)
+        return self
+
+    def close(self):
+        if self._thread is None:
+            return
+
+        self._wake[1].send(b"\0")
+        self._thread.join()
+        self._thread = None
+        for sock in (self._sock, *self._wake):
+            sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def publish(self, msg: CecMessage, type: CecMessageType):
+        """Send a received message to the subscribers of its opcode."""
+        if not msg.has_message or msg.message_transmitted:
+            return
+
+        code = msg.message_code
+        record = None
+        for sub in self.subscribers:
+            if sub.opcodes[code]:
+                if record is None:
+                    record = pack_msg(msg)
+                    self.published += 1
+                if not sub.send(record):
+                    self.dropped += 1
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run(self):
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._sock, selectors.EVENT_READ)
+            selector.register(self._wake[0], selectors.EVENT_READ)
+            subs: dict[int, CecSubscription] = {}
+            running = True
+            while running:
+                for key, _ in selector.select():
+                    if key.fileobj is self._wake[0]:
+                        running = False
+                    elif key.fileobj is self._sock:
+                        self._accept(selector, subs)
+                    else:
+                        self._read(selector, subs, key.fileobj)
+
+            for sub in subs.values():
+                sub.sock.close()
+            self.subscribers = ()
+
+    def _accept(self, selector, subs: dict[int, CecSubscription]):
+        try:
+            conn, _ = self._sock.accept()
+        except OSError as e:
+            logger.warning("Unable to accept a CEC subscriber: %s", e)
+            return
+
+        sub = CecSubscription(conn, self.buffer)
+        subs[sub.fileno] = sub
+        selector.register(conn, selectors.EVENT_READ)
+        logger.debug("CEC subscriber %d connected", sub.fileno)
+
+    def _read(self, selector, subs: dict[int, CecSubscription], conn):
+        sub = subs[conn.fileno()]
+        try:
+            mask = conn.recv(MASK_SIZE)
+        except OSError:
+            mask = b""
+
+        if mask:
+            sub.set_filter(mask)
+        else:
+            logger.debug("CEC subscriber %d disconnected", sub.fileno)
+            selector.unregister(conn)
+            del subs[sub.fileno]
+            conn.close()
+
+        self.subscribers = tuple(subs.values())
+
+
+class CecSubscriber:
+    """Receive the messages of a `CecPublisher`, of some opcodes (or all)."""
+
+    def __init__(
+        self,
+        path=PUBLISH_PATH,
+        opcodes: Iterable[CecMessageType | int] | None = None,
+    ):
+        self.path = path
+        self.dropped = 0
+        self._opcodes = ALL_OPCODES if opcodes is None else opcodes
+        self._sock: socket.socket | None = None
+
+    def open(self) -> "CecSubscriber":
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._sock.connect(self.path)
+        except OSError:
+            self.close()
+            raise
+
+        self.subscribe(self._opcodes)
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def subscribe(self, opcodes: Iterable[CecMessageType | int]):
+        """Replace the filter of the subscription."""
+        self._opcodes = opcodes
+        self._sock.send(opcode_mask(opcodes))
+
+    def receive(self, timeout: float | None = None) -> CecMessage | None:
+        """The next message, None on timeout or when the publisher closed."""
+        self._sock.settimeout(timeout)
+        try:
+            packet = self._sock.recv(PACKET_SIZE)
+        except TimeoutError:
+            return None
+
+        if len(packet) != PACKET_SIZE:
+            return None
+
+        (dropped,) = DROPPED.unpack_from(packet)
+        self.dropped += dropped
+        return unpack_msg(RECORD.unpack_from(packet, DROPPED.size))
+
+    def __iter__(self) -> Iterator[CecMessage]:
+        while (msg := self.receive()) is not None:
+            yield msg
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,98 @@
+from .cec import Cec, CecController, CecDevice
+from .cec_lib_types import (
+    CecMessage,
+    CecMessageType,
+    CecNetworkDeviceType,
+    CecPowerState,
+)
+
+
+class CecDeviceRegistry:
+    """The devices on the network by logical address, updated from the bus.
+
+    Device attributes never expire by time. They are replaced when the device
+    reports them (SET_OSD_NAME, REPORT_POWER_STATUS, REPORT_PHYSICAL_ADDR,
+    DEVICE_VENDOR_ID, STANDBY) and dropped when the adapter physical address
+    changes, so the bus is only queried on a real cache miss. An adapter that
+    is re-plugged at the same address keeps the cache, except the volatile
+    attributes.
+    """
+
+    def __init__(self, cec: Cec):
+        self._cec = cec
+        self._devices: dict[int, CecDevice] = {}
+        self._physical_address: int | None = None
+
+    def get(self, address: int | CecNetworkDeviceType) -> CecDevice | None:
+        if isinstance(address, CecNetworkDeviceType):
+            address = address.value
+
+        device = self._devices.get(address)
+        if device is None:
+            device = self._cec.create_device(CecNetworkDeviceType(address), ttl=None)
+            if device is not None:
+                self._devices[address] = device
+
+        return device
+
+    def devices(self) -> list[CecDevice]:
+        return list(self._devices.values())
+
+    def attach(self, controller: CecController):
+        controller.add_listener(self.update)
+
+    def rebind(self):
+        """Bind the devices to the reopened adapter, their cache is kept."""
+        for address, device in self._devices.items():
+            device.rebind(self._cec._lib.create_net_device(self._cec._ref, address))
+
+    def seed(self, physical_address: int, devices: dict[int, dict]):
+        """Fill the cache with attributes known at `physical_address`.
+
+        The first state change event keeps them when the adapter is still at
+        that address.
+        """
+        self._physical_address = physical_address
+        for address, attrs in devices.items():
+            device = self.get(address)
+            if device is not None:
+                for key, value in attrs.items():
+                    device.set_cached(key, value)
+
+    def invalidate(self, *keys: str):
+        for device in self._devices.values():
+            device.invalidate(*keys)
+
+    def update(self, msg: CecMessage, type: CecMessageType):
+        if msg.state_change:
+            address = msg.state_change_phys_addr
+            if address != self._physical_address:
+                # a new physical address (HPD), nothing cached is trusted
+                self.invalidate()
+            elif msg.initial_state:
+                # reopened at the same place, the states may have changed since
+                self.invalidate(*CecDevice.VOLATILE)
+            self._physical_address = address
+            return
+
+        if not msg.has_message or msg.message_transmitted:
+            return
+
+        device = self._devices.get(msg.message_from)
+        if device is None:
+            return
+
+        match type:
+            case CecMessageType.SetOsdName:
+                device.set_cached("osd_name", msg.message_osd_name)
+            case CecMessageType.ReportPowerStatus:
+                device.set_cached("power_status", msg.message_command)
+            case CecMessageType.Standby:
+                device.set_cached("power_status", CecPowerState.StandBy.value)
+            case CecMessageType.DeviceVendorId:
+                device.set_cached("vendor_id", msg.message_vendor_id)
+            case CecMessageType.ReportPhysicalAddress:
+                if device.get_cached("physical_address") != msg.message_address:
+                    # the device moved, its other attributes may be stale too
+                    device.invalidate()
+                device.set_cached("physical_address", msg.message_address)
@@ -0,0 +1,238 @@
+"""A transmit scheduler for the slow CEC line.
+
+`CecSchedulerLib` wraps a backend, its transmit and request functions are
+queued and sent one at a time by one thread, the callers block as before:
+
+* by priority: the replies the TV waits for (REPORT_POWER_STATUS,
+  ACTIVE_SOURCE) first, commands next, polling last;
+* within a bus time budget: commands and polls use at most `bus_share` of
+  the line (estimated from the frame sizes), replies are never delayed;
+* coalesced: an identical request to the same device that is still queued
+  or on the bus is not sent again, the callers share its reply.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from .cec_frame import frame_time
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_REPLY = 0
+PRIORITY_COMMAND = 1
+PRIORITY_POLL = 2
+
+# share of the bus time for commands and polls, and the burst (seconds)
+BUS_SHARE = 0.3
+BUS_BURST = 0.5
+
+# the bytes of a reply to `transmit_msg` (eg. REPORT_PHYSICAL_ADDR)
+REPLY_BYTES = 5
+
+# function: (priority, coalesced, the bytes of the frames sent and replied)
+FUNCTIONS = {
+    "send_msg_report_power_status": (PRIORITY_REPLY, False, (3,)),
+    "send_msg_active_source": (PRIORITY_REPLY, False, (4,)),
+    "send_msg_set_stream_path": (PRIORITY_COMMAND, False, (4,)),
+    "send_msg_request_active_source": (PRIORITY_COMMAND, True, (2, 4)),
+    "send_msg_give_device_power_status": (PRIORITY_POLL, True, (2, 3)),
+    "get_device_power_status": (PRIORITY_POLL, True, (2, 3)),
+    "get_net_dev_physical_addr": (PRIORITY_POLL, True, (2, 5)),
+    "get_net_device_vendor_id": (PRIORITY_POLL, True, (2, 5)),
+    "get_net_device_osd_name": (PRIORITY_POLL, True, (2, 16)),
+    "query_device_info": (PRIORITY_POLL, True, (2, 16, 2, 5, 2, 5, 2, 3)),
+    "ping_net_dev": (PRIORITY_POLL, True, (1,)),
+    "detect_devices": (PRIORITY_POLL, True, ()),  # one poll per mask bit
+    "transmit_msg": (PRIORITY_COMMAND, False, ()),  # the frame is an argument
+}
+
+
+def bus_time(name: str, args: tuple) -> float:
+    """The estimated line time of a function call."""
+    if name == "detect_devices":
+        mask = args[1] if len(args) > 1 else 0x7FFF
+        return mask.bit_count() * frame_time(1)
+    if name == "transmit_msg":
+        reply = args[2] if len(args) > 2 else 0
+        return frame_time(1 + len(args[1])) + (frame_time(REPLY_BYTES) if reply else 0)
+
+    return sum(frame_time(n) for n in FUNCTIONS[name][2])
+
+
+class CecBusBudget:
+    """A token bucket of bus time, refilled at `share` seconds per second."""
+
+    def __init__(self, share=BUS_SHARE, burst=BUS_BURST):
+        self.share = share
+        self.burst = burst
+        self._tokens = burst
+        self._ts = time.monotonic()
+
+    def delay(self, cost: float) -> float:
+        """Seconds until `cost` fits in the budget."""
+        self._refill()
+        return max(0.0, min(cost, self.burst) - self._tokens) / self.share
+
+    def take(self, cost: float):
+        self._refill()
+        self._tokens -= cost  # replies may take more than there is
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._ts) * self.share)
+        self._ts = now
+
+
+class CecTransmit:
+    """A queued call, shared by the callers of a coalesced request."""
+
+    def __init__(self, name: str, fn, args: tuple, key: tuple, cost: float):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.fd = key[1]
+        self.cost = cost
+        self.callers = 1
+        self.result = None
+        self.error: BaseException | None = None
+        self.done = threading.Event()
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+
+class CecTransmitScheduler:
+    """Send the queued calls one at a time, by priority and bus budget.
+
+    The bus budget is per adapter (fd), the line of each adapter is its own.
+    """
+
+    def __init__(self, bus_share=BUS_SHARE, bus_burst=BUS_BURST):
+        self.bus_share = bus_share
+        self.bus_burst = bus_burst
+        self.sent = 0
+        self.coalesced = 0
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int, CecTransmit]] = []
+        self._seq = itertools.count()
+        self._in_flight: dict[tuple, CecTransmit] = {}
+        self._budgets: dict[int, CecBusBudget] = {}
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def call(self, name: str, fn, args: tuple):
+        priority, coalesce, _ = FUNCTIONS[name]
+        target = args[0]  # a CecRef or a CecNetworkDevice
+        key = (name, target.fd, getattr(target, "device_id", None), *args[1:])
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("CEC transmit scheduler closed")
+
+            tx = self._in_flight.get(key) if coalesce else None
+            if tx is None:
+                tx = CecTransmit(name, fn, args, key, bus_time(name, args))
+                if coalesce:
+                    self._in_flight[key] = tx
+                heapq.heappush(self._queue, (priority, next(self._seq), tx))
+                self._cond.notify()
+            else:
+                tx.callers += 1
+                self.coalesced += 1
+
+        return tx.wait()
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+        self._thread.join()
+
+    def _budget(self, fd: int) -> CecBusBudget:
+        budget = self._budgets.get(fd)
+        if budget is None:
+            budget = self._budgets[fd] = CecBusBudget(self.bus_share, self.bus_burst)
+
+        return budget
+
+    def _next(self) -> CecTransmit | None:
+        with self._cond:
+            while self._running:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+
+                priority, _, tx = self._queue[0]
+                budget = self._budget(tx.fd)
+                delay = 0.0 if priority == PRIORITY_REPLY else budget.delay(tx.cost)
+                if delay > 0:
+                    # a reply queued in the meantime goes first
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._queue)
+                budget.take(tx.cost)
+                return tx
+
+        return None
+
+    def _run(self):
+        while (tx := self._next()) is not None:
+            try:
+                tx.result = tx.fn(*tx.args)
+            except Exception as e:
+                # raised again for the caller, logged with the worker traceback
+                logger.exception("CEC %s failed", tx.name)
+                tx.error = e
+            finally:
+                with self._cond:
+                    if self._in_flight.get(tx.key) is tx:
+                        del self._in_flight[tx.key]
+                    self.sent += 1
+
+                tx.done.set()
+
+        # unblock the callers of what was still queued
+        with self._cond:
+            for _, _, tx in self._queue:
+                tx.error = RuntimeError("CEC transmit scheduler closed")
+                tx.done.set()
+
+            self._queue.clear()
+
+
+class CecSchedulerLib:
+    """A `cec_lib` backend that sends through a `CecTransmitScheduler`.
+
+    The other functions (open, receive, ...) are the wrapped ones.
+    """
+
+    def __init__(self, lib, scheduler: CecTransmitScheduler | None = None):
+        self.lib = lib
+        self.scheduler = CecTransmitScheduler() if scheduler is None else scheduler
+        for name in FUNCTIONS:
+            setattr(self, name, self._scheduled(name))
+
+    def __getattr__(self, name: str):
+        return getattr(self.lib, name)
+
+    def close(self):
+        self.scheduler.close()
+
+    def _scheduled(self, name: str):
+        fn = getattr(self.lib, name)
+        scheduler = self.scheduler
+
+        def scheduled_fn(*args):
+            return scheduler.call(name, fn, args)
+
+        return scheduled_fn
@@ -0,0 +1,1226 @@
+"""A simulated CEC bus with the `cec_lib` API, for tests and benchmarks.
+
+`CecSimLib` can be passed as `lib` to `Cec`, `Cec.find_cec_devices` and
+`CecCli`, so the real loops run against virtual devices without an adapter::
+
+    bus = CecSimBus()
+    bus.add_device(CecSimDevice(0, 0x0000, "TV"))
+    bus.add_adapter("/dev/cec0", physical_address=0x1000)
+    cec = Cec("/dev/cec0", CecSimLib(bus))
+"""
+
+import errno
+import os
+import random
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+
+from .cec_frame import frame_time
+from .cec_lib_types import (
+    CecDeviceInfoField,
+    CecDeviceType,
+    CecMessageRxStatus,
+    CecMessageTxStatus,
+    CecPowerState,
+    CecUserControlKeys,
+)
+
+BROADCAST = 15
+UNREGISTERED = 15
+RX_QUEUE_SIZE = 18 * 3  # CEC_MAX_MSG_RX_QUEUE_SZ
+MAX_MSG_SIZE = 16  # CEC_MAX_MSG_SIZE
+
+# logical addresses by the adapter type, in allocation order
+LOGICAL_ADDRESSES = {
+    CecDeviceType.TV: (0, 14),
+    CecDeviceType.Record: (1, 2, 9, 14),
+    CecDeviceType.Playback: (4, 8, 11, 14),
+    CecDeviceType.Tuner: (3, 6, 7, 10, 14),
+    CecDeviceType.Audio: (5, 14),
+    CecDeviceType.Processor: (14,),
+}
+
+ADAPTER_NAMES = {
+    CecDeviceType.TV: "TV",
+    CecDeviceType.Record: "Record",
+    CecDeviceType.Playback: "Playback",
+    CecDeviceType.Tuner: "Tuner",
+    CecDeviceType.Audio: "Audio System",
+    CecDeviceType.Processor: "Processor",
+}
+
+# primary device type (REPORT_PHYSICAL_ADDR operand) by logical address
+PRIMARY_TYPES = {0: 0, 1: 1, 2: 1, 9: 1, 4: 4, 8: 4, 11: 4, 5: 5, 3: 3, 6: 3}
+
+# directed messages that are answers or notifications, never feature aborted
+NO_ABORT = {0x00, 0x44, 0x45, 0x47, 0x82, 0x84, 0x87, 0x90, 0x9E}
+
+TX_OK = CecMessageTxStatus.Ok.value
+TX_NACK = CecMessageTxStatus.Nack.value | CecMessageTxStatus.MaxRetries.value
+RX_OK = CecMessageRxStatus.Ok.value
+RX_TIMEOUT = CecMessageRxStatus.Timeout.value
+RX_FEATURE_ABORT = CecMessageRxStatus.FeatureAbort.value
+
+TFrame = bytes | bytearray | Iterable[int]
+
+
+class CecSimBusMsg:
+    """A received message or event, with the attributes of `cec_lib.CecBusMsg`."""
+
+    __slots__ = (
+        "_frame",
+        "disconnected",
+        "has_event",
+        "has_message",
+        "initial_state",
+        "length",
+        "lost_events",
+        "lost_messages",
+        "message_address",
+        "message_code",
+        "message_command",
+        "message_from",
+        "message_osd_name",
+        "message_status",
+        "message_to",
+        "message_transmitted",
+        "message_vendor_id",
+        "rx_ts",
+        "sequence",
+        "state_change",
+        "state_change_phys_addr",
+        "tx_ts",
+    )
+
+    def __init__(self, **kw):
+        self.has_event = False
+        self.initial_state = False
+        self.state_change = False
+        self.state_change_phys_addr = 0
+        self.lost_events = False
+        self.lost_messages = 0
+        self.has_message = False
+        self.message_from = 0
+        self.message_to = 0
+        self.message_status = 0
+        self.message_code = 0
+        self.message_address = 0
+        self.message_command = 0
+        self.message_vendor_id = 0
+        self.message_osd_name = ""
+        self.message_transmitted = False
+        self.disconnected = False
+        self.length = 0
+        self.rx_ts = 0
+        self.tx_ts = 0
+        self.sequence = 0
+        self._frame = b""
+        for key, value in kw.items():
+            setattr(self, key, value)
+
+    @staticmethod
+    def from_frame(frame: bytes, status=RX_OK, transmitted=False, sequence=0):
+        """Parse a frame the way the native `get_msgs` does."""
+        ts = time.monotonic_ns()
+        msg = CecSimBusMsg(
+            has_message=len(frame) > 1,
+            message_from=frame[0] >> 4,
+            message_to=frame[0] & 15,
+            message_status=status,
+            message_code=frame[1] if len(frame) > 1 else 0,
+            message_transmitted=transmitted,
+            length=len(frame),
+            rx_ts=0 if transmitted else ts,
+            tx_ts=ts if transmitted else 0,
+            sequence=sequence,
+            _frame=bytes(frame),
+        )
+        match msg.message_code:
+            case 0x86 | 0x82 | 0x84 if len(frame) > 3:
+                # SET_STREAM_PATH, ACTIVE_SOURCE, REPORT_PHYSICAL_ADDR
+                msg.message_address = frame[2] << 8 | frame[3]
+            case 0x44 | 0x90 if len(frame) > 2:
+                # USER_CONTROL_PRESSED, REPORT_POWER_STATUS
+                msg.message_command = frame[2]
+            case 0x87 if len(frame) > 4:
+                msg.message_vendor_id = int.from_bytes(frame[2:5], "big")
+            case 0x47:
+                msg.message_osd_name = frame[2:].decode("ascii", "replace")
+
+        return msg
+
+    @property
+    def frame(self) -> memoryview:
+        return memoryview(self._frame)
+
+    def __bytes__(self) -> bytes:
+        return self._frame
+
+    def __buffer__(self, flags):
+        # the buffer protocol of Python classes needs 3.12, `__bytes__` before
+        return memoryview(self._frame)
+
+
+class CecSimInfo:
+    """The adapter information (`cec_lib.CecInfo`)."""
+
+    def __init__(self, path: str, physical_address: int):
+        self.path = path
+        self.adapter = "cec_sim"
+        self.caps = 0x3F
+        self.osd_name = ""
+        self.available_logical_address = 4
+        self.physical_address = physical_address
+        self.logical_address = UNREGISTERED
+        self.logical_address_count = 0
+        self.logical_address_mask = 0
+
+
+class CecSimAdapter:
+    """An adapter on the simulated bus and its receive queue.
+
+    The queue is mirrored by a pipe, readable while messages are queued, so
+    the `fd` of an opened ref works with `poll` and `loop.add_reader`. The
+    messages read by a pipelined transmit are kept for the next `pop` and
+    signaled on a second pipe (`wake_fd`), like the native eventfd.
+    """
+
+    def __init__(self, bus: "CecSimBus", path: str, physical_address: int):
+        self.bus = bus
+        self.info = CecSimInfo(path, physical_address)
+        self.connected = True
+        self.follower = False
+        # O_NONBLOCK of the fd, set by `get_msg_init`
+        self.nonblocking = False
+        # a pipelined transmit holds it for its sends, like the native one
+        self.tx_lock = threading.RLock()
+        self.rx_lock = threading.Lock()
+        self.queue_size = RX_QUEUE_SIZE
+        self._queue: deque[CecSimBusMsg] = deque()
+        # read by a pipelined transmit, handed back to the next `pop`
+        self._received: deque[CecSimBusMsg] = deque()
+        self._pipelined = False
+        self._cond = threading.Condition()
+        self._fds: tuple[int, int] | None = None
+        self._wake: tuple[int, int] | None = None
+        self._lost = 0
+        # unplugged while opened, the ref stays dead even when plugged again
+        self._removed = False
+
+    @property
+    def opened(self) -> bool:
+        return self._fds is not None and not self._removed
+
+    @property
+    def logical_address(self) -> int:
+        return self.info.logical_address
+
+    @property
+    def wake_fd(self) -> int:
+        return self._wake[0] if self._wake is not None else -1
+
+    @property
+    def queued(self) -> int:
+        """The number of messages not read yet."""
+        return len(self._queue) + len(self._received)
+
+    def open(self) -> int:
+        with self._cond:
+            if self._fds is None:
+                self._fds = os.pipe()
+                self._wake = os.pipe()
+                os.set_blocking(self._fds[0], False)
+                os.set_blocking(self._wake[0], False)
+                self._queue.clear()
+                self._received.clear()
+                self._lost = 0
+                self._removed = False
+                self.follower = False
+                self.nonblocking = False
+                self._push(
+                    CecSimBusMsg(
+                        has_event=True,
+                        initial_state=True,
+                        state_change=True,
+                        state_change_phys_addr=self.info.physical_address,
+                    )
+                )
+
+            return self._fds[0]
+
+    def close(self):
+        with self._cond:
+            if self._fds is not None:
+                for fd in (*self._fds, *self._wake):
+                    os.close(fd)
+                self._fds = None
+                self._wake = None
+                self.follower = False
+                self._queue.clear()
+                self._received.clear()
+                self._cond.notify_all()
+
+    def push(self, msg: CecSimBusMsg):
+        with self._cond:
+            if self._fds is not None:
+                self._push(msg)
+
+    def disconnect(self):
+        with self._cond:
+            self.connected = False
+            if self._fds is not None and not self._removed:
+                self._removed = True
+                if not self._queue:
+                    os.write(self._fds[1], b"\0")
+            self._cond.notify_all()
+
+    def pop(self, timeout: float, max_batch: int) -> list[CecSimBusMsg]:
+        with self._cond:
+            if self._fds is None:
+                return []
+
+            if timeout > 0:
+                self._cond.wait_for(self._readable, timeout)
+
+        # the readers wait for a pipelined transmit, like the native `get_msgs`
+        # a non-blocking read returns nothing while one runs
+        if not self.rx_lock.acquire(timeout > 0):
+            return []
+        try:
+            return self._take(max_batch)
+        finally:
+            self.rx_lock.release()
+
+    def _take(self, max_batch: int) -> list[CecSimBusMsg]:
+        with self._cond:
+            if self._fds is None:
+                return []
+
+            msgs = []
+            while self._received and len(msgs) < max_batch:
+                msgs.append(self._received.popleft())
+
+            if self._lost:
+                msgs.append(CecSimBusMsg(has_event=True, lost_messages=self._lost))
+                self._lost = 0
+
+            while self._queue and len(msgs) < max_batch:
+                msgs.append(self._queue.popleft())
+
+            if not self._received:
+                _drain(self._wake[0])
+            if self._removed:
+                # like ENODEV, every read reports it until the ref is closed
+                if len(msgs) < max_batch:
+                    msgs.append(CecSimBusMsg(disconnected=True))
+            elif not self._queue:
+                _drain(self._fds[0])
+
+            return msgs
+
+    @contextmanager
+    def pipelined(self):
+        """Read the queue like a pipelined transmit while in the block.
+
+        The messages (the queued and the ones received meanwhile) are kept for
+        the next `pop`, `wake_fd` is readable after the block.
+        """
+        with self.tx_lock, self.rx_lock:
+            with self._cond:
+                self._pipelined = True
+                self._hand_back()
+            try:
+                yield
+            finally:
+                with self._cond:
+                    self._pipelined = False
+                    self._hand_back()
+
+    def _hand_back(self):
+        if self._fds is None:
+            return
+
+        self._received.extend(self._queue)
+        self._queue.clear()
+        if not self._removed:
+            _drain(self._fds[0])
+        if self._received and not self._pipelined:
+            os.write(self._wake[1], b"\0")
+            self._cond.notify_all()
+
+    def _readable(self) -> bool:
+        received = bool(self._received) and not self._pipelined
+        return bool(self._queue) or received or self._lost > 0 or self._removed
+
+    def _push(self, msg: CecSimBusMsg):
+        if self._pipelined:
+            self._received.append(msg)  # read right away by the transmit
+            return
+
+        if len(self._queue) >= self.queue_size:
+            # the kernel drops the oldest message and reports CEC_EVENT_LOST_MSGS
+            self._queue.popleft()
+            self._lost += 1
+        elif not self._queue and not self._removed:
+            os.write(self._fds[1], b"\0")
+
+        self._queue.append(msg)
+        self._cond.notify_all()
+
+
+def _drain(fd: int):
+    try:
+        os.read(fd, 4096)
+    except BlockingIOError:
+        pass
+
+
+class CecSimDeviceEvent:
+    """An added or removed adapter (`cec_lib.CecDeviceEvent`)."""
+
+    __slots__ = ("added", "path")
+
+    def __init__(self, path: str, added: bool):
+        self.path = path
+        self.added = added
+
+
+class CecSimWatch:
+    """A hotplug watch on the simulated bus, like inotify on /dev.
+
+    The pipe is readable while events are queued, so the fd works with
+    `poll` and `epoll` as the inotify fd does.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: deque[CecSimDeviceEvent] = deque()
+        self._fds = os.pipe()
+        os.set_blocking(self._fds[0], False)
+
+    @property
+    def fd(self) -> int:
+        return self._fds[0]
+
+    def push(self, path: str, added: bool):
+        with self._lock:
+            if not self._events:
+                os.write(self._fds[1], b"\0")
+            self._events.append(CecSimDeviceEvent(path, added))
+
+    def read(self) -> list[CecSimDeviceEvent]:
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            try:
+                os.read(self._fds[0], 1)
+            except BlockingIOError:
+                pass
+
+            return events
+
+    def close(self):
+        os.close(self._fds[0])
+        os.close(self._fds[1])
+
+
+class CecSimDevice:
+    """A scriptable device on the simulated bus.
+
+    Answers the usual requests (power status, OSD name, physical address,
+    vendor id, CEC version, active source) and follows STANDBY, IMAGE_VIEW_ON,
+    SET_STREAM_PATH and ACTIVE_SOURCE. `on(opcode, fn)` replaces the answer
+    to an opcode, `fn(frame)` returns the frames to send back.
+    """
+
+    def __init__(
+        self,
+        logical_address: int,
+        physical_address: int,
+        osd_name: str,
+        vendor_id=0x000C03,
+        power=CecPowerState.On,
+        ack=True,
+    ):
+        self.logical_address = logical_address
+        self.physical_address = physical_address
+        self.osd_name = osd_name
+        self.vendor_id = vendor_id
+        self.power = power
+        self.ack = ack
+        self.active_source = False
+        self.received: deque[bytes] = deque(maxlen=256)
+        self._handlers: dict[int, Callable[[bytes], list[bytes]]] = {}
+
+    @property
+    def primary_type(self) -> int:
+        return PRIMARY_TYPES.get(self.logical_address, 4)
+
+    def on(self, opcode: int, fn: Callable[[bytes], list[bytes]]):
+        self._handlers[opcode] = fn
+
+    def frame(self, destination: int, *data: int) -> bytes:
+        return bytes((self.logical_address << 4 | destination, *data))
+
+    def sent(self, frame: bytes):
+        """Follow a frame sent by this device (eg. replayed) in its state."""
+        if len(frame) < 2:
+            return
+
+        match frame[1]:
+            case 0x90 if len(frame) > 2:  # REPORT_POWER_STATUS
+                self.power = CecPowerState(frame[2] & 3)
+            case 0x36 if frame[0] & 15 == BROADCAST:  # STANDBY
+                self.power = CecPowerState.StandBy
+                self.active_source = False
+            case 0x82:  # ACTIVE_SOURCE
+                self.active_source = True
+            case 0x9D:  # INACTIVE_SOURCE
+                self.active_source = False
+            case 0x47:  # SET_OSD_NAME
+                self.osd_name = frame[2:].decode("ascii", "replace")
+            case 0x84 if len(frame) > 3:  # REPORT_PHYSICAL_ADDR
+                self.physical_address = frame[2] << 8 | frame[3]
+            case 0x87 if len(frame) > 4:  # DEVICE_VENDOR_ID
+                self.vendor_id = int.from_bytes(frame[2:5], "big")
+
+    def receive(self, frame: bytes) -> list[bytes]:
+        """Handle a frame sent to this device, return the answers."""
+        self.received.append(frame)
+        if len(frame) < 2:
+            return []
+
+        opcode = frame[1]
+        to = frame[0] >> 4
+        handler = self._handlers.get(opcode)
+        if handler is not None:
+            return handler(frame)
+
+        pa = self.physical_address
+        match opcode:
+            case 0x8F:  # GIVE_DEVICE_POWER_STATUS
+                return [self.frame(to, 0x90, self.power.value)]
+            case 0x46:  # GIVE_OSD_NAME
+                return [self.frame(to, 0x47, *self.osd_name.encode("ascii")[:14])]
+            case 0x83:  # GIVE_PHYSICAL_ADDR
+                return [
+                    self.frame(BROADCAST, 0x84, pa >> 8, pa & 255, self.primary_type)
+                ]
+            case 0x8C:  # GIVE_DEVICE_VENDOR_ID
+                return [self.frame(BROADCAST, 0x87, *self.vendor_id.to_bytes(3, "big"))]
+            case 0x9F:  # GET_CEC_VERSION
+                return [self.frame(to, 0x9E, 0x05)]
+            case 0x85 if self.active_source:  # REQUEST_ACTIVE_SOURCE
+                return [self.frame(BROADCAST, 0x82, pa >> 8, pa & 255)]
+            case 0x86 if len(frame) > 3:  # SET_STREAM_PATH
+                self.active_source = (frame[2] << 8 | frame[3]) == pa
+                if self.active_source:
+                    self.power = CecPowerState.On
+                    return [self.frame(BROADCAST, 0x82, pa >> 8, pa & 255)]
+            case 0x82:  # ACTIVE_SOURCE
+                self.active_source = False
+            case 0x36:  # STANDBY
+                self.power = CecPowerState.StandBy
+                self.active_source = False
+            case 0x04 | 0x0D if self.logical_address == 0:  # IMAGE/TEXT_VIEW_ON
+                self.power = CecPowerState.On
+            case _ if frame[0] & 15 != BROADCAST and opcode not in NO_ABORT:
+                return [self.frame(to, 0x00, opcode, 0x00)]  # unrecognized opcode
+
+        return []
+
+
+class CecSimTraffic:
+    """Frames injected on the bus by a background thread at a fixed rate."""
+
+    def __init__(
+        self,
+        bus: "CecSimBus",
+        frames: Callable[[int], TFrame] | TFrame,
+        rate: float,
+        count: int | None,
+    ):
+        self._bus = bus
+        self._frames = frames if callable(frames) else (lambda _, f=bytes(frames): f)
+        self._interval = 1.0 / rate
+        self._count = count
+        self._stop = threading.Event()
+        self.sent = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> "CecSimTraffic":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def join(self, timeout: float | None = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        # absolute deadlines keep the rate when a send is late
+        next_ts = time.monotonic()
+        while not self._stop.is_set() and (
+            self._count is None or self.sent < self._count
+        ):
+            self._bus.inject(self._frames(self.sent))
+            self.sent += 1
+            next_ts += self._interval
+            delay = next_ts - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+
+
+class CecSimStats:
+    def __init__(self):
+        self.transmitted = 0
+        self.injected = 0
+        self.nacks = 0
+        self.arbitration_lost = 0
+
+    def __repr__(self):
+        return (
+            f"transmitted={self.transmitted} injected={self.injected} "
+            f"nacks={self.nacks} arbitration_lost={self.arbitration_lost}"
+        )
+
+
+class CecSimBus:
+    """A virtual CEC bus with devices and adapters.
+
+    One frame is on the bus at a time. An acknowledged frame takes
+    `ack_latency` seconds and a not acknowledged one `nack_latency`, plus the
+    wire time of the frame when `realtime` is set. With probability
+    `arbitration_loss` a transmit loses the arbitration first and is retried,
+    as the kernel does.
+    """
+
+    def __init__(
+        self,
+        ack_latency=0.0,
+        nack_latency=0.0,
+        arbitration_loss=0.0,
+        realtime=False,
+        seed: int | None = None,
+    ):
+        self.ack_latency = ack_latency
+        self.nack_latency = nack_latency
+        self.arbitration_loss = arbitration_loss
+        self.realtime = realtime
+        self.stats = CecSimStats()
+        self.devices: dict[int, CecSimDevice] = {}
+        self.adapters: dict[str, CecSimAdapter] = {}
+        self.watches: dict[int, CecSimWatch] = {}
+        self._arbitration = threading.RLock()
+        self._random = random.Random(seed)
+        self._sequence = 0
+
+    def add_device(self, device: CecSimDevice) -> CecSimDevice:
+        self.devices[device.logical_address] = device
+        return device
+
+    def remove_device(self, logical_address: int):
+        self.devices.pop(logical_address, None)
+
+    def add_adapter(self, path="/dev/cec0", physical_address=0x1000) -> CecSimAdapter:
+        adapter = CecSimAdapter(self, path, physical_address)
+        self.adapters[path] = adapter
+        self._hotplug(path, True)
+        return adapter
+
+    def unplug(self, path: str):
+        """Disconnect the adapter, an opened ref receives `disconnected`."""
+        self.adapters[path].disconnect()
+        self._hotplug(path, False)
+
+    def plug(self, path: str):
+        """Connect an unplugged adapter again, it has to be opened again."""
+        self.adapters[path].connected = True
+        self._hotplug(path, True)
+
+    def set_physical_address(self, path: str, physical_address: int):
+        """Re-plug the adapter (HPD) with a new physical address."""
+        adapter = self.adapters[path]
+        adapter.info.physical_address = physical_address
+        adapter.push(
+            CecSimBusMsg(
+                has_event=True,
+                state_change=True,
+                state_change_phys_addr=physical_address,
+            )
+        )
+
+    def set_power(self, logical_address: int, power: CecPowerState, announce=True):
+        """Change the power of a device, like its own remote would.
+
+        With `announce` the device broadcasts STANDBY when turned off and
+        REPORT_POWER_STATUS (CEC 2.0) when turned on.
+        """
+        device = self.devices[logical_address]
+        device.power = power
+        if announce:
+            if power == CecPowerState.StandBy:
+                self.inject(device.frame(BROADCAST, 0x36))
+            else:
+                self.inject(device.frame(BROADCAST, 0x90, power.value))
+
+    def press_key(
+        self,
+        key: CecUserControlKeys,
+        initiator=0,
+        destination: int | None = None,
+        release=True,
+    ):
+        """Send USER_CONTROL_PRESSED (and RELEASED) as the remote of a device."""
+        if destination is None:
+            destination = next(
+                (a.logical_address for a in self.adapters.values() if a.opened),
+                BROADCAST,
+            )
+
+        header = initiator << 4 | destination
+        self.inject(bytes((header, 0x44, key.value)))
+        if release:
+            self.inject(bytes((header, 0x45)))
+
+    def inject(self, frame: TFrame):
+        """Put a frame on the bus as sent by a device (not by an adapter)."""
+        frame = bytes(frame)
+        with self._arbitration:
+            self.stats.injected += 1
+            device = self.devices.get(frame[0] >> 4)
+            if device is not None:
+                device.sent(frame)
+            self._deliver(frame, None)
+
+    def traffic(
+        self,
+        frames: Callable[[int], TFrame] | TFrame,
+        rate: float,
+        count: int | None = None,
+    ) -> CecSimTraffic:
+        """Inject `frames` (a frame, or `fn(index)`) `rate` times per second."""
+        return CecSimTraffic(self, frames, rate, count).start()
+
+    def transmit(
+        self,
+        adapter: CecSimAdapter,
+        frame: bytes,
+        reply: int | None = None,
+    ) -> tuple[int, bytes | None]:
+        """Send a frame from an adapter, return the tx status and the reply.
+
+        The reply is the first answer of the destination with the `reply`
+        opcode (or a FEATURE_ABORT), it is not delivered to the followers. On
+        a non-blocking fd the transmit returns once queued, with status 0 and
+        no reply, the result is only received (in follower mode).
+        """
+        initiator, destination = frame[0] >> 4, frame[0] & 15
+        with self._arbitration:
+            self._sequence += 1
+            self.stats.transmitted += 1
+            wire = frame_time(len(frame)) if self.realtime else 0.0
+            if self._random.random() < self.arbitration_loss:
+                self.stats.arbitration_lost += 1
+                self._sleep(wire)
+
+            if destination != BROADCAST and not self._acked(destination, adapter):
+                self.stats.nacks += 1
+                self._sleep(self.nack_latency + wire)
+                self._report(adapter, frame, TX_NACK)
+                return (0, None) if adapter.nonblocking else (TX_NACK, None)
+
+            self._sleep(self.ack_latency + wire)
+            self._report(adapter, frame, TX_OK)
+            answers = self._deliver(frame, adapter)
+            answer = None
+            for data in answers:
+                if (
+                    answer is None
+                    and reply is not None
+                    and data[0] >> 4 == destination
+                    and len(data) > 1
+                    and (data[1] == reply or (data[1] == 0 and data[2] == frame[1]))
+                ):
+                    answer = data
+                else:
+                    self._deliver(data, None)
+
+            if adapter.nonblocking:
+                return 0, None
+            if initiator == UNREGISTERED or reply is None:
+                return TX_OK, None
+
+            return TX_OK, answer
+
+    def _acked(self, destination: int, sender: CecSimAdapter) -> bool:
+        device = self.devices.get(destination)
+        if device is not None:
+            return device.ack
+
+        return any(
+            a is not sender and a.opened and a.logical_address == destination
+            for a in self.adapters.values()
+        )
+
+    def _hotplug(self, path: str, added: bool):
+        for watch in list(self.watches.values()):
+            watch.push(path, added)
+
+    def _deliver(self, frame: bytes, sender: CecSimAdapter | None) -> list[bytes]:
+        """Hand a frame to the devices and followers it is addressed to."""
+        initiator, destination = frame[0] >> 4, frame[0] & 15
+        answers = []
+        for device in list(self.devices.values()):
+            if device.logical_address != initiator and destination in (
+                BROADCAST,
+                device.logical_address,
+            ):
+                answers.extend(device.receive(frame))
+
+        for adapter in self.adapters.values():
+            if (
+                adapter is not sender
+                and adapter.opened
+                and adapter.logical_address != initiator
+                and destination in (BROADCAST, adapter.logical_address)
+            ):
+                answers.extend(self._adapter_receive(adapter, frame))
+
+        return answers
+
+    def _adapter_receive(self, adapter: CecSimAdapter, frame: bytes) -> list[bytes]:
+        # the kernel answers the core messages itself, the rest is followed
+        la, pa = adapter.logical_address, adapter.info.physical_address
+        to = frame[0] >> 4
+        if len(frame) > 1 and frame[0] & 15 != BROADCAST:
+            match frame[1]:
+                case 0x83:
+                    return [bytes((la << 4 | BROADCAST, 0x84, pa >> 8, pa & 255, 4))]
+                case 0x46:
+                    name = adapter.info.osd_name.encode("ascii")[:14]
+                    return [bytes((la << 4 | to, 0x47, *name))]
+                case 0x8C:
+                    return [bytes((la << 4 | BROADCAST, 0x87, 0x00, 0x0C, 0x03))]
+                case 0x9F:
+                    return [bytes((la << 4 | to, 0x9E, 0x06))]
+
+        if adapter.follower:
+            adapter.push(CecSimBusMsg.from_frame(frame))
+
+        return []
+
+    def _report(self, adapter: CecSimAdapter, frame: bytes, status: int):
+        # the result of a non-blocking transmit is received (in follower mode),
+        # a blocking one only returns it
+        if adapter.follower and adapter.nonblocking:
+            adapter.push(
+                CecSimBusMsg.from_frame(
+                    frame, status, transmitted=True, sequence=self._sequence
+                )
+            )
+
+    def _sleep(self, sec: float):
+        if sec > 0:
+            time.sleep(sec)
+
+
+class CecSimRef:
+    """An opened simulated adapter (`cec_lib.CecRef`)."""
+
+    def __init__(self, adapter: CecSimAdapter | None):
+        self.adapter = adapter
+        self.fd = adapter.open() if adapter is not None else -1
+        self.wake_fd = adapter.wake_fd if adapter is not None else -1
+        self.info = adapter.info if adapter is not None else CecSimInfo("", 0xFFFF)
+        self.can_transmit = adapter is not None
+        self.can_set_logical_address = adapter is not None
+
+    def isOpen(self) -> bool:
+        return self.fd >= 0
+
+
+class CecSimNetworkDevice:
+    """A device seen from an adapter (`cec_lib.CecNetworkDevice`)."""
+
+    def __init__(self, ref: CecSimRef, logical_address: int):
+        self.ref = ref
+        self.fd = ref.fd
+        self.device_id = logical_address
+        self.source_log_addr = ref.info.logical_address
+        self.source_phys_addr = ref.info.physical_address
+
+
+class CecSimDeviceInfo:
+    """The answer of `query_device_info` (`cec_lib.CecDeviceInfo`)."""
+
+    def __init__(self):
+        self.fields = 0
+        self.osd_name = ""
+        self.physical_address = 0
+        self.primary_device_type = 0
+        self.vendor_id = 0
+        self.power_status = CecPowerState.Unknown.value
+
+
+class CecSimHistoryBuffer:
+    """`cec_lib.CecHistoryBuffer` on top of `array`, with the same views."""
+
+    def __init__(self, capacity=4096):
+        self.capacity = max(capacity, 1)
+        self.head = 0
+        self.count = 0
+        self.total = 0
+        self._ts = array("Q", bytes(8 * self.capacity))
+        self._columns = [bytearray(self.capacity) for _ in range(6)]
+        self._frames = bytearray(self.capacity * MAX_MSG_SIZE)
+
+    @property
+    def timestamps(self) -> memoryview:
+        return memoryview(self._ts).toreadonly()
+
+    @property
+    def sources(self) -> memoryview:
+        return memoryview(self._columns[0]).toreadonly()
+
+    @property
+    def destinations(self) -> memoryview:
+        return memoryview(self._columns[1]).toreadonly()
+
+    @property
+    def opcodes(self) -> memoryview:
+        return memoryview(self._columns[2]).toreadonly()
+
+    @property
+    def statuses(self) -> memoryview:
+        return memoryview(self._columns[3]).toreadonly()
+
+    @property
+    def flags(self) -> memoryview:
+        return memoryview(self._columns[4]).toreadonly()
+
+    @property
+    def lengths(self) -> memoryview:
+        return memoryview(self._columns[5]).toreadonly()
+
+    @property
+    def frames(self) -> memoryview:
+        view = memoryview(self._frames).cast("B", (self.capacity, MAX_MSG_SIZE))
+        return view.toreadonly()
+
+    def append(self, msg: CecSimBusMsg):
+        if not msg.has_message:
+            return
+
+        i = self.head
+        transmitted = msg.message_transmitted
+        self._ts[i] = msg.tx_ts if transmitted else msg.rx_ts
+        for column, value in zip(
+            self._columns,
+            (
+                msg.message_from,
+                msg.message_to,
+                msg.message_code,
+                msg.message_status,
+                1 if transmitted else 0,
+                msg.length,
+            ),
+        ):
+            column[i] = value
+        frame = msg._frame[:MAX_MSG_SIZE]
+        start = i * MAX_MSG_SIZE
+        self._frames[start : start + MAX_MSG_SIZE] = frame.ljust(MAX_MSG_SIZE, b"\0")
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+
+class CecSimTransmitPolicy:
+    """`cec_lib.CecTransmitPolicy`, the simulated bus never rejects a transmit."""
+
+    def __init__(
+        self,
+        retries=10,
+        backoff_ms=10,
+        max_backoff_ms=200,
+        deadline_ms=1000,
+        reply_timeout_ms=1000,
+    ):
+        self.retries = retries
+        self.backoff_ms = backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.deadline_ms = deadline_ms
+        self.reply_timeout_ms = reply_timeout_ms
+
+
+class CecSimTransmitResult:
+    """The answer of `transmit_msg` (`cec_lib.CecTransmitResult`)."""
+
+    def __init__(self):
+        self.ok = False
+        self.error = 0
+        self.tx_status = 0
+        self.rx_status = 0
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.reply = b""
+
+
+class CecSimLib:
+    """The `cec_lib` functions on top of a `CecSimBus`."""
+
+    CecDeviceType = CecDeviceType
+    CecTransmitPolicy = CecSimTransmitPolicy
+    CecHistoryBuffer = CecSimHistoryBuffer
+
+    def __init__(self, bus: CecSimBus):
+        self.bus = bus
+        self.policy = CecSimTransmitPolicy()
+
+    def find_cec_devices(self) -> list[str]:
+        return [path for path, a in self.bus.adapters.items() if a.connected]
+
+    def open_cec(self, path: str) -> CecSimRef:
+        adapter = self.bus.adapters.get(path)
+        if adapter is None or not adapter.connected:
+            return CecSimRef(None)
+
+        return CecSimRef(adapter)
+
+    def close_cec(self, ref: CecSimRef):
+        if ref is not None and ref.isOpen():
+            ref.adapter.close()
+            ref.fd = -1
+            ref.wake_fd = -1
+
+    def set_logical_address(self, ref: CecSimRef, type: CecDeviceType) -> bool:
+        if not ref.isOpen():
+            return False
+
+        info = ref.info
+        info.logical_address = UNREGISTERED
+        info.logical_address_count = 0
+        info.logical_address_mask = 0
+        if type == CecDeviceType.Unregistered:
+            return True
+
+        for la in LOGICAL_ADDRESSES.get(type, ()):
+            # the kernel polls the candidates, the first that is not acked is free
+            if not self.bus._acked(la, ref.adapter):
+                info.logical_address = la
+                info.logical_address_mask = 1 << la
+                break
+
+        info.logical_address_count = 1
+        info.osd_name = ADAPTER_NAMES.get(type, "TV")
+        return True
+
+    def update_logical_address_info(self, ref: CecSimRef) -> bool:
+        return ref.isOpen()
+
+    def create_net_device(self, ref: CecSimRef, log_addr: int) -> CecSimNetworkDevice:
+        return CecSimNetworkDevice(ref, log_addr)
+
+    def detect_devices(self, ref: CecSimRef, mask=0x7FFF, timeout_ms=1000):
+        if not ref.isOpen():
+            return []
+
+        with ref.adapter.pipelined():
+            return [
+                CecSimNetworkDevice(ref, la)
+                for la in range(15)
+                if mask & (1 << la)
+                and la != ref.info.logical_address
+                and self._send(ref, la)[0] == TX_OK
+            ]
+
+    def ping_net_dev(self, dev: CecSimNetworkDevice) -> bool:
+        return self._send(dev.ref, dev.device_id)[0] == TX_OK
+
+    def get_net_dev_physical_addr(self, dev: CecSimNetworkDevice) -> int:
+        answer = self._request(dev, 0x83, 0x84)
+        return answer[2] << 8 | answer[3] if answer else 0xFFFF
+
+    def get_net_device_vendor_id(self, dev: CecSimNetworkDevice) -> int:
+        answer = self._request(dev, 0x8C, 0x87)
+        return int.from_bytes(answer[2:5], "big") if answer else 0
+
+    def get_net_device_osd_name(self, dev: CecSimNetworkDevice) -> str:
+        answer = self._request(dev, 0x46, 0x47)
+        return answer[2:].decode("ascii", "replace") if answer else "NO NAME"
+
+    def get_device_power_status(self, dev: CecSimNetworkDevice) -> int:
+        answer = self._request(dev, 0x8F, 0x90)
+        return answer[2] if answer else CecPowerState.Unknown.value
+
+    def query_device_info(
+        self, dev: CecSimNetworkDevice, fields=CecDeviceInfoField.All, timeout_ms=2000
+    ) -> CecSimDeviceInfo:
+        info = CecSimDeviceInfo()
+        if not dev.ref.isOpen():
+            return info
+
+        with dev.ref.adapter.pipelined():
+            if fields & CecDeviceInfoField.OsdName:
+                answer = self._request(dev, 0x46, 0x47)
+                if answer:
+                    info.osd_name = answer[2:].decode("ascii", "replace")
+                    info.fields |= CecDeviceInfoField.OsdName
+            if fields & CecDeviceInfoField.PhysicalAddress:
+                answer = self._request(dev, 0x83, 0x84)
+                if answer:
+                    info.physical_address = answer[2] << 8 | answer[3]
+                    info.primary_device_type = answer[4]
+                    info.fields |= CecDeviceInfoField.PhysicalAddress
+            if fields & CecDeviceInfoField.VendorId:
+                answer = self._request(dev, 0x8C, 0x87)
+                if answer:
+                    info.vendor_id = int.from_bytes(answer[2:5], "big")
+                    info.fields |= CecDeviceInfoField.VendorId
+            if fields & CecDeviceInfoField.PowerStatus:
+                answer = self._request(dev, 0x8F, 0x90)
+                if answer:
+                    info.power_status = answer[2]
+                    info.fields |= CecDeviceInfoField.PowerStatus
+
+        return info
+
+    def send_msg_set_stream_path(self, dev: CecSimNetworkDevice, phys_addr: int):
+        return (
+            self._send(dev.ref, dev.device_id, 0x86, phys_addr >> 8, phys_addr & 255)[0]
+            == TX_OK
+        )
+
+    def send_msg_active_source(self, dev: CecSimNetworkDevice, phys_addr: int):
+        return (
+            self._send(dev.ref, dev.device_id, 0x82, phys_addr >> 8, phys_addr & 255)[0]
+            == TX_OK
+        )
+
+    def send_msg_request_active_source(self, dev: CecSimNetworkDevice) -> bool:
+        return self._send(dev.ref, BROADCAST, 0x85)[0] == TX_OK
+
+    def send_msg_give_device_power_status(self, dev: CecSimNetworkDevice) -> bool:
+        return self._send(dev.ref, dev.device_id, 0x8F)[0] == TX_OK
+
+    def send_msg_report_power_status(self, dev: CecSimNetworkDevice) -> bool:
+        on = CecPowerState.On.value
+        return self._send(dev.ref, dev.device_id, 0x90, on)[0] == TX_OK
+
+    def get_transmit_policy(self) -> CecSimTransmitPolicy:
+        return self.policy
+
+    def set_transmit_policy(self, policy: CecSimTransmitPolicy):
+        self.policy = policy
+
+    def transmit_msg(
+        self,
+        dev: CecSimNetworkDevice,
+        data: bytes,
+        reply=0,
+        policy: CecSimTransmitPolicy | None = None,
+    ) -> CecSimTransmitResult:
+        result = CecSimTransmitResult()
+        if not dev.ref.isOpen():
+            result.error = errno.ENODEV
+            return result
+
+        start = time.monotonic()
+        status, answer = self._send(
+            dev.ref, dev.device_id, *data[:15], reply=reply or None
+        )
+        result.attempts = 1
+        result.tx_status = status
+        if reply and status == TX_OK:
+            if answer is None:
+                result.rx_status = RX_TIMEOUT
+            else:
+                aborted = answer[1] == 0x00
+                result.rx_status = RX_OK | (RX_FEATURE_ABORT if aborted else 0)
+                result.reply = bytes(answer)
+
+        result.ok = status == TX_OK and result.rx_status in (0, RX_OK)
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def get_msg_init(self, ref: CecSimRef) -> bool:
+        if not ref.isOpen():
+            return False
+
+        ref.adapter.follower = True
+        ref.adapter.nonblocking = True
+        return True
+
+    def get_msg(self, ref: CecSimRef) -> CecSimBusMsg:
+        msgs = self.get_msgs(ref, 1000, 1)
+        return msgs[0] if msgs else CecSimBusMsg()
+
+    def get_msgs(
+        self,
+        ref: CecSimRef,
+        timeout_ms=1000,
+        max_batch=64,
+        history: CecSimHistoryBuffer | None = None,
+    ):
+        if ref is None or not ref.isOpen():
+            return []
+
+        msgs = ref.adapter.pop(timeout_ms / 1000, max_batch)
+        if history is not None:
+            for msg in msgs:
+                history.append(msg)
+
+        return msgs
+
+    def watch_cec_devices(self) -> int:
+        watch = CecSimWatch()
+        self.bus.watches[watch.fd] = watch
+        return watch.fd
+
+    def read_cec_device_events(self, fd: int) -> list[CecSimDeviceEvent]:
+        watch = self.bus.watches.get(fd)
+        return [] if watch is None else watch.read()
+
+    def unwatch_cec_devices(self, fd: int):
+        watch = self.bus.watches.pop(fd, None)
+        if watch is not None:
+            watch.close()
+
+    def _send(self, ref: CecSimRef, destination: int, *data: int, reply=None):
+        if not ref.isOpen():
+            return 0, None
+
+        # the fd is blocking for the transmit, like the native `_transmit`
+        header = ref.info.logical_address << 4 | destination
+        adapter = ref.adapter
+        with adapter.tx_lock:
+            nonblocking, adapter.nonblocking = adapter.nonblocking, False
+            try:
+                return self.bus.transmit(adapter, bytes((header, *data)), reply)
+            finally:
+                adapter.nonblocking = nonblocking
+
+    def _request(
+        self, dev: CecSimNetworkDevice, opcode: int, reply: int
+    ) -> bytes | None:
+        _, answer = self._send(dev.ref, dev.device_id, opcode, reply=reply)
+        if answer is None or answer[1] != reply:
+            return None
+
+        return answer
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import time
+
+from .cec import Cec
+from .cec_lib_types import CecDeviceType, CecNetworkDeviceType
+from .cec_registry import CecDeviceRegistry
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = "/var/lib/cec-control/topology.json"
+SNAPSHOT_VERSION = 1
+# the attributes kept, the volatile ones are queried again anyway
+SNAPSHOT_KEYS = ("physical_address", "vendor_id")
+
+
+class CecTopologySnapshot:
+    """The adapter and the devices of the last run, for a fast restart.
+
+    A snapshot is trusted when the adapter is still registered at the same
+    logical and physical address and the device answers a ping. The adapter
+    is then not registered again, the adapters are not searched and the
+    device cache starts warm.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        type: str,
+        physical_address: int,
+        logical_address: int,
+        devices: dict[int, dict],
+        saved: float | None = None,
+    ):
+        self.path = path
+        self.type = type
+        self.physical_address = physical_address
+        self.logical_address = logical_address
+        self.devices = devices
+        self.saved = time.time() if saved is None else saved
+
+    @staticmethod
+    def capture(cec: Cec, registry: CecDeviceRegistry) -> "CecTopologySnapshot":
+        """The snapshot of the cached attributes, nothing is queried."""
+        devices = {}
+        for device in registry.devices():
+            attrs = {key: device.get_cached(key) for key in SNAPSHOT_KEYS}
+            devices[device.logical_address] = {
+                key: value for key, value in attrs.items() if value is not None
+            }
+
+        return CecTopologySnapshot(
+            cec.path,
+            cec.type.name if cec.type is not None else "",
+            cec.physical_address,
+            cec._ref.info.logical_address,
+            devices,
+        )
+
+    @staticmethod
+    def load(file: str) -> "CecTopologySnapshot | None":
+        try:
+            with open(file) as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                return None
+
+            return CecTopologySnapshot(
+                data["path"],
+                data["type"],
+                data["physical_address"],
+                data["logical_address"],
+                {int(la): attrs for la, attrs in data["devices"].items()},
+                data["saved"],
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning("Invalid CEC topology snapshot %s: %s", file, e)
+            return None
+
+    def save(self, file: str) -> bool:
+        """Write the snapshot (atomically, a crash leaves the previous one)."""
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "path": self.path,
+            "type": self.type,
+            "physical_address": self.physical_address,
+            "logical_address": self.logical_address,
+            "devices": {str(la): attrs for la, attrs in self.devices.items()},
+            "saved": self.saved,
+        }
+        tmp = f"{file}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, file)
+            return True
+        except OSError as e:
+            logger.warning("Unable to save the CEC topology snapshot: %s", e)
+            return False
+
+    def validate(
+        self, cec: Cec, cec_type: CecDeviceType, device_type: CecNetworkDeviceType
+    ) -> bool:
+        """Check the opened adapter with one ping and the physical address."""
+        if (
+            cec.path != self.path
+            or cec_type.name != self.type
+            or not cec.is_active_cec
+            or not cec.is_registered
+            or cec.physical_address != self.physical_address
+            or cec._ref.info.logical_address != self.logical_address
+        ):
+            return False
+
+        if not cec.create_device(device_type).is_active:
+            return False
+
+        # registered again with it when the adapter is re-plugged
+        cec.type = cec_type
+        return True
+
+    def restore(self, registry: CecDeviceRegistry):
+        """Fill the registry cache with the attributes of the snapshot."""
+        registry.seed(self.physical_address, self.devices)
@@ -0,0 +1,115 @@
+"""A bounded pool of worker threads for the message handlers.
+
+The handlers (and the automatic replies, blocking transmits) of
+`CecController.handle_cec_messages(..., pool=pool)` run on the workers, the
+receive loop only queues them and keeps reading the adapter::
+
+    with CecHandlerPool(workers=2, queue_size=64) as pool:
+        ctl.handle_cec_messages(1800, tv, types, handler, pool=pool)
+
+A message goes to the worker of its key, the messages of a key are handled
+in order: the remote keys (pressed and released) of a device share one, the
+other messages of a device another (eg. STANDBY and REPORT_POWER_STATUS of
+the TV stay in order). Each worker has a bounded queue, a message for a full
+queue is dropped and counted.
+"""
+
+import logging
+import queue
+import threading
+from collections.abc import Callable, Hashable
+
+from .cec_lib_types import CecMessage, CecMessageType
+
+logger = logging.getLogger(__name__)
+
+WORKERS = 2
+QUEUE_SIZE = 64
+
+KEY_TYPES = (CecMessageType.UserControlPressed, CecMessageType.UserControlReleased)
+
+
+def message_key(msg: CecMessage, type: CecMessageType) -> Hashable:
+    """The ordering key of a message."""
+    if type in KEY_TYPES:
+        return ("keys", msg.message_from)
+
+    return msg.message_from
+
+
+class CecHandlerPool:
+    """Worker threads, each with a bounded queue of the handlers to run.
+
+    `overflow` counts the dropped handlers, `depth` is the number queued. The
+    pool registers on `metrics` for both.
+    """
+
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE, metrics=None):
+        self.queue_size = queue_size
+        self.overflow = 0
+        self._metrics = metrics
+        self._queues = [queue.Queue(queue_size) for _ in range(workers)]
+        self._full = [False] * workers
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), daemon=True)
+            for q in self._queues
+        ]
+        for thread in self._threads:
+            thread.start()
+        if metrics is not None:
+            metrics.handler_pools.append(self)
+
+    @property
+    def workers(self) -> int:
+        return len(self._queues)
+
+    @property
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def submit(self, key: Hashable, fn: Callable, *args) -> bool:
+        """Queue `fn(*args)` on the worker of `key`, False when it is full."""
+        i = hash(key) % len(self._queues)
+        try:
+            self._queues[i].put_nowait((fn, args))
+        except queue.Full:
+            if not self._full[i]:
+                logger.warning("CEC handler queue %d is full, dropping", i)
+            self._full[i] = True
+            self.overflow += 1
+            return False
+
+        self._full[i] = False
+        return True
+
+    def join(self):
+        """Wait until the queued handlers ran."""
+        for q in self._queues:
+            q.join()
+
+    def close(self):
+        """Run what was queued and stop the workers."""
+        for q in self._queues:
+            q.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._metrics is not None and self in self._metrics.handler_pools:
+            self._metrics.handler_pools.remove(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run(self, q: queue.Queue):
+        while (job := q.get()) is not None:
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("CEC handler failed")
+            finally:
+                q.task_done()
+
+        q.task_done()
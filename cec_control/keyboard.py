@@ -1,12 +1,117 @@
 import logging
+import threading
+import time
+from collections.abc import Callable, Hashable
 
 import uinput
 
 from cec_control.cec_lib_types import CecUserControlKeys
 
+logger = logging.getLogger(__name__)
+
+KEY_UP = 0
+KEY_DOWN = 1
+KEY_REPEAT = 2
+
+# a follower assumes the key is released when no press repeat came in time
+HOLD_TIMEOUT_SEC = 0.55
+# repeats emitted at once when the repeat thread was late, the rest are dropped
+MAX_REPEAT_BATCH = 8
+
+TEvent = tuple[Hashable, int]
+
+
+class KeyRepeat:
+    """Press/release state of one held key and its local auto-repeat.
+
+    The key repeats every `interval` seconds after `delay`, independent of
+    how often the TV resends USER_CONTROL_PRESSED while the button is held.
+    Events that are due at once (a key change, repeats of a late tick) are
+    passed to `emit` together, so they go out under one SYN report.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[list[TEvent]], None],
+        delay=0.3,
+        interval=0.04,
+        hold_timeout=HOLD_TIMEOUT_SEC,
+    ):
+        self.delay = delay
+        self.interval = interval
+        self.hold_timeout = hold_timeout
+        self._emit = emit
+        self._cond = threading.Condition()
+        self._key = None
+        self._next_repeat = 0.0
+        self._release_at = 0.0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def held(self):
+        return self._key
+
+    def press(self, key: Hashable):
+        now = time.monotonic()
+        with self._cond:
+            self._release_at = now + self.hold_timeout
+            if key == self._key:
+                return  # the TV resends the press while the button is held
+
+            events = [] if self._key is None else [(self._key, KEY_UP)]
+            events.append((key, KEY_DOWN))
+            self._key = key
+            self._next_repeat = now + self.delay
+            self._emit(events)
+            self._cond.notify()
+
+    def release(self):
+        with self._cond:
+            if self._key is not None:
+                self._emit([(self._key, KEY_UP)])
+                self._key = None
+                self._cond.notify()
+
+    def close(self):
+        self.release()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+        self._thread.join()
+
+    def _run(self):
+        with self._cond:
+            while self._running:
+                if self._key is None:
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                if now >= self._release_at:
+                    logger.debug("Key %s released by timeout", self._key)
+                    self._emit([(self._key, KEY_UP)])
+                    self._key = None
+                    continue
+
+                if now >= self._next_repeat:
+                    # catch up the missed repeats at once, under one report
+                    due = 1 + int((now - self._next_repeat) / self.interval)
+                    self._emit([(self._key, KEY_REPEAT)] * min(due, MAX_REPEAT_BATCH))
+                    self._next_repeat += due * self.interval
+
+                self._cond.wait(min(self._next_repeat, self._release_at) - now)
+
 
 class UInputKeyboard:
-    def __init__(self, keymap: dict[CecUserControlKeys, str]):
+    def __init__(
+        self,
+        keymap: dict[CecUserControlKeys, str],
+        repeat_delay=0.3,
+        repeat_interval=0.04,
+    ):
         self.keymap = dict({})
         self.keys = list()
         for k, v in keymap.items():
@@ -16,12 +121,31 @@ class UInputKeyboard:
                 self.keys.append(key)
 
         self.device = uinput.Device(self.keys)
+        self._lock = threading.Lock()
+        self.repeat = KeyRepeat(self._emit_events, repeat_delay, repeat_interval)
 
     def emit_key(self, key: CecUserControlKeys):
         ev = self.keymap.get(key)
         if ev is not None:
-            self.device.emit_click(ev)
+            self._emit_events([(ev, KEY_DOWN), (ev, KEY_UP)])
+
+    def press_key(self, key: CecUserControlKeys):
+        ev = self.keymap.get(key)
+        if ev is None:
+            self.repeat.release()
+        else:
+            self.repeat.press(ev)
+
+    def release_key(self):
+        self.repeat.release()
 
     def close(self):
+        self.repeat.close()
         self.device.destroy()
-        logging.debug("uinput device closed")
+        logger.debug("uinput device closed")
+
+    def _emit_events(self, events: list[TEvent]):
+        with self._lock:
+            for ev, value in events:
+                self.device.emit(ev, value, syn=False)
+            self.device.syn()
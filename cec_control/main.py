@@ -1,18 +1,52 @@
+import json
 import logging
 import sys
 from argparse import ArgumentParser
 
+from cec_control import cec_lib
+from cec_control.cec_capture import CecCaptureWriter, CecReplayLib
 from cec_control.cec_cli import CecCli
+from cec_control.cec_daemon import SOCKET_PATH, send_command
 from cec_control.cec_lib_types import (
     CecDeviceType,
     CecNetworkDeviceType,
     CecUserControlKeys,
 )
-from cec_control.keyboard import UInputKeyboard
+from cec_control.cec_metrics import CecMetricsLib
+from cec_control.cec_pubsub import PUBLISH_PATH
+from cec_control.cec_scheduler import CecSchedulerLib, CecTransmitScheduler
+from cec_control.cec_snapshot import SNAPSHOT_PATH
+
+logger = logging.getLogger(__name__)
 
 
 def main():
     parser = ArgumentParser(description="CLI tool using C++ extension")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["power-on", "standby", "set-stream-path", "state", "devices"],
+        help="Send a command to the running daemon",
+    )
+    parser.add_argument(
+        "--address", help="Physical address of set-stream-path (eg. 1.0.0.0)"
+    )
+    parser.add_argument(
+        "--scan", action="store_true", help="Detect the devices again (devices)"
+    )
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_PATH,
+        metavar="FILE",
+        help="The command socket of the daemon",
+    )
+    parser.add_argument(
+        "--publish",
+        nargs="?",
+        const=PUBLISH_PATH,
+        metavar="FILE",
+        help=f"Publish the received messages to subscribers ({PUBLISH_PATH})",
+    )
     parser.add_argument("-l", "--list", action="store_true", help="List devices")
     parser.add_argument("-t", "--test", action="store_true", help="Test keyboard")
     parser.add_argument(
@@ -23,14 +57,86 @@ def main():
         help="Print debug messages",
         const=logging.DEBUG,
     )
+    parser.add_argument(
+        "--record", metavar="FILE", help="Record the CEC traffic to a capture file"
+    )
+    parser.add_argument(
+        "--replay", metavar="FILE", help="Replay a capture file instead of the bus"
+    )
+    parser.add_argument(
+        "--fast", action="store_true", help="Replay as fast as possible"
+    )
+    parser.add_argument(
+        "--repeat-delay",
+        type=int,
+        default=300,
+        metavar="MS",
+        help="Hold time before a remote key repeats",
+    )
+    parser.add_argument(
+        "--repeat-rate",
+        type=float,
+        default=25,
+        metavar="HZ",
+        help="Repeats per second of a held remote key",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--bus-share",
+        type=float,
+        metavar="SHARE",
+        help="Schedule the commands and polls in a share of the CEC line (0-1)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Threads running the remote key handlers (0: in the receive loop)",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=SNAPSHOT_PATH,
+        metavar="FILE",
+        help="The adapter and devices of the last run, for a fast start",
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        dest="snapshot",
+        action="store_const",
+        const=None,
+        help="Search the adapters and devices on every start",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(stream=sys.stdout, level=args.level)
 
+    if args.command:
+        sys.exit(run_command(args))
+
+    replay = None
+    if args.replay:
+        replay = CecReplayLib(args.replay, speed=None if args.fast else 1.0)
+
+    lib = cec_lib if replay is None else replay
+    if args.bus_share is not None:
+        lib = CecSchedulerLib(lib, CecTransmitScheduler(bus_share=args.bus_share))
+    if args.metrics:
+        lib = CecMetricsLib(lib)
+        lib.metrics.serve(args.metrics)
+
     if args.list:
-        CecCli.print()
+        CecCli.print(lib)
         return
 
+    # uinput is loaded only when the remote is used
+    from cec_control.keyboard import UInputKeyboard
+
     control = CecCli(
         remote=UInputKeyboard(
             {
@@ -40,14 +146,46 @@ def main():
                 CecUserControlKeys.Right: "KEY_RIGHT",
                 CecUserControlKeys.Down: "KEY_DOWN",
                 CecUserControlKeys.Left: "KEY_LEFT",
-            }
-        )
+            },
+            repeat_delay=args.repeat_delay / 1000,
+            repeat_interval=1 / args.repeat_rate,
+        ),
+        lib=lib,
+        snapshot=None if replay is not None else args.snapshot,
+        control=args.socket,
+        publish=args.publish,
+        workers=args.workers,
     )
+    if replay is not None:
+        replay.on_end = control.token.cancel
+    if args.record:
+        control.capture = CecCaptureWriter(args.record)
 
-    control.register_on_network_and_find_device(
-        CecDeviceType.Playback, CecNetworkDeviceType.TV
-    )
-    control.start_monitoring_tv()
+    try:
+        control.register_on_network_and_find_device(
+            CecDeviceType.Playback, CecNetworkDeviceType.TV
+        )
+        control.start_monitoring_tv()
+    finally:
+        if control.capture is not None:
+            control.capture.close()
+
+
+def run_command(args) -> int:
+    params = {}
+    if args.address:
+        params["address"] = args.address
+    if args.scan:
+        params["scan"] = True
+
+    try:
+        response = send_command(args.command.replace("-", "_"), args.socket, **params)
+    except OSError as e:
+        logger.error("The daemon is not running (%s): %s", args.socket, e)
+        return 2
+
+    print(json.dumps(response))
+    return 0 if response.get("ok") else 1
 
 
 if __name__ == "__main__":
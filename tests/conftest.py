@@ -1,3 +1,54 @@
 import mocked_modules  # noqa: F401
+import pytest
 
-# Add some fixtures
+from cec_control.cec import Cec
+from cec_control.cec_lib_types import CecDeviceType
+from cec_control.cec_sim import CecSimBus, CecSimDevice, CecSimLib
+
+# The simulated bus fixtures, a module changes them by overriding `bus` or
+# `lib` with a fixture that requests the original, eg.
+#
+#     @pytest.fixture
+#     def lib(lib):
+#         return CecMetricsLib(lib)
+
+
+@pytest.fixture
+def bus():
+    """A TV and the adapter `/dev/cec0` (at 1.0.0.0)."""
+    bus = CecSimBus(seed=1)
+    bus.add_device(CecSimDevice(0, 0x0000, "TV", vendor_id=0x0000F0))
+    bus.add_adapter("/dev/cec0", physical_address=0x1000)
+    return bus
+
+
+@pytest.fixture
+def lib(bus):
+    return CecSimLib(bus)
+
+
+@pytest.fixture
+def cec(lib):
+    """`/dev/cec0` opened and registered as a playback device."""
+    with Cec("/dev/cec0", lib) as cec:
+        cec.set_type(CecDeviceType.Playback)
+        yield cec
+
+
+@pytest.fixture
+def press_during_scan(bus, monkeypatch):
+    """Returns `press(key)`, pressing the key on the first poll of a scan."""
+
+    def press(key):
+        transmit = bus.transmit
+        pressed = []
+
+        def press_on_poll(adapter, frame, reply=None):
+            if len(frame) == 1 and not pressed:
+                pressed.append(frame)
+                bus.press_key(key)
+            return transmit(adapter, frame, reply)
+
+        monkeypatch.setattr(bus, "transmit", press_on_poll)
+
+    return press
@@ -1,2 +1,226 @@
+import logging
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from cec_control.cec import Cec, CecController, CecDevice, cec_lib
+from cec_control.cec_lib_types import CecDestination, CecMessageType
+
+
+def bus_msg(code=0, **kwargs):
+    fields = {
+        "has_event": False,
+        "initial_state": False,
+        "state_change": False,
+        "state_change_phys_addr": 0,
+        "lost_events": False,
+        "lost_messages": 0,
+        "has_message": True,
+        "message_from": 0,
+        "message_to": 4,
+        "message_status": 1,
+        "message_code": code,
+        "message_address": 0,
+        "message_command": 0,
+        "message_transmitted": False,
+        "disconnected": False,
+    }
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
 def test__Cec_find_cec_devices_should_call_lib():
     pass
+
+
+def test__CecController_should_handle_batch_of_messages(monkeypatch):
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=True))
+    monkeypatch.setattr(
+        cec_lib, "get_msgs", Mock(return_value=[bus_msg(0x44), bus_msg(0x45)])
+    )
+    handled = []
+
+    def handler(msg, _):
+        handled.append(msg.message_code)
+        return msg.message_code == 0x45
+
+    ctl = CecController(Cec("/dev/cec0"))
+    ev = ctl.wait_for_cec_message(1, handler)
+
+    assert ev.message_code == 0x45
+    assert handled == [0x44, 0x45]
+
+
+def test__CecController_should_keep_rest_of_batch(monkeypatch):
+    first, second = bus_msg(0x44), bus_msg(0x45)
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=True))
+    monkeypatch.setattr(cec_lib, "get_msgs", Mock(side_effect=[[first, second], []]))
+
+    ctl = CecController(Cec("/dev/cec0"))
+    assert ctl.wait_for_cec_message(1, lambda x, _: True) is first
+    assert ctl.wait_for_cec_message(1, lambda x, _: True) is second
+    assert cec_lib.get_msgs.call_count == 1
+
+
+def test__Cec_devices_should_ping_masked_addresses(monkeypatch):
+    cec = Cec("/dev/cec0")
+    cec._ref = SimpleNamespace(info=SimpleNamespace(logical_address_count=1))
+    monkeypatch.setattr(
+        cec_lib, "detect_devices", Mock(return_value=[SimpleNamespace(device_id=0)])
+    )
+
+    devices = cec.devices(mask=0b101, timeout=0.25)
+
+    assert [x.logical_address for x in devices] == [0]
+    cec_lib.detect_devices.assert_called_once_with(cec._ref, 0b101, 250)
+
+
+def test__CecDevice_refresh_should_load_all_attributes(monkeypatch):
+    monkeypatch.setattr(
+        cec_lib,
+        "query_device_info",
+        Mock(
+            return_value=SimpleNamespace(
+                fields=15,
+                osd_name="TV",
+                physical_address=0x1000,
+                primary_device_type=0,
+                vendor_id=0x00E091,
+                power_status=0,
+            )
+        ),
+    )
+    monkeypatch.setattr(cec_lib, "get_net_device_osd_name", Mock())
+    monkeypatch.setattr(cec_lib, "get_device_power_status", Mock())
+    monkeypatch.setattr(cec_lib, "get_net_dev_physical_addr", Mock())
+    dev = CecDevice(SimpleNamespace(device_id=0))
+
+    assert dev.refresh() is True
+    assert dev.osd_name == "TV"
+    assert dev.physical_address == 0x1000
+    assert dev.vendor_name == "LG"
+    assert dev.is_power_on is True
+    cec_lib.get_net_device_osd_name.assert_not_called()
+    cec_lib.get_device_power_status.assert_not_called()
+    cec_lib.get_net_dev_physical_addr.assert_not_called()
+
+
+def test__CecDevice_repr_should_show_cached_attributes(monkeypatch):
+    monkeypatch.setattr(cec_lib, "query_device_info", Mock())
+    monkeypatch.setattr(cec_lib, "get_net_device_osd_name", Mock())
+    dev = CecDevice(SimpleNamespace(device_id=0))
+    dev.set_cached("osd_name", "TV")
+    dev.set_cached("physical_address", 0x1000)
+
+    text = repr(dev)
+
+    assert "Name: TV\n" in text
+    assert "Physical Address: 1.0.0.0\n" in text
+    assert "Power State: CecPowerState.Unknown\n" in text
+    cec_lib.query_device_info.assert_not_called()
+    cec_lib.get_net_device_osd_name.assert_not_called()
+
+
+def test__CecController_should_log_messages_lazily(caplog, monkeypatch):
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=True))
+    monkeypatch.setattr(
+        cec_lib, "get_msgs", Mock(side_effect=[[bus_msg(0x44), bus_msg(0x45)], []])
+    )
+    ctl = CecController(Cec("/dev/cec0"))
+
+    with caplog.at_level(logging.INFO):
+        ctl.wait_for_cec_message(1, lambda x, _: x.message_code == 0x44)
+    assert caplog.records == []
+
+    with caplog.at_level(logging.DEBUG):
+        ctl.wait_for_cec_message(1, lambda x, _: True)
+    assert caplog.records[0].cec_type == "UserControlReleased"
+    assert "Received 69" in caplog.records[0].getMessage()
+
+
+def test__CecSession_should_init_once_and_count_lost_events(monkeypatch):
+    cec = Cec("/dev/cec0")
+    cec._ref = Mock(isOpen=Mock(return_value=True))
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=True))
+    lost = bus_msg(has_event=True, has_message=False, lost_messages=3)
+    monkeypatch.setattr(
+        cec_lib, "get_msgs", Mock(side_effect=[[lost], [bus_msg(0x44)]])
+    )
+    ctl = CecController(cec)
+
+    with cec.session() as session:
+        ctl.wait_for_cec_message(1, lambda x, _: True)
+        ctl.wait_for_cec_message(1, lambda x, _: True)
+
+    cec_lib.get_msg_init.assert_called_once()
+    assert session.lost_events == 3
+
+
+def registered_controller(monkeypatch):
+    cec = Cec("/dev/cec0")
+    cec._ref = SimpleNamespace(info=SimpleNamespace(logical_address=4))
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=True))
+    return CecController(cec)
+
+
+def test__CecController_on_should_dispatch_by_opcode_and_destination(monkeypatch):
+    ctl = registered_controller(monkeypatch)
+    local, broadcast = Mock(return_value=None), Mock(return_value=True)
+    ctl.on(CecMessageType.UserControlPressed, local, CecDestination.Local)
+    ctl.on(CecMessageType.Standby, broadcast, CecDestination.Broadcast)
+    ctl.on(CecMessageType.ReportPowerStatus, local)
+    ctl.off(CecMessageType.ReportPowerStatus, local)
+    monkeypatch.setattr(
+        cec_lib,
+        "get_msgs",
+        Mock(
+            side_effect=[
+                [
+                    bus_msg(0x44, message_to=5),
+                    bus_msg(0x44),
+                    bus_msg(0x90),
+                    bus_msg(0x36, message_to=15),
+                ],
+                [],
+            ]
+        ),
+    )
+
+    ev = ctl.wait_for_cec_message(1, lambda x, _: False)
+
+    assert ev.message_code == 0x36
+    local.assert_called_once()
+    assert local.call_args.args[1] == CecMessageType.UserControlPressed
+    broadcast.assert_called_once()
+
+
+def test__CecController_handle_cec_messages_should_filter_other_devices(monkeypatch):
+    ctl = registered_controller(monkeypatch)
+    device = Mock()
+    handled = []
+
+    def handler(msg, type):
+        handled.append(msg.message_to)
+        return False if msg.message_to == 15 else None
+
+    monkeypatch.setattr(
+        cec_lib,
+        "get_msgs",
+        Mock(
+            side_effect=[
+                [
+                    bus_msg(0x8F),
+                    bus_msg(0x90, message_to=5),
+                    bus_msg(0x90),
+                    bus_msg(0x36, message_to=15),
+                ],
+                [],
+            ]
+        ),
+    )
+    ctl.handle_cec_messages(
+        1, device, [CecMessageType.ReportPowerStatus, CecMessageType.Standby], handler
+    )
+
+    device.report_power_on.assert_called_once()
+    assert handled == [4, 15]
+    assert ctl._handlers[CecMessageType.Standby.value] == ()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from test_cec import bus_msg
+
+from cec_control.cec import Cec, CecDevice, cec_lib
+from cec_control.cec_async import AsyncCecController
+from cec_control.cec_lib_types import CecPowerState
+
+
+@pytest.fixture
+def pipe_cec(monkeypatch):
+    r, w = os.pipe()
+    cec = Cec("/dev/cec0")
+    cec._ref = SimpleNamespace(fd=r, wake_fd=-1)
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=True))
+    yield cec, w
+    os.close(r)
+    os.close(w)
+
+
+def feed(monkeypatch, fd, msgs):
+    def get_msgs(ref, timeout_ms, max_batch):
+        os.read(ref.fd, 1)
+        return msgs
+
+    monkeypatch.setattr(cec_lib, "get_msgs", Mock(side_effect=get_msgs))
+    os.write(fd, b"x")
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_stream_messages(pipe_cec, monkeypatch):
+    cec, w = pipe_cec
+    async with AsyncCecController(cec) as ctl:
+        feed(monkeypatch, w, [bus_msg(0x44), bus_msg(0x45, message_transmitted=True)])
+        it = ctl.messages()
+        msg = await asyncio.wait_for(it.__anext__(), 1)
+        ctl.stop()
+        rest = [x async for x in it]
+
+    assert msg.message_code == 0x44
+    assert rest == []
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_await_power_state(pipe_cec, monkeypatch):
+    cec, w = pipe_cec
+    tv = CecDevice(SimpleNamespace(device_id=0))
+
+    def request_power_state(_):
+        feed(monkeypatch, w, [bus_msg(0x90, message_command=0)])
+        return True
+
+    monkeypatch.setattr(
+        cec_lib,
+        "send_msg_give_device_power_status",
+        Mock(side_effect=request_power_state),
+    )
+
+    async with AsyncCecController(cec) as ctl:
+        assert await ctl.power_state(tv) == CecPowerState.On
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_await_the_reply_of_a_failed_transmit(
+    pipe_cec, monkeypatch
+):
+    cec, w = pipe_cec
+    tv = CecDevice(SimpleNamespace(device_id=0))
+
+    def request_active_source(_):
+        # the transmit fails (None) after the reply is received
+        feed(monkeypatch, w, [bus_msg(0x82, message_address=0x1000)])
+
+    monkeypatch.setattr(
+        cec_lib,
+        "send_msg_request_active_source",
+        Mock(side_effect=request_active_source),
+    )
+
+    async with AsyncCecController(cec) as ctl:
+        assert await ctl.request_active_source(tv) == 0x1000
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_raise_when_it_cannot_start(
+    pipe_cec, monkeypatch
+):
+    cec, _ = pipe_cec
+    monkeypatch.setattr(cec_lib, "get_msg_init", Mock(return_value=False))
+
+    with pytest.raises(OSError):
+        async with AsyncCecController(cec):
+            pass
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_timeout_active_source(pipe_cec, monkeypatch):
+    cec, _ = pipe_cec
+    tv = CecDevice(SimpleNamespace(device_id=0))
+    monkeypatch.setattr(
+        cec_lib, "send_msg_request_active_source", Mock(return_value=True)
+    )
+
+    async with AsyncCecController(cec) as ctl:
+        assert await ctl.request_active_source(tv, timeout=0.01) is None
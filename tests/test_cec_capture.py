@@ -0,0 +1,85 @@
+import pytest
+
+from cec_control.cec import Cec, CecController
+from cec_control.cec_capture import (
+    HEADER,
+    RECORD,
+    CecCaptureReader,
+    CecCaptureWriter,
+    CecReplayLib,
+)
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecMessageType,
+    CecNetworkDeviceType,
+    CecPowerState,
+)
+from cec_control.cec_sim import CecSimBusMsg
+
+
+def write_capture(path, frames):
+    with CecCaptureWriter(path) as writer:
+        writer.write(
+            CecSimBusMsg(has_event=True, initial_state=True, state_change=True)
+        )
+        for i, frame in enumerate(frames):
+            msg = CecSimBusMsg.from_frame(frame)
+            msg.rx_ts = 1_000_000 * (i + 1)
+            writer.write(msg)
+
+
+def test__CecCaptureWriter_should_append_fixed_size_records(tmp_path):
+    path = tmp_path / "bus.cap"
+    write_capture(path, [b"\x0f\x90\x01"])
+    write_capture(path, [b"\x04\x44\x01"])
+
+    assert path.stat().st_size == HEADER.size + 4 * RECORD.size
+
+
+def test__CecCaptureReader_should_read_messages_and_events(tmp_path):
+    path = tmp_path / "bus.cap"
+    write_capture(path, [b"\x0f\x87\x00\x00\xf0", b"\x04\x47TV"])
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02")  # a record cut by a crash
+
+    with CecCaptureReader(path) as reader:
+        event, vendor, name = list(reader)
+
+    assert event.has_event and event.initial_state
+    assert vendor.message_vendor_id == 0xF0
+    assert vendor.rx_ts == 1_000_000
+    assert name.message_osd_name == "TV"
+    assert bytes(name.frame) == b"\x04\x47TV"
+
+
+def test__CecCaptureReader_should_reject_other_files(tmp_path):
+    path = tmp_path / "bus.cap"
+    path.write_bytes(b"not a capture file at all")
+
+    with pytest.raises(ValueError):
+        CecCaptureReader(path)
+
+
+def test__CecReplayLib_should_replay_capture_into_controller(tmp_path):
+    path = tmp_path / "bus.cap"
+    frames = [b"\x0f\x90\x01", *[b"\x04\x44\x01"] * 100, b"\x0f\x90\x00"]
+    write_capture(path, frames)
+
+    lib = CecReplayLib(path, speed=None)
+    with Cec("/dev/cec0", lib) as cec:
+        cec.set_type(CecDeviceType.Playback)
+        tv = cec.create_device(CecNetworkDeviceType.TV)
+        received = []
+
+        def handler(msg, type):
+            if msg.has_message:
+                received.append(type)
+            return len(received) == len(frames)
+
+        CecController(cec).wait_for_cec_message(5, handler)
+
+        assert tv.is_active
+        assert tv.power_state == CecPowerState.On
+
+    assert received.count(CecMessageType.UserControlPressed) == 100
+    assert lib.replay.replayed == len(frames)
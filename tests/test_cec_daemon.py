@@ -0,0 +1,97 @@
+import os
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from cec_control._utils import Wait
+from cec_control.cec_cli import CecCli
+from cec_control.cec_daemon import CecControlServer, parse_address, send_command
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecNetworkDeviceType,
+    CecPowerState,
+    CecUserControlKeys,
+)
+from cec_control.cec_sim import CecSimDevice, CecSimLib
+
+
+@pytest.fixture
+def bus(bus):
+    bus.add_device(CecSimDevice(5, 0x2000, "AVR"))
+    return bus
+
+
+@pytest.fixture
+def remote():
+    return Mock()
+
+
+@pytest.fixture
+def daemon(bus, remote, tmp_path):
+    path = str(tmp_path / "control.sock")
+    cli = CecCli(remote, CecSimLib(bus), control=path)
+    cli.attach_on_process_exit = Mock()
+    cli.register_on_network_and_find_device(
+        CecDeviceType.Playback, CecNetworkDeviceType.TV
+    )
+    thread = threading.Thread(target=cli.start_monitoring_tv)
+    thread.start()
+    Wait.for_fn(2, lambda: cli.power is not None, sleep_sec=0.01)
+    Wait.for_fn(2, lambda: os.path.exists(path), sleep_sec=0.01)
+    yield path
+    cli.token.cancel()
+    bus.inject(b"\x0f\x36")  # wake up the receive loop
+    thread.join(2)
+
+
+def test__CecControlServer_should_run_commands_on_the_daemon(bus, daemon):
+    state = send_command("state", daemon)
+    assert state == {
+        "ok": True,
+        "adapter": "/dev/cec0",
+        "logical_address": 4,
+        "physical_address": "1.0.0.0",
+        "power": "On",
+    }
+
+    assert send_command("standby", daemon) == {"ok": True}
+    assert bus.devices[0].power == CecPowerState.StandBy
+
+    assert send_command("power_on", daemon) == {"ok": True}
+    assert bus.devices[0].power == CecPowerState.On
+
+    assert send_command("set_stream_path", daemon, address="2.0.0.0")["ok"]
+    assert bus.devices[5].active_source
+
+
+def test__CecControlServer_should_list_devices(daemon):
+    devices = send_command("devices", daemon, scan=True)["devices"]
+
+    assert [(d["logical_address"], d["type"]) for d in devices] == [
+        (0, "TV"),
+        (5, "AudioSystem"),
+    ]
+
+
+def test__CecControlServer_should_keep_the_keys_pressed_during_a_scan(
+    remote, daemon, press_during_scan
+):
+    press_during_scan(CecUserControlKeys.Select)
+    assert send_command("devices", daemon, scan=True)["ok"]
+
+    assert Wait.for_fn(2, lambda: remote.release_key.called, sleep_sec=0.01)
+    remote.press_key.assert_called_once_with(CecUserControlKeys.Select)
+
+
+def test__CecControlServer_should_reject_invalid_requests():
+    server = CecControlServer(Mock())
+
+    assert server.handle_line(b"[1]")["error"].startswith("invalid request")
+    assert server.handle({"cmd": "reboot"}) == {
+        "ok": False,
+        "error": "unknown command: reboot",
+    }
+    assert parse_address("1.2.0.0") == 0x1200
+    with pytest.raises(ValueError):
+        parse_address("1.2.0")
@@ -0,0 +1,43 @@
+from cec_control.cec_frame import CecFrame
+from cec_control.cec_lib_types import CecMessageType
+
+
+def test__CecFrame_should_decode_header():
+    frame = CecFrame(bytes([0x0F, 0x36]))
+
+    assert frame.initiator == 0
+    assert frame.is_broadcast is True
+    assert frame.type == CecMessageType.Standby
+    assert frame.operands == {}
+
+
+def test__CecFrame_should_decode_operands_lazily():
+    frame = CecFrame(bytes([0x0F, 0x80, 0x10, 0x00, 0x20, 0x00]))
+
+    assert frame._operands is None
+    assert frame.new_address == 0x2000
+    assert frame.operands == {"original_address": 0x1000, "new_address": 0x2000}
+
+
+def test__CecFrame_should_decode_strings_and_vendor_id():
+    assert CecFrame(b"\x04\x47TV").osd_name == "TV"
+    assert CecFrame(bytes([0x0F, 0x87, 0x00, 0xE0, 0x91])).vendor_id == 0x00E091
+    assert CecFrame(bytes([0x04, 0x00, 0x8F, 0x03])).name == "FeatureAbort"
+
+
+def test__CecFrame_should_skip_truncated_operands():
+    frame = CecFrame(bytes([0x4F, 0x84, 0x10]))
+
+    assert frame.operands == {}
+    assert frame.name == "ReportPhysicalAddress"
+    assert CecFrame(b"\x40").is_poll is True
+
+
+def test__CecFrame_should_accept_an_empty_buffer():
+    frame = CecFrame(b"")
+
+    assert frame.initiator is None
+    assert frame.destination is None
+    assert frame.opcode is None
+    assert frame.is_broadcast is False
+    assert repr(frame) == "None->None Unknown()"
@@ -0,0 +1,63 @@
+from cec_control.cec import Cec, CecController
+from cec_control.cec_lib_types import (
+    CecMessageType,
+    CecPowerState,
+    CecUserControlKeys,
+)
+from cec_control.cec_sim import CecSimBus
+
+
+def receive(cec: Cec, bus: CecSimBus, *frames: bytes):
+    ctl = CecController(cec)
+    cec.session().start()
+    for frame in frames:
+        bus.inject(frame)
+    bus.inject(b"\x0f\x36")
+    ctl.wait_for_cec_message(1, lambda msg, type: type == CecMessageType.Standby)
+
+
+def test__CecHistory_should_record_received_messages(bus, cec):
+    history = cec.record_history(16)
+    receive(cec, bus, b"\x04\x44\x01", b"\x04\x45", b"\x04\x44\x03")
+
+    assert [e.type for e in history.last(2)] == [
+        CecMessageType.Standby,
+        CecMessageType.UserControlPressed,
+    ]
+    assert [key for _, key in history.key_presses(5)] == [
+        CecUserControlKeys.Left,
+        CecUserControlKeys.Up,
+    ]
+    assert history.last(1, CecMessageType.UserControlReleased)[0].frame == b"\x04\x45"
+
+
+def test__CecHistory_should_keep_the_last_messages(bus, cec):
+    history = cec.record_history(4)
+    receive(cec, bus, *(bytes((0x04, 0x44, key)) for key in range(6)))
+
+    assert len(history) == 4
+    assert history.total == 7
+    assert [
+        e.frame[2] for e in history.last(10, CecMessageType.UserControlPressed)
+    ] == [
+        5,
+        4,
+        3,
+    ]
+    assert history.buffer.opcodes.tolist() == [0x44, 0x44, 0x36, 0x44]
+
+
+def test__CecHistory_should_list_power_transitions(bus, cec):
+    history = cec.record_history()
+    receive(
+        cec,
+        bus,
+        b"\x04\x90\x01",
+        b"\x04\x90\x01",
+        b"\x04\x90\x00",
+        b"\x54\x90\x01",  # another device
+    )
+
+    states = [state for _, state in history.power_transitions(3600)]
+
+    assert states == [CecPowerState.StandBy, CecPowerState.On, CecPowerState.StandBy]
@@ -0,0 +1,94 @@
+import threading
+from unittest.mock import Mock
+
+from cec_control._utils import Wait
+from cec_control.cec import Cec
+from cec_control.cec_cli import CecCli
+from cec_control.cec_hotplug import CecHotplugWatcher
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecMessageType,
+    CecNetworkDeviceType,
+    CecPowerState,
+    CecUserControlKeys,
+)
+from cec_control.cec_monitor import CecMonitor
+from cec_control.cec_sim import CecSimLib
+
+
+def test__CecHotplugWatcher_should_report_added_and_removed_adapters(bus):
+    with CecHotplugWatcher(CecSimLib(bus)) as hotplug:
+        bus.unplug("/dev/cec0")
+        bus.plug("/dev/cec0")
+        bus.add_adapter("/dev/cec1")
+
+        events = hotplug.wait(1)
+
+    assert [(ev.path, ev.added) for ev in events] == [
+        ("/dev/cec0", False),
+        ("/dev/cec0", True),
+        ("/dev/cec1", True),
+    ]
+
+
+def test__CecHotplugWatcher_should_reopen_and_register_adapter(bus):
+    lib = CecSimLib(bus)
+    with Cec("/dev/cec0", lib) as cec, CecHotplugWatcher(lib) as hotplug:
+        cec.set_type(CecDeviceType.Playback)
+        bus.unplug("/dev/cec0")
+        threading.Timer(0.05, bus.plug, ["/dev/cec0"]).start()
+
+        assert hotplug.reconnect(cec, 2)
+        assert cec.opened
+        assert cec._ref.info.logical_address == 4
+
+
+def test__CecMonitor_should_reopen_replugged_adapter(bus):
+    pressed = []
+    with CecMonitor.open_all(CecDeviceType.Playback, CecSimLib(bus)) as monitor:
+        ctl = monitor.controller("/dev/cec0")
+        ctl.on(CecMessageType.UserControlPressed, lambda msg, _: pressed.append(msg))
+        bus.unplug("/dev/cec0")
+        monitor.wait_for_cec_message(0.1, lambda *_: False)
+        assert monitor.paths == []
+
+        bus.plug("/dev/cec0")
+        # the initial state event of the reopened adapter
+        monitor.wait_for_cec_message(1, lambda path, msg, _: msg.initial_state)
+        assert monitor.paths == ["/dev/cec0"]
+
+        bus.inject(b"\x04\x44\x01")
+        monitor.wait_for_cec_message(1, lambda *_: bool(pressed))
+
+        assert monitor.controller("/dev/cec0") is ctl
+        assert len(pressed) == 1
+
+
+def test__CecCli_should_keep_device_cache_on_replug(bus):
+    remote = Mock()
+    cli = CecCli(remote, CecSimLib(bus))
+    cli.attach_on_process_exit = Mock()
+    cli.register_on_network_and_find_device(
+        CecDeviceType.Playback, CecNetworkDeviceType.TV
+    )
+
+    def script():
+        tv = cli.devices.get(CecNetworkDeviceType.TV)
+        Wait.for_fn(2, lambda: tv.vendor_id == 0xF0, sleep_sec=0.01)
+        bus.devices[0].vendor_id = 0x0  # a new query would return it
+        ref = cli.cec._ref
+        bus.unplug("/dev/cec0")
+        bus.plug("/dev/cec0")
+        Wait.for_fn(2, lambda: cli.cec._ref is not ref, sleep_sec=0.01)
+        bus.press_key(CecUserControlKeys.Up)
+        Wait.for_fn(2, lambda: remote.press_key.called, sleep_sec=0.01)
+        bus.set_power(0, CecPowerState.StandBy)
+        Wait.for_fn(2, lambda: cli.power.state == CecPowerState.StandBy, sleep_sec=0.01)
+        cli.token.cancel()
+        bus.inject(b"\x0f\x36")  # wake up the receive loop
+
+    threading.Timer(0.1, script).start()
+    cli.start_monitoring_tv()
+
+    remote.press_key.assert_called_once_with(CecUserControlKeys.Up)
+    assert cli.devices.get(CecNetworkDeviceType.TV).vendor_id == 0xF0
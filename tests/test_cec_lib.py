@@ -0,0 +1,71 @@
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+import textwrap
+from pathlib import Path
+
+import pytest
+
+# the tests import a mocked `cec_lib`, the extension is built and imported in
+# a child process
+SOURCES = Path(__file__).parents[1] / "cec_control"
+
+
+@pytest.fixture(scope="module")
+def build_dir(tmp_path_factory):
+    pybind11 = pytest.importorskip("pybind11")
+    cxx = shutil.which(os.environ.get("CXX", "g++"))
+    if cxx is None:
+        pytest.skip("no C++ compiler")
+
+    path = tmp_path_factory.mktemp("cec_lib")
+    target = path / f"cec_lib{sysconfig.get_config_var('EXT_SUFFIX')}"
+    result = subprocess.run(
+        [
+            cxx,
+            "-O0",
+            "-shared",
+            "-fPIC",
+            "-std=c++17",
+            f"-I{sysconfig.get_paths()['include']}",
+            f"-I{pybind11.get_include()}",
+            str(SOURCES / "bindings.cpp"),
+            str(SOURCES / "cec_lib.cpp"),
+            "-o",
+            str(target),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    return path
+
+
+def run(build_dir, code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        env={**os.environ, "PYTHONPATH": str(build_dir)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def test__cec_lib_should_build_and_import(build_dir):
+    result = run(
+        build_dir,
+        """
+        import cec_lib
+
+        ref = cec_lib.open_cec("/nonexistent")
+        assert not ref.isOpen()
+        assert ref.wake_fd == -1
+        assert cec_lib.get_msgs(ref, 0, 64) == []
+        assert cec_lib.get_msgs(ref, 0, 64, cec_lib.CecHistoryBuffer(8)) == []
+        """,
+    )
+
+    assert result.returncode == 0, result.stderr
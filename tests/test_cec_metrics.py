@@ -0,0 +1,75 @@
+import urllib.request
+
+import pytest
+
+from cec_control.cec import CecController
+from cec_control.cec_lib_types import (
+    CecMessageType,
+    CecNetworkDeviceType,
+)
+from cec_control.cec_metrics import CecMetrics, CecMetricsLib
+
+
+@pytest.fixture
+def lib(lib):
+    return CecMetricsLib(lib)
+
+
+def test__CecMetrics_should_count_received_messages_and_handlers(bus, cec):
+    bus.adapters["/dev/cec0"].queue_size = 4
+    ctl = CecController(cec)
+    ctl.on(CecMessageType.UserControlPressed, lambda msg, _: None)
+    cec.session().start()
+    for _ in range(6):
+        bus.inject(b"\x04\x44\x01")
+    bus.inject(b"\x0f\x36")
+
+    ctl.wait_for_cec_message(1, lambda msg, type: type == CecMessageType.Standby)
+    snap = cec._lib.metrics.snapshot()
+
+    assert snap["rx"] == {0x44: 3, 0x36: 1}
+    assert snap["lost_messages"] == 4
+    # the handlers registered by type, not the loop handler
+    assert snap["handler_seconds"]["UserControlPressed"]["count"] == 3
+    assert "Standby" not in snap["handler_seconds"]
+
+
+def test__CecMetricsLib_should_time_transmits_and_requests(bus, cec):
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    assert not cec.create_device(CecNetworkDeviceType.Tuner1).is_active
+    tv.refresh()
+    cec.session().start()
+    tv.request_power_state()
+    assert tv.transmit(CecMessageType.GiveOsdName).ok
+    snap = cec._lib.metrics.snapshot()
+
+    assert snap["tx"] == {
+        CecMessageType.GiveDevicePowerStatus.value: 1,
+        CecMessageType.GiveOsdName.value: 1,
+    }
+    assert snap["transmit_seconds"]["send_msg_give_device_power_status"]["count"] == 1
+    assert snap["transmit_seconds"]["transmit_msg"]["count"] == 1
+    assert snap["request_seconds"]["query_device_info"]["count"] == 1
+    assert snap["request_seconds"]["ping_net_dev"]["count"] == 1
+    # from the result of the (blocking) transmit, no report is received
+    assert snap["tx_status"]["Ok"] == 1
+
+
+def test__CecMetrics_should_serve_prometheus_text():
+    metrics = CecMetrics()
+    metrics.rx[0x44] = 2
+    metrics.transmitted("send_msg_active_source", 0x82, False, 0.03)
+    server = metrics.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            text = response.read().decode()
+    finally:
+        metrics.close()
+
+    assert 'cec_rx_messages_total{opcode="0x44",type="UserControlPressed"} 2' in text
+    assert 'cec_tx_failed_total{opcode="0x82",type="ActiveSource"} 1' in text
+    assert (
+        'cec_transmit_seconds_bucket{function="send_msg_active_source",le="0.05"} 1'
+        in text
+    )
@@ -0,0 +1,98 @@
+import pytest
+
+from cec_control.cec_frame import CecFrame
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecMessageType,
+    CecUserControlKeys,
+)
+from cec_control.cec_monitor import CecMonitor
+from cec_control.cec_sim import CecSimBus, CecSimDevice, CecSimLib
+
+
+@pytest.fixture
+def bus():
+    bus = CecSimBus(seed=1)
+    bus.add_device(CecSimDevice(0, 0x0000, "TV"))
+    bus.add_adapter("/dev/cec0", physical_address=0x1000)
+    bus.add_adapter("/dev/cec1", physical_address=0x2000)
+    return bus
+
+
+@pytest.fixture
+def monitor(bus):
+    with CecMonitor.open_all(CecDeviceType.Playback, CecSimLib(bus)) as monitor:
+        yield monitor
+
+
+def addresses(monitor):
+    return {p: monitor.adapter(p)._ref.info.logical_address for p in monitor.paths}
+
+
+def test__CecMonitor_should_register_every_adapter(monitor):
+    assert addresses(monitor) == {"/dev/cec0": 4, "/dev/cec1": 8}
+
+
+def test__CecMonitor_should_tag_messages_by_adapter(bus, monitor):
+    received = []
+    for la, key in ((4, 1), (8, 2), (4, 3), (8, 4)):
+        bus.inject(bytes((la, 0x44, key)))
+
+    def handler(path, msg, type):
+        if type == CecMessageType.UserControlPressed:
+            received.append((path, CecFrame(msg).key))
+
+        return len(received) == 4
+
+    monitor.wait_for_cec_message(2, handler)
+
+    assert sorted(received) == [
+        ("/dev/cec0", 1),
+        ("/dev/cec0", 3),
+        ("/dev/cec1", 2),
+        ("/dev/cec1", 4),
+    ]
+
+
+def test__CecMonitor_should_call_adapter_handlers(bus, monitor):
+    pressed = []
+    ctl = monitor.controller("/dev/cec1")
+    ctl.on(CecMessageType.UserControlPressed, lambda msg, _: pressed.append(msg))
+    bus.inject(b"\x04\x44\x01")
+    bus.inject(b"\x08\x44\x01")
+    bus.inject(b"\x08\x36")
+
+    path, _ = monitor.wait_for_cec_message(
+        2, lambda path, msg, type: type == CecMessageType.Standby
+    )
+
+    assert len(pressed) == 1
+    assert path == "/dev/cec1"
+
+
+def test__CecMonitor_should_drop_disconnected_adapter(bus, monitor):
+    received = []
+    bus.unplug("/dev/cec1")
+    bus.inject(b"\x04\x44\x01")
+
+    def handler(path, msg, type):
+        if type == CecMessageType.UserControlPressed:
+            received.append(path)
+
+    monitor.wait_for_cec_message(0.2, handler)
+
+    assert received == ["/dev/cec0"]
+    assert monitor.paths == ["/dev/cec0"]
+
+
+def test__CecMonitor_should_wake_for_the_messages_read_by_a_transmit(bus, monitor):
+    # a pipelined transmit (a scan) keeps the frames it reads for get_msgs
+    with bus.adapters["/dev/cec0"].pipelined():
+        bus.press_key(CecUserControlKeys.Select)
+
+    result = monitor.wait_for_cec_message(
+        0.5, lambda path, msg, type: type == CecMessageType.UserControlPressed
+    )
+
+    assert result is not None
+    assert result[0] == "/dev/cec0"
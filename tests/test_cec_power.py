@@ -0,0 +1,63 @@
+from test_cec import bus_msg
+from test_utils import TimeMock
+
+from cec_control.cec_lib_types import CecMessageType, CecPowerState
+from cec_control.cec_power import CecPowerTracker
+
+
+class DeviceMock:
+    def __init__(self, state=CecPowerState.StandBy):
+        self.logical_address = 0
+        self.power_state = state
+
+    def invalidate(self, *keys):
+        pass
+
+
+def test__CecPowerTracker_should_track_unsolicited_messages():
+    with TimeMock():
+        tracker = CecPowerTracker(DeviceMock())
+        msg = bus_msg(0x90, message_from=0, message_command=0)
+        assert tracker.update(msg, CecMessageType.ReportPowerStatus) is True
+        assert tracker.is_power_on is True
+
+        msg = bus_msg(0x36, message_from=0, message_to=15)
+        assert tracker.update(msg, CecMessageType.Standby) is True
+        assert tracker.state == CecPowerState.StandBy
+
+
+def test__CecPowerTracker_should_ignore_other_devices():
+    with TimeMock():
+        tracker = CecPowerTracker(DeviceMock())
+        msg = bus_msg(0x36, message_from=4, message_to=15)
+        assert tracker.update(msg, CecMessageType.Standby) is False
+        assert tracker.state == CecPowerState.Unknown
+
+
+def test__CecPowerTracker_should_backoff_polling():
+    with TimeMock(0.0) as set_ts:
+        device = DeviceMock()
+        tracker = CecPowerTracker(device, min_poll_sec=1, max_poll_sec=4)
+        tracker.poll()
+        assert tracker.state == CecPowerState.StandBy
+        assert tracker.poll_in == 1
+
+        intervals = []
+        for ts in range(1, 20):
+            set_ts(float(ts))
+            if tracker.poll_in == 0:
+                tracker.poll()
+                intervals.append(tracker.poll_in)
+
+        assert intervals[:3] == [2, 4, 4]
+
+
+def test__CecPowerTracker_should_poll_when_source_activates():
+    with TimeMock(0.0):
+        tracker = CecPowerTracker(DeviceMock(), min_poll_sec=1)
+        tracker.poll()
+        assert tracker.poll_in == 1
+
+        msg = bus_msg(0x82, message_from=4, message_to=15)
+        tracker.update(msg, CecMessageType.ActiveSource)
+        assert tracker.poll_in == 0
@@ -0,0 +1,77 @@
+import pytest
+
+from cec_control._utils import Wait
+from cec_control.cec import CecController
+from cec_control.cec_lib_types import CecMessageType
+from cec_control.cec_pubsub import CecPublisher, CecSubscriber, opcode_mask
+from cec_control.cec_sim import CecSimBusMsg
+
+
+@pytest.fixture
+def publisher(tmp_path):
+    with CecPublisher(str(tmp_path / "bus.sock"), buffer=4096) as publisher:
+        yield publisher
+
+
+def wait_for_filters(publisher: CecPublisher, n: int):
+    Wait.for_fn(
+        2,
+        lambda: (
+            len(publisher.subscribers) == n
+            and all(any(sub.opcodes) for sub in publisher.subscribers)
+        ),
+        sleep_sec=0.01,
+    )
+
+
+def test__CecPublisher_should_forward_received_messages_by_opcode(publisher, bus, cec):
+    keys = CecSubscriber(publisher.path, [CecMessageType.UserControlPressed])
+    with keys, CecSubscriber(publisher.path) as everything:
+        ctl = CecController(cec)
+        ctl.add_listener(publisher.publish)
+        wait_for_filters(publisher, 2)
+        cec.session().start()
+        bus.inject(b"\x04\x44\x01")
+        bus.inject(b"\x0f\x36")
+        ctl.wait_for_cec_message(1, lambda msg, type: type == CecMessageType.Standby)
+
+        key = keys.receive(1)
+        assert (key.message_code, key.message_from, bytes(key.frame[:3])) == (
+            0x44,
+            0,
+            b"\x04\x44\x01",
+        )
+        assert [everything.receive(1).message_code for _ in range(2)] == [0x44, 0x36]
+        assert keys.receive(0.05) is None
+        assert publisher.published == 2
+
+
+def test__CecPublisher_should_drop_messages_of_a_slow_subscriber(publisher):
+    msg = CecSimBusMsg.from_frame(b"\x04\x44\x01", 1, False)
+    with CecSubscriber(publisher.path, [0x44]) as sub:
+        wait_for_filters(publisher, 1)
+        for _ in range(100):
+            publisher.publish(msg, CecMessageType.UserControlPressed)
+
+        received = 0
+        while sub.receive(0.05) is not None:
+            received += 1
+        publisher.publish(msg, CecMessageType.UserControlPressed)
+        assert sub.receive(1) is not None
+
+    assert publisher.dropped > 0
+    assert received + publisher.dropped == 100
+    assert sub.dropped == publisher.dropped
+
+
+def test__CecSubscriber_should_replace_its_filter(publisher):
+    with CecSubscriber(publisher.path, [0x44]) as sub:
+        wait_for_filters(publisher, 1)
+        sub.subscribe([CecMessageType.Standby])
+        Wait.for_fn(2, lambda: publisher.subscribers[0].opcodes[0x36], sleep_sec=0.01)
+        publisher.publish(CecSimBusMsg.from_frame(b"\x04\x44\x01", 1, False), None)
+        publisher.publish(CecSimBusMsg.from_frame(b"\x0f\x36", 1, False), None)
+
+        assert sub.receive(1).message_code == 0x36
+
+    assert opcode_mask([0, 0x44])[:9] == b"\x01" + bytes(7) + b"\x10"
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from test_cec import bus_msg
+
+from cec_control.cec import Cec, cec_lib
+from cec_control.cec_lib_types import CecMessageType, CecNetworkDeviceType
+from cec_control.cec_registry import CecDeviceRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    cec = Cec("/dev/cec0")
+    cec._ref = SimpleNamespace(info=SimpleNamespace(logical_address_count=1))
+    monkeypatch.setattr(
+        cec_lib,
+        "create_net_device",
+        Mock(side_effect=lambda _, la: SimpleNamespace(device_id=la)),
+    )
+    monkeypatch.setattr(cec_lib, "get_net_device_osd_name", Mock(return_value="TV"))
+    return CecDeviceRegistry(cec)
+
+
+def test__CecDeviceRegistry_should_cache_without_expiring(registry):
+    tv = registry.get(CecNetworkDeviceType.TV)
+
+    assert registry.get(0) is tv
+    assert tv.osd_name == "TV"
+    assert tv.osd_name == "TV"
+    cec_lib.get_net_device_osd_name.assert_called_once()
+
+
+def test__CecDeviceRegistry_should_update_from_messages(registry):
+    tv = registry.get(CecNetworkDeviceType.TV)
+
+    registry.update(
+        bus_msg(0x47, message_osd_name="Living Room"), CecMessageType.SetOsdName
+    )
+    registry.update(bus_msg(0x90, message_command=1), CecMessageType.ReportPowerStatus)
+
+    assert tv.osd_name == "Living Room"
+    assert tv.is_power_on is False
+    cec_lib.get_net_device_osd_name.assert_not_called()
+
+
+def test__CecDeviceRegistry_should_invalidate_on_state_change(registry):
+    tv = registry.get(CecNetworkDeviceType.TV)
+    tv.set_cached("osd_name", "Old")
+
+    registry.update(bus_msg(has_message=False, has_event=True, state_change=True), None)
+
+    assert tv.osd_name == "TV"
+
+
+def test__CecDeviceRegistry_should_keep_cache_when_reopened_at_same_address(registry):
+    tv = registry.get(CecNetworkDeviceType.TV)
+    state = {"has_message": False, "has_event": True, "state_change": True}
+    registry.update(bus_msg(**state, state_change_phys_addr=0x1000), None)
+    tv.set_cached("vendor_id", 0xF0)
+    tv.set_cached("osd_name", "Old")
+
+    registry.update(bus_msg(disconnected=True, has_message=False), None)
+    registry.update(
+        bus_msg(**state, initial_state=True, state_change_phys_addr=0x1000), None
+    )
+
+    assert tv.get_cached("vendor_id") == 0xF0
+    assert tv.get_cached("osd_name") is None
@@ -0,0 +1,110 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from cec_control.cec import Cec
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecNetworkDeviceType,
+    CecPowerState,
+)
+from cec_control.cec_scheduler import (
+    FUNCTIONS,
+    CecBusBudget,
+    CecSchedulerLib,
+    CecTransmitScheduler,
+)
+from cec_control.cec_sim import CecSimDevice, CecSimLib
+
+
+@pytest.fixture
+def bus(bus):
+    bus.ack_latency = 0.02
+    bus.add_device(CecSimDevice(5, 0x2000, "AVR"))
+    return bus
+
+
+@pytest.fixture
+def lib(lib):
+    lib = CecSchedulerLib(lib)
+    yield lib
+    lib.close()
+
+
+def in_threads(*fns):
+    results = [None] * len(fns)
+
+    def run(i):
+        results[i] = fns[i]()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(fns))]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.002)  # in order
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def test__CecSchedulerLib_should_coalesce_identical_requests(bus, cec):
+    tvs = [cec.create_device(CecNetworkDeviceType.TV) for _ in range(5)]
+
+    states = in_threads(*(lambda tv=tv: tv.power_state for tv in tvs))
+
+    assert states == [CecPowerState.On] * 5
+    requests = [f for f in bus.devices[0].received if bytes(f) == b"\x40\x8f"]
+    assert len(requests) == 1
+    assert cec._lib.scheduler.coalesced == 4
+
+
+def test__CecSchedulerLib_should_send_replies_first(bus):
+    calls = []
+    sim = CecSimLib(bus)
+
+    def recorded(name, fn):
+        def call(*args):
+            calls.append(name)
+            return fn(*args)
+
+        return call
+
+    for name in FUNCTIONS:
+        setattr(sim, name, recorded(name, getattr(sim, name)))
+
+    lib = CecSchedulerLib(sim)
+    with Cec("/dev/cec0", lib) as cec:
+        cec.set_type(CecDeviceType.Playback)
+        tv = cec.create_device(CecNetworkDeviceType.TV)
+        avr = cec.create_device(CecNetworkDeviceType.AudioSystem)
+
+        in_threads(
+            lambda: avr.osd_name,  # on the bus while the others are queued
+            lambda: avr.vendor_id,
+            lambda: tv.report_power_on(),
+        )
+
+    lib.close()
+    assert calls == [
+        "get_net_device_osd_name",
+        "send_msg_report_power_status",
+        "get_net_device_vendor_id",
+    ]
+
+
+def test__CecBusBudget_should_delay_beyond_share():
+    budget = CecBusBudget(share=0.5, burst=0.1)
+
+    assert budget.delay(0.1) == 0
+    budget.take(0.1)
+    assert budget.delay(0.05) == pytest.approx(0.1, abs=0.01)
+
+
+def test__CecTransmitScheduler_should_fail_calls_after_close():
+    scheduler = CecTransmitScheduler()
+    scheduler.close()
+
+    with pytest.raises(RuntimeError):
+        scheduler.call("ping_net_dev", lambda dev: True, (SimpleNamespace(fd=3),))
@@ -0,0 +1,252 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from cec_control._utils import Wait
+from cec_control.cec import Cec, CecController
+from cec_control.cec_async import AsyncCecController
+from cec_control.cec_cli import CecCli
+from cec_control.cec_frame import CecFrame
+from cec_control.cec_lib_types import (
+    CecDeviceType,
+    CecMessageType,
+    CecNetworkDeviceType,
+    CecPowerState,
+    CecUserControlKeys,
+)
+from cec_control.cec_sim import (
+    TX_OK,
+    CecSimBus,
+    CecSimBusMsg,
+    CecSimDevice,
+    CecSimLib,
+)
+
+
+@pytest.fixture
+def bus():
+    bus = CecSimBus(seed=1)
+    bus.add_device(CecSimDevice(0, 0x0000, "TV", vendor_id=0x0000F0))
+    bus.add_device(CecSimDevice(5, 0x2000, "AVR", power=CecPowerState.StandBy))
+    bus.add_adapter("/dev/cec0", physical_address=0x1000)
+    return bus
+
+
+@pytest.fixture
+def cec(bus):
+    cec = Cec("/dev/cec0", CecSimLib(bus))
+    with cec:
+        cec.set_type(CecDeviceType.Playback)
+        yield cec
+
+
+def test__CecSimLib_should_register_and_detect_devices(cec):
+    devices = cec.devices()
+
+    assert cec._ref.info.logical_address == 4
+    assert [d.logical_address for d in devices] == [0, 5]
+
+
+def test__CecSimLib_should_answer_device_requests(cec):
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    avr = cec.create_device(CecNetworkDeviceType.AudioSystem)
+
+    assert tv.refresh()
+    assert tv.osd_name == "TV"
+    assert tv.vendor_name == "Samsung"
+    assert avr.physical_address == 0x2000
+    assert avr.power_state == CecPowerState.StandBy
+    assert not cec.create_device(CecNetworkDeviceType.Tuner1).is_active
+
+
+def test__CecDevice_should_transmit_and_return_reply(cec):
+    avr = cec.create_device(CecNetworkDeviceType.AudioSystem)
+    tuner = cec.create_device(CecNetworkDeviceType.Tuner1)
+
+    result = avr.transmit(
+        CecMessageType.GiveDevicePowerStatus, reply=CecMessageType.ReportPowerStatus
+    )
+    missing = tuner.transmit(
+        CecMessageType.GivePhysicalAddress, reply=CecMessageType.ReportPhysicalAddress
+    )
+
+    assert result.ok
+    assert result.reply == b"\x54\x90\x01"
+    assert result.elapsed >= 0
+    assert not missing.ok
+    assert missing.reply == b""
+    assert tuner.physical_address == 0xFFFF
+
+
+def test__CecDevice_should_wait_for_the_transmit_status_in_a_session(bus, cec):
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    tuner = cec.create_device(CecNetworkDeviceType.Tuner1)
+    adapter = bus.adapters["/dev/cec0"]
+    cec.session().start()
+
+    # the fd of a session is non-blocking, a bare transmit is only queued
+    assert bus.transmit(adapter, b"\x40\x8f") == (0, None)
+    assert tv.report_active_source()
+    assert tv.report_power_on()
+    assert tv.is_active
+    assert tv.transmit(CecMessageType.Standby).tx_status == TX_OK
+    assert not tuner.transmit(CecMessageType.Standby).ok
+    assert bus.transmit(adapter, b"\x40\x8f") == (0, None)
+
+
+def test__CecSimBus_should_count_nacks_and_lost_arbitration(bus, cec):
+    bus.arbitration_loss = 1.0
+    cec.devices(mask=0b1001)
+
+    assert bus.stats.nacks == 1
+    assert bus.stats.arbitration_lost == 2
+
+
+def test__Cec_should_keep_the_messages_received_during_a_scan(bus, cec):
+    cec.session().start()
+    bus.press_key(CecUserControlKeys.Select)
+    devices = cec.devices()
+    bus.press_key(CecUserControlKeys.Back, release=False)
+    assert cec.create_device(CecNetworkDeviceType.TV).refresh()
+
+    msgs = cec._lib.get_msgs(cec._ref, 0, 64)
+    keys = [m for m in msgs if m.has_message and m.message_code in (0x44, 0x45)]
+
+    assert [dev.logical_address for dev in devices] == [0, 5]
+    assert [(m.message_code, m.message_command) for m in keys] == [
+        (0x44, CecUserControlKeys.Select.value),
+        (0x45, 0),
+        (0x44, CecUserControlKeys.Back.value),
+    ]
+
+
+def test__CecSimBusMsg_should_convert_to_the_frame():
+    msg = CecSimBusMsg.from_frame(b"\x04\x44\x01")
+
+    assert bytes(msg) == b"\x04\x44\x01"
+    assert CecFrame(msg).key == CecUserControlKeys.Up.value
+
+
+def test__CecSimBus_should_report_lost_messages(bus, cec):
+    cec.session().start()
+    for _ in range(60):
+        bus.inject(b"\x0f\x36")
+
+    msgs = cec._lib.get_msgs(cec._ref, 0, 128)
+
+    # the initial state event is queued when the adapter is opened
+    assert msgs[0].lost_messages == 7
+    assert len(msgs) == 55
+
+
+def test__CecController_should_answer_power_status_on_sim(bus, cec):
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    ctl = CecController(cec)
+    cec.session().start()
+    bus.inject(b"\x04\x8f")
+    bus.inject(b"\x0f\x36")
+
+    ctl.handle_cec_messages(1, tv, [CecMessageType.Standby], lambda msg, type: False)
+
+    assert bytes(bus.devices[0].received[-1]) == b"\x40\x90\x00"
+
+
+def test__CecController_should_receive_traffic_at_rate(bus, cec):
+    received = []
+    cec.session().start()
+    traffic = bus.traffic(lambda i: (0x04, 0x44, i % 10), rate=2000, count=200)
+
+    def handler(msg, type):
+        if type == CecMessageType.UserControlPressed:
+            received.append(CecFrame(msg).key)
+
+        return len(received) == 200
+
+    CecController(cec).wait_for_cec_message(5, handler)
+    traffic.stop()
+
+    assert received == [i % 10 for i in range(200)]
+
+
+def test__CecCli_should_monitor_tv_on_sim(bus):
+    emitted = threading.Event()
+    remote = Mock()
+    remote.press_key = Mock(side_effect=lambda _: emitted.set())
+    cli = CecCli(remote, CecSimLib(bus))
+    cli.attach_on_process_exit = Mock()
+    cli.register_on_network_and_find_device(
+        CecDeviceType.Playback, CecNetworkDeviceType.TV
+    )
+
+    def script():
+        bus.press_key(CecUserControlKeys.Up)
+        emitted.wait(2)
+        bus.set_power(0, CecPowerState.StandBy)
+        Wait.for_fn(2, lambda: cli.power.state == CecPowerState.StandBy, sleep_sec=0.01)
+        cli.token.cancel()
+        bus.inject(b"\x0f\x36")  # wake up the receive loop
+
+    threading.Timer(0.1, script).start()
+    cli.start_monitoring_tv()
+
+    remote.press_key.assert_called_once_with(CecUserControlKeys.Up)
+    remote.release_key.assert_called()
+    assert cli.power.state == CecPowerState.StandBy
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_wake_for_the_messages_read_by_a_scan(
+    cec, press_during_scan
+):
+    press_during_scan(CecUserControlKeys.Select)
+    async with AsyncCecController(cec) as ctl:
+        scan = asyncio.get_running_loop().run_in_executor(None, cec.devices)
+        msg = await ctl.wait_for(
+            lambda msg, type: type == CecMessageType.UserControlPressed, 0.5
+        )
+        await scan
+
+    assert msg is not None
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_not_wait_for_a_transmit_on_the_loop(bus, cec):
+    adapter = bus.adapters["/dev/cec0"]
+    held = threading.Event()
+    done = threading.Event()
+
+    def transmit():
+        # the receive lock, held by a pipelined transmit for its replies
+        with adapter.rx_lock:
+            bus.press_key(CecUserControlKeys.Select)
+            held.set()
+            done.wait(2)
+
+    async with AsyncCecController(cec) as ctl:
+        loop = asyncio.get_running_loop()
+        key = asyncio.ensure_future(
+            ctl.wait_for(lambda msg, type: type == CecMessageType.UserControlPressed, 1)
+        )
+        start = time.monotonic()
+        threading.Thread(target=transmit).start()
+        await loop.run_in_executor(None, held.wait)
+        await asyncio.sleep(0.05)
+        elapsed = time.monotonic() - start
+        done.set()
+
+        assert elapsed < 0.5
+        assert await key is not None
+
+
+@pytest.mark.asyncio
+async def test__AsyncCecController_should_run_on_sim(bus, cec):
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    async with AsyncCecController(cec) as ctl:
+        assert await ctl.power_state(tv) == CecPowerState.On
+
+        bus.unplug("/dev/cec0")
+        await asyncio.sleep(0.05)
+        assert not ctl.attached
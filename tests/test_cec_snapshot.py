@@ -0,0 +1,91 @@
+import subprocess
+import sys
+from unittest.mock import Mock
+
+from cec_control.cec import Cec
+from cec_control.cec_cli import CecCli
+from cec_control.cec_lib_types import CecDeviceType, CecNetworkDeviceType
+from cec_control.cec_registry import CecDeviceRegistry
+from cec_control.cec_sim import CecSimBus, CecSimLib
+from cec_control.cec_snapshot import CecTopologySnapshot
+
+
+def save_snapshot(bus: CecSimBus, file: str):
+    with Cec("/dev/cec0", CecSimLib(bus)) as cec:
+        cec.set_type(CecDeviceType.Playback)
+        registry = CecDeviceRegistry(cec)
+        assert registry.get(CecNetworkDeviceType.TV).vendor_id == 0xF0
+        assert CecTopologySnapshot.capture(cec, registry).save(file)
+
+
+def test__CecTopologySnapshot_should_restore_registry_cache(bus, tmp_path):
+    file = str(tmp_path / "topology.json")
+    save_snapshot(bus, file)
+    bus.devices[0].vendor_id = 0  # a new query would return it
+
+    snapshot = CecTopologySnapshot.load(file)
+    with Cec("/dev/cec0", CecSimLib(bus)) as cec:
+        assert snapshot.validate(cec, CecDeviceType.Playback, CecNetworkDeviceType.TV)
+        registry = CecDeviceRegistry(cec)
+        snapshot.restore(registry)
+
+        assert registry.get(CecNetworkDeviceType.TV).vendor_id == 0xF0
+        assert cec.type == CecDeviceType.Playback
+
+
+def test__CecTopologySnapshot_should_reject_moved_adapter(bus, tmp_path):
+    file = str(tmp_path / "topology.json")
+    save_snapshot(bus, file)
+    bus.set_physical_address("/dev/cec0", 0x2000)
+    (tmp_path / "invalid.json").write_text("{")
+
+    snapshot = CecTopologySnapshot.load(file)
+    with Cec("/dev/cec0", CecSimLib(bus)) as cec:
+        assert not snapshot.validate(
+            cec, CecDeviceType.Playback, CecNetworkDeviceType.TV
+        )
+    assert CecTopologySnapshot.load(str(tmp_path / "invalid.json")) is None
+    assert CecTopologySnapshot.load(str(tmp_path / "missing.json")) is None
+
+
+def test__CecCli_should_skip_adapter_search_with_snapshot(bus, tmp_path):
+    file = str(tmp_path / "topology.json")
+    save_snapshot(bus, file)
+    lib = CecSimLib(bus)
+    lib.find_cec_devices = Mock(wraps=lib.find_cec_devices)
+    lib.set_logical_address = Mock(wraps=lib.set_logical_address)
+
+    cli = CecCli(Mock(), lib, snapshot=file)
+    cli.register_on_network_and_find_device(
+        CecDeviceType.Playback, CecNetworkDeviceType.TV
+    )
+
+    assert cli.cec.path == "/dev/cec0"
+    lib.find_cec_devices.assert_not_called()
+    lib.set_logical_address.assert_not_called()
+
+
+def test__CecCli_should_keep_the_type_of_a_registered_adapter(bus, tmp_path):
+    file = str(tmp_path / "topology.json")
+    save_snapshot(bus, file)  # registers the adapter
+    (tmp_path / "topology.json").unlink()
+
+    cli = CecCli(Mock(), CecSimLib(bus), snapshot=file)
+    cli.register_on_network_and_find_device(
+        CecDeviceType.Playback, CecNetworkDeviceType.TV
+    )
+    with cli.cec as cec:
+        assert CecTopologySnapshot.capture(cec, CecDeviceRegistry(cec)).save(file)
+
+    assert cli.cec.type == CecDeviceType.Playback
+    assert CecTopologySnapshot.load(file).type == "Playback"
+    assert cli._restore(CecDeviceType.Playback, CecNetworkDeviceType.TV)
+
+
+def test__cec_control_should_import_names_lazily():
+    code = (
+        "import sys, cec_control; cec_control.CecFrame;"
+        "assert 'cec_control.keyboard' not in sys.modules;"
+        "assert 'cec_control.cec' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,96 @@
+import threading
+
+from cec_control._utils import Wait
+from cec_control.cec import CecController
+from cec_control.cec_lib_types import (
+    CecMessageType,
+    CecNetworkDeviceType,
+)
+from cec_control.cec_metrics import CecMetrics
+from cec_control.cec_sim import CecSimBusMsg
+from cec_control.cec_workers import CecHandlerPool, message_key
+
+
+def test__CecHandlerPool_should_run_a_key_in_order_and_count_overflow():
+    metrics = CecMetrics()
+    done = []
+    gate = threading.Event()
+    started = threading.Event()
+    with CecHandlerPool(workers=2, queue_size=2, metrics=metrics) as pool:
+        # the keys 0 and 1 run on their own worker
+        pool.submit(0, lambda: started.set() or gate.wait(5))
+        started.wait(5)
+        assert pool.submit(0, done.append, 1)
+        assert pool.submit(0, done.append, 2)
+        assert not pool.submit(0, done.append, 3)
+        # not behind the blocked worker
+        assert pool.submit(1, done.append, 10)
+        assert Wait.for_fn(2, lambda: 10 in done, sleep_sec=0.01)
+
+        snap = metrics.snapshot()
+        gate.set()
+        pool.join()
+
+    assert snap["handler_queue_depth"] == 2
+    assert snap["handler_queue_overflow"] == pool.overflow == 1
+    assert done == [10, 1, 2]
+    assert metrics.handler_pools == []
+
+
+def test__CecHandlerPool_should_key_messages_by_device():
+    pressed = CecSimBusMsg.from_frame(b"\x04\x44\x01")
+    released = CecSimBusMsg.from_frame(b"\x04\x45")
+
+    assert message_key(pressed, CecMessageType.UserControlPressed) == message_key(
+        released, CecMessageType.UserControlReleased
+    )
+    standby = CecSimBusMsg.from_frame(b"\x0f\x36")
+    power = CecSimBusMsg.from_frame(b"\x04\x90\x00")
+    assert message_key(standby, CecMessageType.Standby) == message_key(
+        power, CecMessageType.ReportPowerStatus
+    )
+    assert message_key(standby, CecMessageType.Standby) != message_key(
+        pressed, CecMessageType.UserControlPressed
+    )
+
+
+def test__CecController_should_keep_receiving_while_handlers_run(bus, cec):
+    adapter = bus.adapters["/dev/cec0"]
+    tv = cec.create_device(CecNetworkDeviceType.TV)
+    ctl = CecController(cec)
+    gate = threading.Event()
+    keys = []
+
+    def handler(msg, type):
+        if type == CecMessageType.UserControlPressed:
+            gate.wait(5)
+            keys.append(msg.message_command)
+        elif type == CecMessageType.Standby:
+            return False
+
+    cec.session().start()
+    for i in range(40):
+        bus.inject((0x04, 0x44, i))
+    bus.inject((0x04, 0x8F))
+    bus.inject((0x0F, 0x36))
+
+    result = []
+    types = [CecMessageType.UserControlPressed, CecMessageType.Standby]
+    with CecHandlerPool(workers=2, queue_size=64) as pool:
+        thread = threading.Thread(
+            target=lambda: result.append(
+                ctl.handle_cec_messages(3, tv, types, handler, pool)
+            )
+        )
+        thread.start()
+        # every message was read while the first key handler blocks
+        assert Wait.for_fn(
+            2, lambda: adapter.queued == 0 and pool.depth >= 39, sleep_sec=0.01
+        )
+        gate.set()
+        thread.join(5)
+
+    assert result[0].message_code == CecMessageType.Standby.value
+    assert keys == list(range(40))
+    assert bytes(bus.devices[0].received[-1]) == b"\x40\x90\x00"
+    assert cec.session().lost_events == 0
@@ -1,5 +1,15 @@
+import time
+from unittest.mock import Mock, call
+
 from cec_control.cec_lib_types import CecUserControlKeys
-from cec_control.keyboard import UInputKeyboard, uinput
+from cec_control.keyboard import (
+    KEY_DOWN,
+    KEY_REPEAT,
+    KEY_UP,
+    KeyRepeat,
+    UInputKeyboard,
+    uinput,
+)
 
 
 def test__UInputKeyboard_should_init():
@@ -7,3 +17,49 @@ def test__UInputKeyboard_should_init():
 
     assert keyboard.keys == ["U_KEY_UP"]
     uinput.Device.assert_called_once_with(["U_KEY_UP"])
+
+
+def create_repeat(**kwargs):
+    batches = []
+    return KeyRepeat(batches.append, **kwargs), batches
+
+
+def test__UInputKeyboard_should_emit_events_under_one_syn():
+    keyboard = UInputKeyboard({CecUserControlKeys.Up: "KEY_UP"})
+    keyboard.device = Mock()
+    keyboard.emit_key(CecUserControlKeys.Up)
+    keyboard.close()
+
+    assert keyboard.device.emit.call_args_list == [
+        call("U_KEY_UP", KEY_DOWN, syn=False),
+        call("U_KEY_UP", KEY_UP, syn=False),
+    ]
+    keyboard.device.syn.assert_called_once()
+
+
+def test__KeyRepeat_should_track_press_and_release():
+    repeat, batches = create_repeat(delay=10)
+    repeat.press("up")
+    repeat.press("up")  # resent by the TV while held
+    repeat.press("down")
+    repeat.release()
+    repeat.close()
+
+    assert batches == [
+        [("up", KEY_DOWN)],
+        [("up", KEY_UP), ("down", KEY_DOWN)],
+        [("down", KEY_UP)],
+    ]
+
+
+def test__KeyRepeat_should_repeat_until_hold_timeout():
+    repeat, batches = create_repeat(delay=0.02, interval=0.01, hold_timeout=0.1)
+    repeat.press("up")
+    time.sleep(0.2)
+    repeat.close()
+
+    events = [ev for batch in batches for ev in batch]
+    assert events[0] == ("up", KEY_DOWN)
+    assert events[-1] == ("up", KEY_UP)
+    assert 3 <= events.count(("up", KEY_REPEAT)) <= 9
+    assert repeat.held is None
@@ -1,3 +1,5 @@
+import threading
+
 from cec_control._utils import MemoryCache, Time, Wait
 
 
@@ -74,3 +76,64 @@ def test__Wait_should_wait_for():
     x = 0
     r = Wait.for_fn(10, lambda: x)
     assert r == 0
+
+
+def test__MemoryCache_should_evict_least_recently_used():
+    cache = MemoryCache(max_size=2)
+    cache.set("A", 1)
+    cache.set("B", 2)
+    cache.get("A")
+    cache.set("C", 3)
+
+    assert cache.keys() == ["A", "C"]
+    assert cache.stats.evictions == 1
+
+
+def test__MemoryCache_should_count_hits_and_misses():
+    cache = MemoryCache()
+    cache.get_or_set("A", lambda: 1)
+    cache.get_or_set("A", lambda: 2)
+    cache.get("B")
+
+    assert cache.get("A") == 1
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.loads) == (2, 2, 1)
+
+
+def test__MemoryCache_should_sweep_expired():
+    with TimeMock(1.0) as set_ts:
+        cache = MemoryCache(sweep_every=2)
+        cache.set("A", 1, 1)
+        set_ts(3.0)
+        cache.set("B", 2)
+
+        assert cache.keys() == ["B"]
+        assert cache.stats.expirations == 1
+
+
+def test__MemoryCache_should_load_once_for_concurrent_misses():
+    cache = MemoryCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "val"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_set("A", load)))
+        for _ in range(4)
+    ]
+    threads[0].start()
+    started.wait(1)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(1)
+
+    assert results == ["val"] * 4
+    assert len(calls) == 1